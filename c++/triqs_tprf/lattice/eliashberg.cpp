@@ -24,6 +24,7 @@
 
 #include "eliashberg.hpp"
 #include <omp.h>
+#include <algorithm>
 #include "../mpi.hpp"
 
 #include "gf.hpp"
@@ -89,39 +90,84 @@ g_Dwk_t eliashberg_g_delta_g_product(g_Dwk_vt g_wk, g_Dwk_vt delta_wk) {
   auto F_wk = make_gf(delta_wk);
   F_wk *= 0.;
 
+  // All orbital combinations are convolved at once by grouping the orbital
+  // indices of G*G into a (nb^2 x nb^2) matrix acting on Delta as a (nb^2 x 1) matrix
+  //
+  // F_{(dc)} = sum_{(ef)} [G_{cf} G^*_{ed}]_{(dc),(ef)} * Delta_{(ef)}
+  //
+  // The DLR fits only act on the frequency index, so the matrices of a block
+  // of k-points are stacked row-wise and fitted by a single make_gf_dlr call.
+  // Only the convolution is done per k-point.
+
+  int nb  = delta_wk.target_shape()[0];
+  int nb2 = nb * nb;
+
   auto tmesh = dlr_imtime(wmesh);
   tmesh.dlr_it().convolve_init(); // NB! Initialization not thread-safe, trigger it manually here.
-  
+
+  double beta    = tmesh.beta();
+  auto statistic = static_cast<cppdlr::statistic_t>(tmesh.statistic());
+  long nr        = tmesh.size();
+
   auto mesh_mpi = mpi_view(kmesh);
-#pragma omp parallel for
-  for (unsigned int idx = 0; idx < mesh_mpi.size(); idx++){
-    auto & k = mesh_mpi[idx];
+  long nk_mpi   = mesh_mpi.size();
+
+  // -- Block size bounding the G*G workspace to about 4096 elements per frequency,
+  // -- small enough to give every thread a block
+  long n_threads = omp_get_max_threads();
+  long k_block   = std::min<long>(std::max(1, 4096 / (nb2 * nb2)), (nk_mpi + n_threads - 1) / n_threads);
+  k_block        = std::max<long>(k_block, 1);
+  long n_blocks = (nk_mpi + k_block - 1) / k_block;
+
+#pragma omp parallel
+  {
+    // -- Per thread workspaces, reused for all blocks of k-points
+    g_Dw_t gg_w{wmesh, {k_block * nb2, nb2}};
+    g_Dw_t d_w{wmesh, {k_block * nb2, 1}};
+    g_Dt_t f_t{tmesh, {k_block * nb2, 1}};
+    nda::array<dcomplex, 3> gg_ck(nr, nb2, nb2), d_ck(nr, nb2, 1);
+    gg_w.data() = 0.;
+    d_w.data()  = 0.;
+    f_t.data()  = 0.;
+
+#pragma omp for
+    for (long bidx = 0; bidx < n_blocks; bidx++) {
+      long k0  = bidx * k_block;
+      long nkb = std::min(k_block, nk_mpi - k0);
+
+      for (long i = 0; i < nkb; i++) {
+        auto &k = mesh_mpi[k0 + i];
+        for (auto w : wmesh) {
+          auto g_p   = g_wk[w, k];
+          auto g_m   = g_wk[w, -k];
+          auto delta = delta_wk[w, k];
+          for (auto [d, c] : delta_wk.target_indices()) {
+            for (auto [e, f] : delta_wk.target_indices()) {
+              gg_w[w](i * nb2 + d * nb + c, e * nb + f) = g_p(c, f) * nda::conj(g_m(e, d));
+            }
+            d_w[w](i * nb2 + d * nb + c, 0) = delta(d, c);
+          }
+        }
+      }
 
-    for (auto [d, c] : g_wk.target_indices()) {
-      for (auto [e, f] : delta_wk.target_indices()) {
+      auto gg_c = make_gf_dlr(gg_w);
+      auto d_c  = make_gf_dlr(d_w);
+
+      for (long i = 0; i < nkb; i++) {
+        auto rows = range(i * nb2, (i + 1) * nb2);
+        gg_ck     = gg_c.data()(range::all, rows, range::all);
+        d_ck      = d_c.data()(range::all, rows, range::all);
 
-	auto gg_w = gf(wmesh);
-	auto d_w = gf(wmesh);
-	
-	for( auto w : wmesh ) {
-	  gg_w[w] = g_wk[w, k](c, f) * nda::conj(g_wk[w, -k](e, d));
-	  d_w[w] = delta_wk[w, k](e, f);
-	}
-
-	auto gg_c = make_gf_dlr(gg_w);
-	auto d_c = make_gf_dlr(d_w);
-
-	auto f_t = gf(tmesh);
-	f_t.data() = tmesh.dlr_it().convolve(
-	  tmesh.beta(), static_cast<cppdlr::statistic_t>(tmesh.statistic()),
-	  gg_c.data(), d_c.data());
-
-	auto f_c = make_gf_dlr(f_t);
-	auto f_w = make_gf_dlr_imfreq(f_c);
-	  
-	for( auto w : wmesh ) {
-	  F_wk[w, k](d, c) += f_w[w];
-	}
+        f_t.data()(range::all, rows, range::all) = tmesh.dlr_it().convolve(beta, statistic, gg_ck, d_ck);
+      }
+
+      auto f_w = make_gf_dlr_imfreq(make_gf_dlr(f_t));
+
+      for (long i = 0; i < nkb; i++) {
+        auto &k = mesh_mpi[k0 + i];
+        for (auto w : wmesh) {
+          for (auto [d, c] : F_wk.target_indices()) F_wk[w, k](d, c) = f_w[w](i * nb2 + d * nb + c, 0);
+        }
       }
     }
   }
@@ -131,14 +177,39 @@ g_Dwk_t eliashberg_g_delta_g_product(g_Dwk_vt g_wk, g_Dwk_vt delta_wk) {
   return F_wk;  
 }
 
+// Helper function computing the index table of the momentum difference k - q
+
+template <typename kmesh_t> nda::array<long, 2> momentum_difference_table(kmesh_t const &kmesh, kmesh_t const &gamma_kmesh) {
+
+  if (kmesh.dims() != gamma_kmesh.dims())
+    TRIQS_RUNTIME_ERROR << "The momentum mesh of Gamma must be the same as the one of Delta.";
+
+  auto dims = kmesh.dims();
+  nda::array<long, 2> kq_idx(kmesh.size(), kmesh.size());
+
+  for (auto k : kmesh) {
+    for (auto q : kmesh) {
+      auto kq = k.index();
+      for (int i = 0; i < 3; i++) kq[i] = ((kq[i] - q.index()[i]) % dims[i] + dims[i]) % dims[i];
+      kq_idx(k.data_index(), q.data_index()) = gamma_kmesh.to_data_index(kq);
+    }
+  }
+
+  return kq_idx;
+}
+
 g_wk_t eliashberg_product(chi_wk_vt Gamma_pp, g_wk_vt g_wk,
                        g_wk_vt delta_wk) {
 
+  using scalar_t = g_wk_t::scalar_t;
+  auto _ = all_t{};
+
   //auto [wmesh, kmesh] = delta_wk.mesh();
   auto wmesh = std::get<0>(delta_wk.mesh());
   auto kmesh = std::get<1>(delta_wk.mesh());
 
   auto gamma_wmesh = std::get<0>(Gamma_pp.mesh());
+  auto gamma_kmesh = std::get<1>(Gamma_pp.mesh());
 
   if (2*wmesh.size() > gamma_wmesh.size())
       TRIQS_RUNTIME_ERROR << "The size of the Matsubara frequency mesh of Gamma"
@@ -147,21 +218,185 @@ g_wk_t eliashberg_product(chi_wk_vt Gamma_pp, g_wk_vt g_wk,
 
   auto F_wk = eliashberg_g_delta_g_product(g_wk, delta_wk);
 
+  long nw  = wmesh.size();
+  long nk  = kmesh.size();
+  long nb  = delta_wk.target_shape()[0];
+  long nb2 = nb * nb;
+
+  auto kq_idx = momentum_difference_table(kmesh, gamma_kmesh);
+
+  // The sum over (n, q, c, d) is performed as one matrix product per bosonic
+  // frequency offset w - n, with F_wk grouped as a matrix with rows (q, d, c)
+  // and columns n, and Gamma grouped as a matrix with rows (k, a, b) and
+  // columns (q, d, c). The rows are processed in blocks of momenta.
+
+  matrix<scalar_t> F_mat(nk * nb2, nw);
+  for (auto [n, q] : F_wk.mesh())
+    for (auto [d, c] : F_wk.target_indices()) F_mat(q.data_index() * nb2 + d * nb + c, n.data_index()) = F_wk[n, q](d, c);
+
+  auto delta_mat = matrix<scalar_t>::zeros(nk * nb2, nw);
+
+  long nk_block = std::clamp(64 / nb2, 1l, nk);
+  long n_blocks = (nk + nk_block - 1) / nk_block;
+
+  mpi::communicator comm;
+  auto [block_start, block_end] = itertools::chunk_range(0, n_blocks, comm.size(), comm.rank());
+
+#pragma omp parallel
+  {
+    matrix<scalar_t> Gamma_mat(nk_block * nb2, nk * nb2);
+
+#pragma omp for
+    for (long block = block_start; block < block_end; block++) {
+
+      long k_start = block * nk_block;
+      long k_end   = std::min(k_start + nk_block, nk);
+      auto rows    = range(k_start * nb2, k_end * nb2);
+      auto Gamma_block = Gamma_mat(range(0, (k_end - k_start) * nb2), _);
+
+      for (long offset = -(nw - 1); offset < nw; offset++) {
+
+        long gamma_widx = gamma_wmesh.to_data_index(offset);
+
+        for (long kidx = k_start; kidx < k_end; kidx++)
+          for (long qidx = 0; qidx < nk; qidx++) {
+            auto Gamma = Gamma_pp.data()(gamma_widx, kq_idx(kidx, qidx), _, _, _, _);
+            for (auto [c, a, d, b] : Gamma_pp.target_indices())
+              Gamma_block((kidx - k_start) * nb2 + a * nb + b, qidx * nb2 + d * nb + c) = Gamma(c, a, d, b);
+          }
+
+        long w_start = std::max(0l, offset);
+        long w_end   = std::min(nw, nw + offset);
+
+        auto delta_block = delta_mat(rows, range(w_start, w_end));
+        nda::blas::gemm(1.0, Gamma_block, F_mat(_, range(w_start - offset, w_end - offset)), 1.0, delta_block);
+      }
+    }
+  }
+
+  auto delta_wk_out = make_gf(delta_wk);
+  for (auto [w, k] : delta_wk_out.mesh())
+    for (auto [a, b] : delta_wk_out.target_indices())
+      delta_wk_out[w, k](a, b) = -0.5 * delta_mat(k.data_index() * nb2 + a * nb + b, w.data_index());
+
+  delta_wk_out /= (wmesh.beta() * kmesh.size());
+
+  delta_wk_out = mpi::all_reduce(delta_wk_out);
+
+  return delta_wk_out;
+}
+
+g_Dwk_t eliashberg_product(chi_Dwk_vt Gamma_pp, g_Dwk_vt g_wk, g_Dwk_vt delta_wk) {
+  auto Gamma_pp_const_k = make_gf<brzone>(std::get<1>(Gamma_pp.mesh()), Gamma_pp.target());
+  Gamma_pp_const_k() = 0.;
+  return eliashberg_product(Gamma_pp, Gamma_pp_const_k, g_wk, delta_wk);
+}
+
+g_Dwk_t eliashberg_product(chi_Dwk_vt Gamma_pp, chi_k_vt Gamma_pp_const_k, g_Dwk_vt g_wk, g_Dwk_vt delta_wk) {
+
+  using scalar_t = g_Dwk_t::scalar_t;
+  auto _ = all_t{};
+
+  auto wmesh = std::get<0>(delta_wk.mesh());
+  auto kmesh = std::get<1>(delta_wk.mesh());
+
+  auto gamma_wmesh = std::get<0>(Gamma_pp.mesh());
+  auto gamma_kmesh = std::get<1>(Gamma_pp.mesh());
+
+  auto tmesh = dlr_imtime(wmesh);
+  auto gamma_tmesh = dlr_imtime(gamma_wmesh);
+
+  if (tmesh.size() != gamma_tmesh.size())
+      TRIQS_RUNTIME_ERROR << "The size of the DLR imaginary time mesh of Gamma"
+          " (" << gamma_tmesh.size() << ") must be the size of the mesh of Delta (" <<
+          tmesh.size() << ").";
+
+  if (Gamma_pp_const_k.mesh() != gamma_kmesh)
+      TRIQS_RUNTIME_ERROR << "The momentum meshes of the dynamic and constant parts of Gamma differ.";
+
+  auto F_wk = eliashberg_g_delta_g_product(g_wk, delta_wk);
+
+  // The frequency convolution is a product in imaginary time,
+  // while the momentum convolution is performed as an explicit sum.
+  // The part of Gamma that is constant in frequency is a delta function
+  // in imaginary time that DLR can not represent. It is subtracted before
+  // the DLR fit and contracted with F(tau = 0) as a separate static term.
+
+  long nt = tmesh.size();
+  long nk = kmesh.size();
+  long nb = delta_wk.target_shape()[0];
+
+  auto kq_idx = momentum_difference_table(kmesh, gamma_kmesh);
+
+  // Every rank transforms its share of the momentum points, the sum over q
+  // needs Gamma and F at all points, which are gathered in one reduction.
+
+  nda::array<scalar_t, 6> Gamma_tk = nda::zeros<scalar_t>(nt, nk, Gamma_pp.target_shape()[0], Gamma_pp.target_shape()[1],
+                                                          Gamma_pp.target_shape()[2], Gamma_pp.target_shape()[3]);
+  nda::array<scalar_t, 4> F_tk     = nda::zeros<scalar_t>(nt, nk, F_wk.target_shape()[0], F_wk.target_shape()[1]);
+  nda::array<scalar_t, 3> F0_k     = nda::zeros<scalar_t>(nk, nb, nb);
+
+  auto k_arr = mpi_view(kmesh);
+#pragma omp parallel for
+  for (unsigned int idx = 0; idx < k_arr.size(); idx++) {
+    auto &k   = k_arr[idx];
+    long kidx = k.data_index();
+
+    auto Gamma_w = make_gf<dlr_imfreq>(gamma_wmesh, Gamma_pp.target());
+    auto F_w     = make_gf<dlr_imfreq>(wmesh, F_wk.target());
+
+    Gamma_w = Gamma_pp[_, k];
+    F_w     = F_wk[_, k];
+
+    for (auto w : gamma_wmesh) Gamma_w.data()(w.data_index(), range::ellipsis()) -= Gamma_pp_const_k.data()(k.data_index(), range::ellipsis());
+
+    auto F_c = make_gf_dlr(F_w);
+    auto F0  = F_c(0);
+    for (auto [a, b] : F_wk.target_indices()) F0_k(kidx, a, b) = F0(a, b);
+
+    Gamma_tk(range::all, kidx, range::ellipsis()) = make_gf_dlr_imtime(make_gf_dlr(Gamma_w)).data();
+    F_tk(range::all, kidx, range::ellipsis())     = make_gf_dlr_imtime(F_c).data();
+  }
+
+  Gamma_tk = mpi::all_reduce(Gamma_tk);
+  F_tk     = mpi::all_reduce(F_tk);
+  F0_k     = mpi::all_reduce(F0_k);
+
   auto delta_wk_out = make_gf(delta_wk);
   delta_wk_out *= 0.;
 
   auto arr = mpi_view(kmesh);
 #pragma omp parallel for
-  for (int kidx = 0; kidx < arr.size(); kidx++) {
-      auto &k = arr[kidx];
-      for (auto w : wmesh) {
-        for (auto [n, q] : delta_wk.mesh())
-          for (auto [c, a, d, b] : Gamma_pp.target_indices())
-            delta_wk_out[w, k](a, b) += -0.5 * Gamma_pp(w - n, k - q)(c, a, d, b) * F_wk[n, q](d, c);
+  for (unsigned int idx = 0; idx < arr.size(); idx++) {
+    auto &k = arr[idx];
+    long kidx = k.data_index();
+
+    auto delta_t = make_gf<dlr_imtime>(tmesh, delta_wk.target());
+    delta_t *= 0.;
+
+    for (long tidx = 0; tidx < nt; tidx++)
+      for (long qidx = 0; qidx < nk; qidx++) {
+        auto Gamma = Gamma_tk(tidx, kq_idx(kidx, qidx), range::ellipsis());
+        auto F     = F_tk(tidx, qidx, range::ellipsis());
+        for (auto [c, a, d, b] : Gamma_pp.target_indices())
+          delta_t.data()(tidx, a, b) += -0.5 * Gamma(c, a, d, b) * F(d, c);
       }
-  }
 
-  delta_wk_out /= (wmesh.beta() * kmesh.size());
+    delta_t /= kmesh.size();
+
+    delta_wk_out[_, k] = make_gf_dlr_imfreq(make_gf_dlr(delta_t));
+
+    nda::array<scalar_t, 2> delta_const(nb, nb);
+    delta_const() = 0.;
+    for (long qidx = 0; qidx < nk; qidx++) {
+      auto Gamma = Gamma_pp_const_k.data()(kq_idx(kidx, qidx), range::ellipsis());
+      for (auto [c, a, d, b] : Gamma_pp.target_indices())
+        delta_const(a, b) += -0.5 * Gamma(c, a, d, b) * F0_k(qidx, d, c);
+    }
+    delta_const /= kmesh.size();
+
+    for (auto w : wmesh) delta_wk_out.data()(w.data_index(), kidx, _, _) += delta_const;
+  }
 
   delta_wk_out = mpi::all_reduce(delta_wk_out);
 
@@ -360,4 +595,64 @@ chi_wk_t construct_phi_wk(chi_wk_vt chi, array_contiguous_view<std::complex<doub
   return phi_wk;
 }
 
+// Helper function computing Gamma = U_d_fact * U_d + U_m_fact * U_m
+//   + conj(phi_d_fact * Phi_d + phi_m_fact * Phi_m)  (with the first and third index swapped)
+// with Phi = U chi U, without storing Phi
+
+chi_wk_t construct_gamma_rpa_wk(chi_wk_vt chi_d, chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d,
+                                array_contiguous_view<std::complex<double>, 4> U_m, double U_d_fact, double U_m_fact,
+                                double phi_d_fact, double phi_m_fact) {
+
+  using scalar_t = chi_wk_t::scalar_t;
+
+  size_t nb = chi_d.target_shape()[0];
+
+  if (chi_d.mesh() != chi_m.mesh())
+    TRIQS_RUNTIME_ERROR << "The meshes of the density and magnetic susceptibilities must be equal.";
+
+  auto gamma_wk = make_gf(chi_d);
+  gamma_wk *= 0;
+
+  array<scalar_t, 4> U_const = U_d_fact * U_d + U_m_fact * U_m;
+
+  // PH grouping of the vertex, from cc+cc+, permuting the last two indices.
+  auto U_d_matrix = make_matrix_view(group_indices_view(U_d, idx_group<0, 1>, idx_group<3, 2>));
+  auto U_m_matrix = make_matrix_view(group_indices_view(U_m, idx_group<0, 1>, idx_group<3, 2>));
+
+  auto meshes_mpi = mpi_view(gamma_wk.mesh());
+
+#pragma omp parallel for
+  for (unsigned int idx = 0; idx < meshes_mpi.size(); idx++){
+      auto &[w, k] = meshes_mpi[idx];
+
+      array<scalar_t, 4> phi_arr{nb, nb, nb, nb};
+      array<scalar_t, 4> chi_d_arr{chi_d[w, k]};
+      array<scalar_t, 4> chi_m_arr{chi_m[w, k]};
+
+      // PH grouping of the vertex, from cc+cc+, permuting the last two indices.
+      auto phi_matrix = make_matrix_view(group_indices_view(phi_arr, idx_group<0, 1>, idx_group<3, 2>));
+      // PH grouping of the susceptibilites, from c+cc+c, permuting the last two indices.
+      auto chi_d_matrix = make_matrix_view(group_indices_view(chi_d_arr, idx_group<0, 1>, idx_group<3, 2>));
+      auto chi_m_matrix = make_matrix_view(group_indices_view(chi_m_arr, idx_group<0, 1>, idx_group<3, 2>));
+
+      phi_matrix = phi_d_fact * U_d_matrix * chi_d_matrix * U_d_matrix + phi_m_fact * U_m_matrix * chi_m_matrix * U_m_matrix;
+
+      auto gamma = gamma_wk[w, k];
+      for (auto [i, j, l, m] : gamma_wk.target_indices()) gamma(i, j, l, m) = std::conj(phi_arr(l, j, i, m)) + U_const(i, j, l, m);
+  }
+  gamma_wk = mpi::all_reduce(gamma_wk);
+
+  return gamma_wk;
+}
+
+chi_wk_t construct_gamma_singlet_rpa_wk(chi_wk_vt chi_d, chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d,
+                                        array_contiguous_view<std::complex<double>, 4> U_m) {
+  return construct_gamma_rpa_wk(chi_d, chi_m, U_d, U_m, 0.5, 1.5, 1.0, 3.0);
+}
+
+chi_wk_t construct_gamma_triplet_rpa_wk(chi_wk_vt chi_d, chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d,
+                                        array_contiguous_view<std::complex<double>, 4> U_m) {
+  return construct_gamma_rpa_wk(chi_d, chi_m, U_d, U_m, -0.5, 0.5, -1.0, -1.0);
+}
+
 } // namespace triqs_tprf
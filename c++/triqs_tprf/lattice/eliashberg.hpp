@@ -42,6 +42,9 @@ namespace triqs_tprf {
 
      by summation.
 
+     The summation is performed as a matrix product for each bosonic frequency
+     transfer, using a precomputed index table for the momentum transfer.
+
      @param Gamma_pp particle-particle vertex :math:`\Gamma^{\mathrm{s/t}}_{a\bar{b}c\bar{d}}(i\nu_n,\mathbf{k})`
      @param g_wk single particle Green's function :math:`G_{a\bar{b}}(i\nu_n,\mathbf{k})`
      @param delta_wk superconducting gap :math:`\Delta^{\mathrm{s/t}, \mathrm{in}}_{\bar{a}\bar{b}}(i\nu_n,\mathbf{k})`
@@ -50,6 +53,26 @@ namespace triqs_tprf {
   */
 
   g_wk_t eliashberg_product(chi_wk_vt Gamma_pp, g_wk_vt g_wk, g_wk_vt delta_wk);
+  g_Dwk_t eliashberg_product(chi_Dwk_vt Gamma_pp, g_Dwk_vt g_wk, g_Dwk_vt delta_wk);
+
+ /** Linearized Eliashberg product via summation on DLR meshes
+
+     The frequency convolution is performed as a product in DLR imaginary time.
+     The part of the vertex that is constant in frequency, e.g. the bare
+     interaction in RPA vertices, is a delta function in imaginary time that can
+     not be represented by DLR. It is subtracted from the vertex and added as a
+     separate static term. The overload without ``Gamma_pp_const_k`` assumes
+     that the vertex decays to zero at large frequencies.
+
+     @param Gamma_pp particle-particle vertex :math:`\Gamma^{\mathrm{s/t}}_{a\bar{b}c\bar{d}}(i\nu_n,\mathbf{k})`, including the constant part
+     @param Gamma_pp_const_k part of the vertex that is constant in frequency :math:`\Gamma^{\mathrm{s/t}}_{a\bar{b}c\bar{d}}(\mathbf{k})`
+     @param g_wk single particle Green's function :math:`G_{a\bar{b}}(i\nu_n,\mathbf{k})`
+     @param delta_wk superconducting gap :math:`\Delta^{\mathrm{s/t}, \mathrm{in}}_{\bar{a}\bar{b}}(i\nu_n,\mathbf{k})`
+     @return Gives the result of the product :math:`\Delta^{\mathrm{s/t}, \mathrm{out}}`
+
+  */
+
+  g_Dwk_t eliashberg_product(chi_Dwk_vt Gamma_pp, chi_k_vt Gamma_pp_const_k, g_Dwk_vt g_wk, g_Dwk_vt delta_wk);
 
  /** Linearized Eliashberg product via FFT
 
@@ -197,4 +220,71 @@ namespace triqs_tprf {
 
   */
   chi_wk_t construct_phi_wk(chi_wk_vt chi, array_contiguous_view<std::complex<double>, 4> U);
+
+  /** Computes the irreducible singlet vertex in the RPA limit directly from the susceptibilities.
+
+    The irreducible singlet vertex is given by
+
+    .. math::
+        \Gamma^{\text{s}}_{a\overline{b}c\overline{d}}(Q=0, K, K') \equiv
+        \frac{1}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{d}}
+        +
+        \frac{3}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{m}}
+        +
+        \text{Complex Conjugate}
+        \left[
+        3 
+        \Phi^{\text{m}}_{c\overline{b}a\overline{d}}(K-K')
+        +
+        \Phi^{\text{d}}_{c\overline{b}a\overline{d}}(K-K')
+        \right]
+        \,,
+
+    with the reducible ladder vertices :math:`\Phi^{\text{d/m}} = U^{\text{d/m}}\chi^{\text{d/m}}U^{\text{d/m}}`,
+    see :meth:`construct_phi_wk`. The reducible ladder vertices are computed on the fly
+    for every frequency and momentum and are never stored.
+
+    @param chi_d density susceptibility  :math:`\chi^{\mathrm{d}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+    @param chi_m magnetic susceptibility  :math:`\chi^{\mathrm{m}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+    @param U_d density local and static vertex  :math:`U^{\mathrm{d}}_{a\bar{b}c\bar{d}}`
+    @param U_m magnetic local and static vertex  :math:`U^{\mathrm{m}}_{a\bar{b}c\bar{d}}`
+    @return The irreducible singlet vertex :math:`\Gamma^{\mathrm{s}}(i\omega_n,\mathbf{q})`
+
+  */
+  chi_wk_t construct_gamma_singlet_rpa_wk(chi_wk_vt chi_d, chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d,
+                                          array_contiguous_view<std::complex<double>, 4> U_m);
+
+  /** Computes the irreducible triplet vertex in the RPA limit directly from the susceptibilities.
+
+    The irreducible triplet vertex is given by
+
+    .. math::
+        \Gamma^{\text{t}}_{a\overline{b}c\overline{d}}(Q=0, K, K') \equiv
+        -
+        \frac{1}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{d}}
+        +
+        \frac{1}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{m}} 
+        +
+        \text{Complex Conjugate}
+        \left[
+        -
+        \Phi^{\text{m}}_{c\overline{b}a\overline{d}}(K-K')
+        -
+        \Phi^{\text{d}}_{c\overline{b}a\overline{d}}(K-K')
+        \right]
+        \,,
+
+    with the reducible ladder vertices :math:`\Phi^{\text{d/m}} = U^{\text{d/m}}\chi^{\text{d/m}}U^{\text{d/m}}`,
+    see :meth:`construct_phi_wk`. The reducible ladder vertices are computed on the fly
+    for every frequency and momentum and are never stored.
+
+    @param chi_d density susceptibility  :math:`\chi^{\mathrm{d}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+    @param chi_m magnetic susceptibility  :math:`\chi^{\mathrm{m}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+    @param U_d density local and static vertex  :math:`U^{\mathrm{d}}_{a\bar{b}c\bar{d}}`
+    @param U_m magnetic local and static vertex  :math:`U^{\mathrm{m}}_{a\bar{b}c\bar{d}}`
+    @return The irreducible triplet vertex :math:`\Gamma^{\mathrm{t}}(i\omega_n,\mathbf{q})`
+
+  */
+  chi_wk_t construct_gamma_triplet_rpa_wk(chi_wk_vt chi_d, chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d,
+                                          array_contiguous_view<std::complex<double>, 4> U_m);
 }
@@ -20,11 +20,16 @@
  ******************************************************************************/
 
 #include <nda/linalg.hpp>
+#include <nda/linalg/eigenelements.hpp>
 using nda::inverse;
 
 #include "gf.hpp"
+#include "lattice_utility.hpp"
 
 #include <omp.h>
+#include <cmath>
+#include <algorithm>
+#include <limits>
 #include "../mpi.hpp"
 #include "fourier.hpp"
 
@@ -38,22 +43,79 @@ namespace triqs_tprf {
 // ----------------------------------------------------
 // g
 
-template<typename g_t, typename mesh_t>  
-g_t lattice_dyson_g0_Xk(double mu, e_k_cvt e_k, mesh_t mesh) {
+namespace {
 
-  auto I = nda::eye<ek_vt::scalar_t>(e_k.target_shape()[0]);
-  g_t g0_wk({mesh, e_k.mesh()}, e_k.target_shape());
-  g0_wk() = 0.0;
+  // Dyson equation G(w, k) = [z(w) - e(k)]^{-1} in the eigenbasis of e(k)
+  //
+  //   G_ab(w, k) = sum_n U_an(k) U*_bn(k) / (z(w) - e_n(k))
+  //
+  // diagonalizing e(k) once per k and assembling all frequencies
+  // with one matrix product (nw x nb) * (nb x nb^2) per k.
+
+  template <typename g_t> void lattice_dyson_eigenbasis(g_t &g_wk, array<dcomplex, 1> const &z, e_k_cvt e_k) {
+
+    auto _  = all_t{};
+    int nb  = e_k.target_shape()[0];
+    long nw = z.size();
 
-  auto arr = mpi_view(g0_wk.mesh());
+    g_wk() = 0.0;
 
+    auto arr = mpi_view(e_k.mesh());
 #pragma omp parallel for
-  for (unsigned int idx = 0; idx < arr.size(); idx++) {
-    auto &[w, k] = arr[idx];
-    g0_wk[w, k] = inverse((w + mu)*I - e_k[k]);      
+    for (unsigned int idx = 0; idx < arr.size(); idx++) {
+      auto &k = arr[idx];
+
+      matrix<dcomplex> e_mat = e_k[k];
+      auto g_data            = g_wk.data()(_, k.data_index(), _, _);
+
+      double herm_dev = 0.;
+      for (int a : range(nb))
+        for (int b : range(nb)) herm_dev = std::max(herm_dev, std::abs(e_mat(a, b) - std::conj(e_mat(b, a))));
+
+      if (herm_dev > 1e-12) { // Not hermitian, no eigenbasis
+        auto I = nda::eye<dcomplex>(nb);
+        for (long widx = 0; widx < nw; widx++) {
+          matrix<dcomplex> g = inverse(z(widx) * I - e_mat);
+          for (int a : range(nb))
+            for (int b : range(nb)) g_data(widx, a, b) = g(a, b);
+        }
+        continue;
+      }
+
+      auto [eps, U] = linalg::eigenelements(e_mat);
+
+      matrix<dcomplex> P(nb, nb * nb);
+      for (int n : range(nb))
+        for (int a : range(nb))
+          for (int b : range(nb)) P(n, a * nb + b) = U(a, n) * std::conj(U(b, n));
+
+      matrix<dcomplex> D(nw, nb);
+      for (long widx = 0; widx < nw; widx++)
+        for (int n : range(nb)) D(widx, n) = 1. / (z(widx) - eps(n));
+
+      matrix<dcomplex> G = D * P;
+
+      for (long widx = 0; widx < nw; widx++)
+        for (int a : range(nb))
+          for (int b : range(nb)) g_data(widx, a, b) = G(widx, a * nb + b);
+    }
+
+    g_wk = mpi::all_reduce(g_wk);
+  }
+
+  template <typename mesh_t> array<dcomplex, 1> dyson_frequencies(mesh_t const &mesh, double mu, dcomplex idelta = 0.) {
+    array<dcomplex, 1> z(mesh.size());
+    for (auto w : mesh) z(w.data_index()) = w + idelta + mu;
+    return z;
   }
 
-  g0_wk = mpi::all_reduce(g0_wk);
+} // namespace
+
+template<typename g_t, typename mesh_t>  
+g_t lattice_dyson_g0_Xk(double mu, e_k_cvt e_k, mesh_t mesh) {
+
+  g_t g0_wk({mesh, e_k.mesh()}, e_k.target_shape());
+  lattice_dyson_eigenbasis(g0_wk, dyson_frequencies(mesh, mu), e_k);
   return g0_wk;
 }
 
@@ -70,19 +132,8 @@ g_Dwk_t lattice_dyson_g0_wk(double mu, e_k_cvt e_k, mesh::dlr_imfreq mesh) {
 
 g_fk_t lattice_dyson_g0_fk(double mu, e_k_cvt e_k, mesh::refreq mesh, double delta) {
 
-  auto I = nda::eye<ek_vt::scalar_t>(e_k.target_shape()[0]);
   g_fk_t g0_fk({mesh, e_k.mesh()}, e_k.target_shape());
-  g0_fk() = 0.0;
-  std::complex<double> idelta(0.0, delta);
-
-  auto arr = mpi_view(g0_fk.mesh());
-#pragma omp parallel for
-  for (int idx = 0; idx < arr.size(); idx++) {
-    auto &[f, k] = arr[idx];
-    g0_fk[f, k]  = inverse((f + idelta + mu) * I - e_k[k]);
-  }
-
-  g0_fk = mpi::all_reduce(g0_fk);
+  lattice_dyson_eigenbasis(g0_fk, dyson_frequencies(mesh, mu, std::complex<double>(0.0, delta)), e_k);
   return g0_fk;
 }
 
@@ -99,11 +150,29 @@ g_t lattice_dyson_g_Xk(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0.){
   }();
 
   using scalar_t = e_k_cvt::scalar_t;
-  auto I = nda::eye<scalar_t>(e_k.target_shape()[0]);
+  int nb = e_k.target_shape()[0];
+  auto I = nda::eye<scalar_t>(nb);
   
   std::complex<double> idelta(0.0, delta);
 
   g_t g_wk({freqmesh, e_k.mesh()}, e_k.target_shape());
+
+  // -- A local self energy proportional to the identity commutes with e(k),
+  // -- use the eigenbasis of e(k) with the shifted frequencies w + mu - sigma(w)
+
+  if constexpr (sigma_t::arity == 1) {
+    double dev = 0.;
+    for (auto w : freqmesh)
+      for (auto [a, b] : sigma.target_indices()) dev = std::max(dev, std::abs(sigma[w](a, b) - (a == b ? sigma[w](0, 0) : dcomplex(0.))));
+
+    if (dev < 1e-12) {
+      auto z = dyson_frequencies(freqmesh, mu, idelta);
+      for (auto w : freqmesh) z(w.data_index()) -= sigma[w](0, 0);
+      lattice_dyson_eigenbasis(g_wk, z, e_k);
+      return g_wk;
+    }
+  }
+
   g_wk() = 0.0;
 
   auto arr = mpi_view(g_wk.mesh());
@@ -115,7 +184,10 @@ g_t lattice_dyson_g_Xk(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0.){
     if constexpr (sigma_t::arity == 1) sigmaterm = sigma[w];
     else sigmaterm = sigma[w, k];
 
-    g_wk[w, k] = inverse((w + idelta + mu)*I - e_k[k] - sigmaterm);
+    if (nb == 1) 
+      g_wk[w, k](0, 0) = 1. / (w + idelta + mu - e_k[k](0, 0) - sigmaterm(0, 0));
+    else
+      g_wk[w, k] = inverse((w + idelta + mu)*I - e_k[k] - sigmaterm);
   }
 
   g_wk = mpi::all_reduce(g_wk);
@@ -149,8 +221,33 @@ g_fk_t lattice_dyson_g_fk(double mu, e_k_cvt e_k, g_f_cvt sigma_f, double delta)
 
 // ----------------------------------------------------
 
+namespace {
+
+  // Normalized momentum weights, uniform if k_weights is empty
+
+  array<double, 1> normalized_k_weights(e_k_cvt e_k, array<double, 1> const &k_weights) {
+
+    long nk = e_k.mesh().size();
+
+    array<double, 1> weights(nk);
+    weights() = 1. / nk;
+    if (k_weights.size() == 0) return weights;
+
+    if (k_weights.size() != nk)
+      TRIQS_RUNTIME_ERROR << "lattice_dyson_g_w: k_weights has " << k_weights.size() << " entries, the k-mesh has " << nk << " points.\n";
+
+    double norm = sum(k_weights);
+    if (!(norm > 0.)) TRIQS_RUNTIME_ERROR << "lattice_dyson_g_w: The sum of k_weights is not positive.\n";
+
+    weights = k_weights;
+    weights /= norm;
+    return weights;
+  }
+
+} // namespace
+
 template<typename g_t, typename g_kt, typename sigma_t>
-g_t lattice_dyson_g_X(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0.){
+g_t lattice_dyson_g_X(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0., array<double, 1> const &k_weights = {}){
 
   auto const &freqmesh = [&sigma]() -> auto & {
     if constexpr (sigma_t::arity == 1)
@@ -167,6 +264,8 @@ g_t lattice_dyson_g_X(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0.){
   g_t g_w(freqmesh, e_k.target_shape());
   g_w() = 0.0;
 
+  auto weights = normalized_k_weights(e_k, k_weights);
+
   // No threading over momentum (k) in order avoid a
   // race condition in the accumulation to g_w[w] += ...
   
@@ -174,6 +273,9 @@ g_t lattice_dyson_g_X(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0.){
   for (unsigned int idx = 0; idx < arr.size(); idx++) {
     auto &k = arr[idx];
 
+    double w_k = weights(k.data_index());
+    if (w_k == 0.) continue;
+
 #pragma omp parallel for
     for (unsigned int widx = 0; widx < freqmesh.size(); widx++) {
       auto w = *std::next(freqmesh.begin(), widx);
@@ -182,12 +284,11 @@ g_t lattice_dyson_g_X(double mu, e_k_cvt e_k, sigma_t sigma, double delta=0.){
       if constexpr (sigma_t::arity == 1) sigmaterm = sigma[w];
       else sigmaterm = sigma[w, k];
 
-      g_w[w] += inverse((w + idelta + mu)*I - e_k[k] - sigmaterm);
+      g_w[w] += w_k * inverse((w + idelta + mu)*I - e_k[k] - sigmaterm);
     }
   }
   
   g_w = mpi::all_reduce(g_w);
-  g_w /= e_k.mesh().size();
   return g_w;
 }
 
@@ -203,6 +304,316 @@ g_f_t lattice_dyson_g_f(double mu, e_k_cvt e_k, g_f_cvt sigma_f, double delta) {
   return lattice_dyson_g_X<g_f_t, g_fk_t, g_f_cvt>(mu, e_k, sigma_f, delta);
 }
 
+g_w_t lattice_dyson_g_w(double mu, e_k_cvt e_k, g_w_cvt sigma_w, array<double, 1> k_weights) {
+  return lattice_dyson_g_X<g_w_t, g_wk_t, g_w_cvt>(mu, e_k, sigma_w, 0., k_weights);
+}
+
+g_Dw_t lattice_dyson_g_w(double mu, e_k_cvt e_k, g_Dw_cvt sigma_w, array<double, 1> k_weights) {
+  return lattice_dyson_g_X<g_Dw_t, g_Dwk_t, g_Dw_cvt>(mu, e_k, sigma_w, 0., k_weights);
+}
+
+g_f_t lattice_dyson_g_f(double mu, e_k_cvt e_k, g_f_cvt sigma_f, double delta, array<double, 1> k_weights) {
+  return lattice_dyson_g_X<g_f_t, g_fk_t, g_f_cvt>(mu, e_k, sigma_f, delta, k_weights);
+}
+
+// ----------------------------------------------------
+// local Green's function, density matrix and first moment in one k-pass
+
+std::tuple<g_w_t, matrix<dcomplex>, matrix<dcomplex>> lattice_dyson_g_w_moments(double mu, e_k_cvt e_k, g_w_cvt sigma_w,
+                                                                             array<double, 1> k_weights, matrix<dcomplex> sigma_inf) {
+
+  auto _      = all_t{};
+  auto wmesh  = sigma_w.mesh();
+  int nb      = e_k.target_shape()[0];
+  double beta = wmesh.beta();
+  auto I      = nda::eye<dcomplex>(nb);
+
+  if (sigma_inf.shape() != std::array<long, 2>{nb, nb}) TRIQS_RUNTIME_ERROR << "lattice_dyson_g_w_moments: sigma_inf has the wrong shape.\n";
+
+  auto weights = normalized_k_weights(e_k, k_weights);
+
+  // -- The Green's function of e(k) + sigma_inf is used as reference
+  // -- in the tail corrected Matsubara sum of the density
+
+  g_w_t g_w(wmesh, e_k.target_shape());
+  g_w_t g_ref_w(wmesh, e_k.target_shape());
+  g_w()     = 0.0;
+  g_ref_w() = 0.0;
+
+  matrix<dcomplex> rho_ref(nb, nb), e_loc(nb, nb);
+  rho_ref() = 0.;
+  e_loc()   = 0.;
+
+  // No threading over momentum (k), see lattice_dyson_g_X
+
+  auto arr = mpi_view(e_k.mesh());
+  for (unsigned int idx = 0; idx < arr.size(); idx++) {
+    auto &k = arr[idx];
+
+    double w_k = weights(k.data_index());
+    if (w_k == 0.) continue;
+
+    matrix<dcomplex> e_mat = e_k[k];
+    matrix<dcomplex> h_ref = e_mat + sigma_inf;
+    auto [xi, U]           = linalg::eigenelements(h_ref);
+
+    matrix<dcomplex> f_U = U;
+    for (int n : range(nb)) f_U(_, n) *= fermi(beta * (xi(n) - mu));
+
+    e_loc += w_k * e_mat;
+    rho_ref += w_k * f_U * dagger(U);
+
+#pragma omp parallel for
+    for (unsigned int widx = 0; widx < wmesh.size(); widx++) {
+      auto w = *std::next(wmesh.begin(), widx);
+
+      matrix<dcomplex> g_U = U;
+      for (int n : range(nb)) g_U(_, n) *= 1. / (w + mu - xi(n));
+
+      g_w[w] += w_k * inverse((w + mu) * I - e_mat - sigma_w[w]);
+      g_ref_w[w] += w_k * g_U * dagger(U);
+    }
+  }
+
+  g_w     = mpi::all_reduce(g_w);
+  g_ref_w = mpi::all_reduce(g_ref_w);
+  rho_ref = mpi::all_reduce(rho_ref);
+  e_loc   = mpi::all_reduce(e_loc);
+
+  matrix<dcomplex> rho = rho_ref;
+  for (auto w : wmesh) rho += (g_w[w] - g_ref_w[w]) / beta;
+
+  matrix<dcomplex> m1 = e_loc + sigma_inf - mu * I;
+
+  return {g_w, rho, m1};
+}
+
+std::tuple<g_w_t, matrix<dcomplex>, matrix<dcomplex>> lattice_dyson_g_w_moments(double mu, e_k_cvt e_k, g_w_cvt sigma_w,
+                                                                             array<double, 1> k_weights) {
+
+  // -- Static limit of the self energy estimated from the boundary frequencies of the mesh
+
+  auto wmesh   = sigma_w.mesh();
+  auto w_first = *wmesh.begin();
+  auto w_last  = *std::next(wmesh.begin(), wmesh.size() - 1);
+
+  matrix<dcomplex> sigma_inf = 0.5 * (sigma_w[w_first] + sigma_w[w_last]);
+  sigma_inf                  = 0.5 * (sigma_inf + dagger(sigma_inf));
+
+  return lattice_dyson_g_w_moments(mu, e_k, sigma_w, k_weights, sigma_inf);
+}
+
+std::tuple<g_w_t, matrix<dcomplex>, matrix<dcomplex>> lattice_dyson_g_w_moments(double mu, e_k_cvt e_k, g_w_cvt sigma_w) {
+  return lattice_dyson_g_w_moments(mu, e_k, sigma_w, array<double, 1>{});
+}
+
+// ----------------------------------------------------
+// density and its chemical potential derivative
+
+std::tuple<double, double> density_from_dyson(double mu, e_k_cvt e_k, g_wk_cvt sigma_wk) {
+
+  auto wmesh = std::get<0>(sigma_wk.mesh());
+  auto kmesh = std::get<1>(sigma_wk.mesh());
+
+  if (kmesh != e_k.mesh()) TRIQS_RUNTIME_ERROR << "density_from_dyson: k-space meshes are not the same.\n";
+
+  int nb      = e_k.target_shape()[0];
+  double beta = wmesh.beta();
+  auto I      = nda::eye<std::complex<double>>(nb);
+
+  auto w_first = *wmesh.begin();
+  auto w_last  = *std::next(wmesh.begin(), wmesh.size() - 1);
+
+  double N = 0., dN = 0.;
+
+  auto arr = mpi_view(kmesh);
+#pragma omp parallel for reduction(+ : N, dN)
+  for (unsigned int idx = 0; idx < arr.size(); idx++) {
+    auto &k = arr[idx];
+
+    // -- Reference Hamiltonian including the static limit of the self energy,
+    // its Green's function has the same 1/iw tail as G and known sums
+
+    matrix<std::complex<double>> sigma_inf = 0.5 * (sigma_wk[w_first, k] + sigma_wk[w_last, k]);
+    matrix<std::complex<double>> h_ref     = e_k[k] + 0.5 * (sigma_inf + dagger(sigma_inf));
+    auto xi                                = linalg::eigenvalues(h_ref);
+
+    std::complex<double> n_k = 0., dn_k = 0.;
+
+    for (auto w : wmesh) {
+      matrix<std::complex<double>> g = inverse((w + mu) * I - e_k[k] - sigma_wk[w, k]);
+      matrix<std::complex<double>> gg = g * g;
+      for (int a : range(nb)) {
+        std::complex<double> g_ref = 1. / (w + mu - xi(a));
+        n_k += g(a, a) - g_ref;
+        dn_k += -gg(a, a) + g_ref * g_ref;
+      }
+    }
+
+    N += n_k.real() / beta;
+    dN += dn_k.real() / beta;
+
+    for (int a : range(nb)) {
+      double f = fermi(beta * (xi(a) - mu));
+      N += f;
+      dN += beta * f * (1. - f);
+    }
+  }
+
+  N  = mpi::all_reduce(N) / kmesh.size();
+  dN = mpi::all_reduce(dN) / kmesh.size();
+  return {N, dN};
+}
+
+std::tuple<double, double> density_from_dyson(double mu, e_k_cvt e_k, g_Dwk_cvt sigma_wk) {
+
+  auto wmesh = std::get<0>(sigma_wk.mesh());
+  auto kmesh = std::get<1>(sigma_wk.mesh());
+
+  if (kmesh != e_k.mesh()) TRIQS_RUNTIME_ERROR << "density_from_dyson: k-space meshes are not the same.\n";
+
+  int nb = e_k.target_shape()[0];
+  auto I = nda::eye<std::complex<double>>(nb);
+
+  double N = 0., dN = 0.;
+
+  auto arr = mpi_view(kmesh);
+#pragma omp parallel for reduction(+ : N, dN)
+  for (unsigned int idx = 0; idx < arr.size(); idx++) {
+    auto &k = arr[idx];
+
+    auto g_w  = make_gf<dlr_imfreq>({wmesh}, sigma_wk.target());
+    auto gg_w = make_gf<dlr_imfreq>({wmesh}, sigma_wk.target());
+
+    for (auto w : wmesh) {
+      matrix<std::complex<double>> g = inverse((w + mu) * I - e_k[k] - sigma_wk[w, k]);
+      g_w[w]                         = g;
+      gg_w[w]                        = g * g;
+    }
+
+    auto rho  = density(make_gf_dlr(g_w));
+    auto drho = density(make_gf_dlr(gg_w));
+    for (int a : range(nb)) {
+      N += rho(a, a).real();
+      dN += -drho(a, a).real();
+    }
+  }
+
+  N  = mpi::all_reduce(N) / kmesh.size();
+  dN = mpi::all_reduce(dN) / kmesh.size();
+  return {N, dN};
+}
+
+// ----------------------------------------------------
+// chemical potential for a given density
+
+namespace {
+
+  // Newton search for N(mu) = N_target, falling back to bisection
+  // once the root is bracketed and the Newton step leaves the bracket.
+  // The search never leaves [mu_lower, mu_upper].
+
+  template <typename density_t>
+  double find_mu_newton_bisection(density_t density, double N_target, double mu, double tol, int max_iter, double mu_lower, double mu_upper) {
+
+    if (!(mu_lower < mu_upper)) TRIQS_RUNTIME_ERROR << "find_mu_for_density: Empty chemical potential range [" << mu_lower << ", " << mu_upper << "].\n";
+
+    double mu_min = mu_lower;
+    double mu_max = mu_upper;
+    double step   = 1.0;
+    bool below = false, above = false; // N_target crossed from below / above
+
+    mu = std::clamp(mu, mu_lower, mu_upper);
+
+    for (int iter = 0; iter < max_iter; iter++) {
+
+      auto [N, dN] = density(mu);
+      double r     = N - N_target;
+
+      if (std::abs(r) < tol) return mu;
+
+      if (r > 0.) {
+        mu_max = mu;
+        above  = true;
+      } else {
+        mu_min = mu;
+        below  = true;
+      }
+
+      double mu_new   = dN > 0. ? mu - r / dN : std::numeric_limits<double>::quiet_NaN();
+      bool bracketed  = std::isfinite(mu_min) && std::isfinite(mu_max);
+      bool newton_ok  = mu_new > mu_min && mu_new < mu_max && (bracketed || std::abs(mu_new - mu) <= step);
+
+      if (!newton_ok) {
+        if (bracketed) {
+          mu_new = 0.5 * (mu_min + mu_max);
+        } else {
+          mu_new = r > 0. ? mu - step : mu + step;
+          step *= 2.;
+        }
+      }
+
+      if (mu_max - mu_min < std::numeric_limits<double>::epsilon() * std::max(1., std::abs(mu))) {
+        if (!(below && above))
+          TRIQS_RUNTIME_ERROR << "find_mu_for_density: The density N = " << N_target << " is not attained for mu in [" << mu_lower << ", "
+                              << mu_upper << "].\n";
+        return mu_new;
+      }
+
+      mu = mu_new;
+    }
+
+    TRIQS_RUNTIME_ERROR << "find_mu_for_density: No convergence in " << max_iter << " iterations.\n";
+  }
+
+} // namespace
+
+double find_mu_for_density(e_k_cvt e_k, double beta, double N, double mu0, double tol, int max_iter, double mu_min, double mu_max) {
+
+  int nb = e_k.target_shape()[0];
+  auto kmesh = e_k.mesh();
+
+  // -- Band energies, computed once and shared by all mu evaluations
+
+  array<double, 2> eps_kn(kmesh.size(), nb);
+  eps_kn() = 0.;
+
+  auto arr = mpi_view(kmesh);
+#pragma omp parallel for
+  for (unsigned int idx = 0; idx < arr.size(); idx++) {
+    auto &k = arr[idx];
+    matrix<std::complex<double>> e_mat = e_k[k];
+    eps_kn(k.data_index(), range::all) = linalg::eigenvalues(e_mat);
+  }
+
+  eps_kn = mpi::all_reduce(eps_kn);
+
+  auto density = [&](double mu) -> std::tuple<double, double> {
+    double n = 0., dn = 0.;
+#pragma omp parallel for reduction(+ : n, dn)
+    for (long kidx = 0; kidx < eps_kn.extent(0); kidx++) {
+      for (int a : range(nb)) {
+        double f = fermi(beta * (eps_kn(kidx, a) - mu));
+        n += f;
+        dn += beta * f * (1. - f);
+      }
+    }
+    return {n / kmesh.size(), dn / kmesh.size()};
+  };
+
+  return find_mu_newton_bisection(density, N, mu0, tol, max_iter, mu_min, mu_max);
+}
+
+double find_mu_for_density(e_k_cvt e_k, g_wk_cvt sigma_wk, double N, double mu0, double tol, int max_iter, double mu_min, double mu_max) {
+  auto density = [&](double mu) { return density_from_dyson(mu, e_k, sigma_wk); };
+  return find_mu_newton_bisection(density, N, mu0, tol, max_iter, mu_min, mu_max);
+}
+
+double find_mu_for_density(e_k_cvt e_k, g_Dwk_cvt sigma_wk, double N, double mu0, double tol, int max_iter, double mu_min, double mu_max) {
+  auto density = [&](double mu) { return density_from_dyson(mu, e_k, sigma_wk); };
+  return find_mu_newton_bisection(density, N, mu0, tol, max_iter, mu_min, mu_max);
+}
+
 // ----------------------------------------------------
 // Transformations: real space <-> reciprocal space 
   
@@ -20,6 +20,8 @@
  ******************************************************************************/
 #pragma once
 
+#include <limits>
+
 #include "../types.hpp"
 
 namespace triqs_tprf {
@@ -266,6 +268,140 @@ namespace triqs_tprf {
  */
   g_f_t lattice_dyson_g_f(double mu, e_k_cvt e_k, g_f_cvt sigma_f, double delta);
 
+  /** Construct an interacting Matsubara frequency local lattice Green's function :math:`G_{a\bar{b}}(i\omega_n)` using momentum weights
+   
+ Computes
+
+ .. math::
+    G_{a\bar{b}}(i\omega_n) = \sum_\mathbf{k} w_\mathbf{k} \left[
+    (i\omega_n + \mu ) \cdot \mathbf{1}  - \epsilon(\mathbf{k}) - \Sigma(i\omega_n)
+    \right]^{-1}_{a\bar{b}},
+
+ with the momentum weights :math:`w_\mathbf{k}` normalized to one. Points with zero
+ weight are skipped, e.g. when summing over an irreducible wedge of the Brillouin zone.
+ The momentum resolved Green's function is never stored.
+
+ @param mu chemical potential :math:`\mu`
+ @param e_k discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+ @param sigma_w imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n)`
+ @param k_weights weights :math:`w_\mathbf{k}` of the momentum mesh points
+ @return Matsubara frequency local lattice Green's function $G_{a\bar{b}}(i\omega_n)$
+ */
+  g_w_t lattice_dyson_g_w(double mu, e_k_cvt e_k, g_w_cvt sigma_w, array<double, 1> k_weights);
+  g_Dw_t lattice_dyson_g_w(double mu, e_k_cvt e_k, g_Dw_cvt sigma_w, array<double, 1> k_weights);
+  g_f_t lattice_dyson_g_f(double mu, e_k_cvt e_k, g_f_cvt sigma_f, double delta, array<double, 1> k_weights);
+
+  /** Local lattice Green's function, density matrix and first moment in one pass over momentum
+   
+ Computes the local Green's function :math:`G_{a\bar{b}}(i\omega_n)` of ``lattice_dyson_g_w``
+ (with optional momentum weights :math:`w_\mathbf{k}`), together with the local density matrix
+
+ .. math::
+    \rho_{a\bar{b}} = \sum_\mathbf{k} w_\mathbf{k} \frac{1}{\beta} \sum_n
+    G_{a\bar{b}}(i\omega_n, \mathbf{k}) e^{i\omega_n 0^+}
+
+ and the first moment :math:`M^{(1)}` of the high frequency expansion
+ :math:`G(i\omega_n) = \mathbf{1}/i\omega_n + M^{(1)}/(i\omega_n)^2 + \ldots`,
+
+ .. math::
+    M^{(1)} = \sum_\mathbf{k} w_\mathbf{k} \epsilon(\mathbf{k}) + \Sigma(\infty) - \mu \cdot \mathbf{1} \, .
+
+ The Matsubara sum is tail corrected using the Green's function of
+ :math:`\epsilon(\mathbf{k}) + \Sigma(\infty)` as reference. Unless it is passed
+ as ``sigma_inf``, :math:`\Sigma(\infty)` is estimated as the Hermitian part of the
+ average of :math:`\Sigma` at the first and last frequency of the mesh. :math:`M^{(1)}`
+ inherits the error of this finite mesh estimate directly, and the reference density
+ matrix, and with it the accuracy of the tail correction of :math:`\rho`, also depends on it.
+ The momentum resolved Green's function is never stored.
+
+ @param mu chemical potential :math:`\mu`
+ @param e_k discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+ @param sigma_w imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n)`
+ @param k_weights weights :math:`w_\mathbf{k}` of the momentum mesh points (uniform if omitted or empty)
+ @param sigma_inf static limit :math:`\Sigma_{\bar{a}b}(\infty)` of the self-energy (estimated from the mesh if omitted)
+ @return Tuple of the local Green's function :math:`G_{a\bar{b}}(i\omega_n)`, the density matrix :math:`\rho_{a\bar{b}}` and the first moment :math:`M^{(1)}_{a\bar{b}}`
+ */
+  std::tuple<g_w_t, matrix<dcomplex>, matrix<dcomplex>> lattice_dyson_g_w_moments(double mu, e_k_cvt e_k, g_w_cvt sigma_w,
+                                                                                 array<double, 1> k_weights, matrix<dcomplex> sigma_inf);
+  std::tuple<g_w_t, matrix<dcomplex>, matrix<dcomplex>> lattice_dyson_g_w_moments(double mu, e_k_cvt e_k, g_w_cvt sigma_w,
+                                                                                 array<double, 1> k_weights);
+  std::tuple<g_w_t, matrix<dcomplex>, matrix<dcomplex>> lattice_dyson_g_w_moments(double mu, e_k_cvt e_k, g_w_cvt sigma_w);
+
+  /** Total density and its chemical potential derivative from the Dyson equation
+
+ Computes
+
+ .. math::
+    N(\mu) = \frac{1}{N_k} \sum_{\mathbf{k}} \frac{1}{\beta} \sum_{n}
+    \text{Tr} \, G(i\omega_n, \mathbf{k}) e^{i\omega_n 0^+}
+    \, , \quad
+    \frac{dN}{d\mu} = - \frac{1}{N_k} \sum_{\mathbf{k}} \frac{1}{\beta} \sum_{n}
+    \text{Tr} \, G^2(i\omega_n, \mathbf{k})
+
+ with :math:`G(i\omega_n, \mathbf{k}) = [(i\omega_n + \mu) \cdot \mathbf{1} - \epsilon(\mathbf{k}) - \Sigma(i\omega_n, \mathbf{k})]^{-1}`,
+ without storing :math:`G`. The Matsubara sums are tail corrected using the
+ Green's function of :math:`\epsilon(\mathbf{k}) + \Sigma(\infty, \mathbf{k})`
+ as reference, for which the sums are known analytically.
+
+ @param mu chemical potential :math:`\mu`
+ @param e_k discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+ @param sigma_wk imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n, \mathbf{k})`
+ @return Tuple of the total density :math:`N` and its derivative :math:`dN/d\mu`
+ */
+  std::tuple<double, double> density_from_dyson(double mu, e_k_cvt e_k, g_wk_cvt sigma_wk);
+  std::tuple<double, double> density_from_dyson(double mu, e_k_cvt e_k, g_Dwk_cvt sigma_wk);
+
+  /** Chemical potential for a given total density of a non-interacting (or static mean-field) lattice
+
+ Solves :math:`N(\mu) = N` for :math:`\mu` with
+
+ .. math::
+    N(\mu) = \frac{1}{N_k} \sum_{\mathbf{k}, n} f(\epsilon_n(\mathbf{k}) - \mu)
+
+ where :math:`\epsilon_n(\mathbf{k})` are the band energies of :math:`\epsilon(\mathbf{k})`,
+ which are computed once. A static (Hartree-Fock) self energy is included by adding it to
+ :math:`\epsilon(\mathbf{k})`. Uses Newton steps with a bisection fallback, restricted to
+ :math:`\mu_{min} \le \mu \le \mu_{max}`. An error is raised if :math:`N` is not attained in this range.
+
+ @param e_k discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+ @param beta inverse temperature :math:`\beta`
+ @param N target total density :math:`N`
+ @param mu0 initial chemical potential
+ @param tol tolerance in the total density
+ @param max_iter maximal number of iterations
+ @param mu_min lower bound of the chemical potential search range
+ @param mu_max upper bound of the chemical potential search range
+ @return Chemical potential :math:`\mu`
+ */
+  double find_mu_for_density(e_k_cvt e_k, double beta, double N, double mu0 = 0., double tol = 1e-10, int max_iter = 200,
+                             double mu_min = -std::numeric_limits<double>::infinity(),
+                             double mu_max = std::numeric_limits<double>::infinity());
+
+  /** Chemical potential for a given total density from the Dyson equation
+
+ Solves :math:`N(\mu) = N` for :math:`\mu`, evaluating :math:`N(\mu)` and :math:`dN/d\mu` with
+ the tail corrected Matsubara sums of ``density_from_dyson``, without constructing
+ :math:`G`. Uses Newton steps with a bisection fallback, restricted to
+ :math:`\mu_{min} \le \mu \le \mu_{max}`. An error is raised if :math:`N` is not
+ attained in this range. The Green's function can then be constructed once, using e.g. ``lattice_dyson_g_wk``.
+
+ @param e_k discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+ @param sigma_wk imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n, \mathbf{k})`
+ @param N target total density :math:`N`
+ @param mu0 initial chemical potential
+ @param tol tolerance in the total density
+ @param max_iter maximal number of iterations
+ @param mu_min lower bound of the chemical potential search range
+ @param mu_max upper bound of the chemical potential search range
+ @return Chemical potential :math:`\mu`
+ */
+  double find_mu_for_density(e_k_cvt e_k, g_wk_cvt sigma_wk, double N, double mu0 = 0., double tol = 1e-10, int max_iter = 200,
+                             double mu_min = -std::numeric_limits<double>::infinity(),
+                             double mu_max = std::numeric_limits<double>::infinity());
+  double find_mu_for_density(e_k_cvt e_k, g_Dwk_cvt sigma_wk, double N, double mu0 = 0., double tol = 1e-10, int max_iter = 200,
+                             double mu_min = -std::numeric_limits<double>::infinity(),
+                             double mu_max = std::numeric_limits<double>::infinity());
+
   /** Inverse fast fourier transform of imaginary frequency Green's function from k-space to real space
 
     Computes: :math:`G_{a\bar{b}}(i\omega_n, \mathbf{r}) = \mathcal{F}^{-1} \left\{G_{a\bar{b}}(i\omega_n, \mathbf{k})\right\}`
@@ -32,6 +32,10 @@
 #include "gf.hpp"
 #include "chi_imtime.hpp"
 
+// -- For the Hilbert transform in g0w_dynamic_sigma
+#include "../fourier/fourier_common.hpp"
+#include <fftw3.h>
+
 namespace triqs_tprf {
 
   e_k_t rho_k_from_g_wk(g_wk_cvt g_wk) {
@@ -258,49 +262,177 @@ namespace triqs_tprf {
   // g0w_sigma via spectral representation
   // dynamic part ...
 
-  g_f_t g0w_dynamic_sigma(double mu, double beta, e_k_cvt e_k, chi_fk_cvt W_fk, chi_k_cvt v_k, double delta, mesh::brzone::value_t kpoint) {
+  // The frequency integral
+  //
+  //   S(f) = \sum_{f'} A(f') / (f + f' - e + i\delta)
+  //
+  // on the uniform real frequency mesh f_i = f_0 + i df depends only on i + j
+  // and is computed as a convolution of the reversed and zero padded spectral
+  // weight A with the kernel K(m) = 1 / (2 f_0 + m df - e + i\delta) using
+  // FFTs of length L = 2 N_f. The spectral weight
+  //
+  //   A(f') = W_spec(f') [ n_B(f') + n_F(e) ]
+  //
+  // is split into W_spec n_B and W_spec, whose transforms only depend on q.
+
+  namespace {
+
+    struct g0w_spectral_t {
+      long nf, L;
+      double f0, df;
+      nda::array<dcomplex, 3> W1_q, W2_q; // (q, L, a * nb + b)
+    };
+
+    g0w_spectral_t g0w_spectral(double beta, chi_fk_cvt W_fk, chi_k_cvt v_k) {
+
+      auto _     = all_t{};
+      auto fmesh = std::get<0>(W_fk.mesh());
+      auto kmesh = std::get<1>(W_fk.mesh());
+      long nb    = W_fk.target_shape()[0];
+      long nf    = fmesh.size();
+      int L      = 2 * nf;
+
+      g0w_spectral_t s{nf, L, double(*fmesh.begin()), fmesh.delta(), nda::zeros<dcomplex>(kmesh.size(), L, nb * nb),
+                       nda::zeros<dcomplex>(kmesh.size(), L, nb * nb)};
+
+      auto plan = [&]() {
+        nda::array<dcomplex, 2> in(L, nb * nb), out(L, nb * nb);
+        return fourier::_fourier_base_plan(in, out, 1, &L, nb * nb, FFTW_FORWARD);
+      }();
+
+      auto arr = mpi_view(kmesh);
+#pragma omp parallel for
+      for (unsigned int qidx = 0; qidx < arr.size(); qidx++) {
+        auto &q = arr[qidx];
 
-  if (std::get<1>(W_fk.mesh()) != e_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
-  if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
+        nda::array<dcomplex, 2> in1(L, nb * nb), in2(L, nb * nb), out(L, nb * nb);
+        in1() = 0.0;
+        in2() = 0.0;
 
-  auto fmesh = std::get<0>(W_fk.mesh());
-  auto kmesh = e_k.mesh();
-  int nb     = e_k.target().shape()[0];
+        for (auto fp : fmesh) {
+          long j    = nf - 1 - fp.data_index();
+          double nB = bose(fp * beta);
+          for (int a : range(nb)) {
+            for (int b : range(nb)) {
+              auto W_spec        = -1.0 / M_PI * (W_fk[fp, q](a, a, b, b) - v_k[q](a, a, b, b)).imag();
+              in1(j, a * nb + b) = W_spec * nB;
+              in2(j, a * nb + b) = W_spec;
+            }
+          }
+        }
 
-  std::complex<double> idelta(0.0, delta);
+        fourier::_fourier_base(in1, out, plan);
+        s.W1_q(q.data_index(), _, _) = out;
+        fourier::_fourier_base(in2, out, plan);
+        s.W2_q(q.data_index(), _, _) = out;
+      }
 
-  g_f_t sigma_f(fmesh, e_k.target_shape());
-  sigma_f() = 0.0;
+      s.W1_q = mpi::all_reduce(s.W1_q);
+      s.W2_q = mpi::all_reduce(s.W2_q);
+      return s;
+    }
 
-  for (auto q : kmesh) {
-    auto qpoint   = mesh::brzone::value_t{q};
-    auto kpqpoint = qpoint + kpoint;
-    auto kpqvec = std::array<double, 3>{kpqpoint(0), kpqpoint(1), kpqpoint(2)};
+    // Dynamic G0W self energy at one k-point, eig_kq(q_data_index) returns
+    // the eigenvalues (relative to mu) and eigenvectors of e(k + q)
 
-    array<std::complex<double>, 2> e_kq_mat(e_k(kpqvec) - mu);
-    auto eig_kq = linalg::eigenelements(e_kq_mat);
-    auto ekq    = eig_kq.first;
-    auto Ukq    = eig_kq.second;
+    template <typename eig_kq_t>
+    array<dcomplex, 3> g0w_dynamic_sigma_hilbert(g0w_spectral_t const &s, double beta, double delta, long nb, long nk, eig_kq_t eig_kq,
+                                                 fourier::fourier_plan &plan_K, fourier::fourier_plan &plan_S) {
 
-    for (int l : range(nb)) {
+      auto _ = all_t{};
+      dcomplex idelta(0.0, delta);
 
-      for (auto f : fmesh) {
+      nda::array<dcomplex, 2> K(s.L, nb), K_hat(s.L, nb), S_hat(s.L, nb * nb), S(s.L, nb * nb);
+      S_hat() = 0.0;
 
-        for (auto fp : fmesh) {
+      for (long qidx = 0; qidx < nk; qidx++) {
+        auto const &[ekq, Ukq] = eig_kq(qidx);
 
-          auto num = bose(fp * beta) + fermi(ekq(l) * beta);
-          auto den = f + idelta + fp - ekq(l);
+        K() = 0.0;
+        for (int l : range(nb))
+          for (long m = 0; m < 2 * s.nf - 1; m++) K(m, l) = 1.0 / (2 * s.f0 + m * s.df - ekq(l) + idelta);
+        fourier::_fourier_base(K, K_hat, plan_K);
 
-          for (auto [a, b] : sigma_f.target_indices()) {
-            auto W_spec = -1.0 / M_PI * (W_fk[fp, q](a, a, b, b) - v_k[q](a, a, b, b)).imag();
-            sigma_f[f](a, b) = sigma_f[f](a, b) 
-                  + Ukq(a, l) * dagger(Ukq)(l, b) * (W_spec * num / den * fmesh.delta() / kmesh.size());
+        for (int l : range(nb)) {
+          double nF = fermi(ekq(l) * beta);
+          for (int a : range(nb)) {
+            for (int b : range(nb)) {
+              long ab     = a * nb + b;
+              dcomplex UU = Ukq(a, l) * std::conj(Ukq(b, l));
+              S_hat(_, ab) += UU * K_hat(_, l) * (s.W1_q(qidx, _, ab) + nF * s.W2_q(qidx, _, ab));
+            }
           }
         }
       }
+
+      fourier::_fourier_base(S_hat, S, plan_S);
+
+      array<dcomplex, 3> sigma(s.nf, nb, nb);
+      for (long i = 0; i < s.nf; i++)
+        for (int a : range(nb))
+          for (int b : range(nb)) sigma(i, a, b) = S(i + s.nf - 1, a * nb + b) * s.df / (nk * s.L);
+
+      return sigma;
     }
-  }
 
+    auto g0w_fft_plans(long L, long nb) {
+      int L_int = L;
+      nda::array<dcomplex, 2> K(L, nb), K_hat(L, nb), S_hat(L, nb * nb), S(L, nb * nb);
+      auto plan_K = fourier::_fourier_base_plan(K, K_hat, 1, &L_int, nb, FFTW_FORWARD);
+      auto plan_S = fourier::_fourier_base_plan(S_hat, S, 1, &L_int, nb * nb, FFTW_BACKWARD);
+      return std::make_pair(std::move(plan_K), std::move(plan_S));
+    }
+
+    // Eigenpairs of e(k + q) - mu, with e(k + q) interpolated on the mesh of e_k
+    auto eigenelements_at_kpq(double mu, e_k_cvt e_k, std::array<double, 3> kvec, mesh::brzone::value_t qpoint) {
+      auto kpqvec = std::array<double, 3>{kvec[0] + qpoint(0), kvec[1] + qpoint(1), kvec[2] + qpoint(2)};
+      array<dcomplex, 2> e_kq_mat(e_k(kpqvec));
+      for (long a : range(e_kq_mat.shape()[0])) e_kq_mat(a, a) -= mu;
+      return linalg::eigenelements(e_kq_mat);
+    }
+
+    auto eigenelements_at_kpq(double mu, e_k_cvt e_k, mesh::brzone::value_t kpoint, mesh::brzone::value_t qpoint) {
+      return eigenelements_at_kpq(mu, e_k, std::array<double, 3>{kpoint(0), kpoint(1), kpoint(2)}, qpoint);
+    }
+
+    // Eigenpairs of e(k) - mu for all points k of the mesh of e_k
+    auto eigenelements_on_mesh(double mu, e_k_cvt e_k) {
+      auto _  = all_t{};
+      long nk = e_k.mesh().size();
+      long nb = e_k.target().shape()[0];
+
+      using eig_t = decltype(linalg::eigenelements(std::declval<array<dcomplex, 2> &>()));
+      std::vector<eig_t> eig(nk);
+#pragma omp parallel for
+      for (long kidx = 0; kidx < nk; kidx++) {
+        array<dcomplex, 2> e_mat(e_k.data()(kidx, _, _));
+        for (long a : range(nb)) e_mat(a, a) -= mu;
+        eig[kidx] = linalg::eigenelements(e_mat);
+      }
+      return eig;
+    }
+
+  } // namespace
+
+  g_f_t g0w_dynamic_sigma(double mu, double beta, e_k_cvt e_k, chi_fk_cvt W_fk, chi_k_cvt v_k, double delta, mesh::brzone::value_t kpoint) {
+
+  if (std::get<1>(W_fk.mesh()) != e_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
+  if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
+
+  auto fmesh = std::get<0>(W_fk.mesh());
+  auto kmesh = e_k.mesh();
+  long nb    = e_k.target().shape()[0];
+
+  auto s                = g0w_spectral(beta, W_fk, v_k);
+  auto [plan_K, plan_S] = g0w_fft_plans(s.L, nb);
+
+  std::vector<mesh::brzone::value_t> qpoints;
+  for (auto q : kmesh) qpoints.push_back(mesh::brzone::value_t{q});
+
+  auto eig_kq = [&](long qidx) { return eigenelements_at_kpq(mu, e_k, kpoint, qpoints[qidx]); };
+
+  g_f_t sigma_f(fmesh, e_k.target_shape());
+  sigma_f.data() = g0w_dynamic_sigma_hilbert(s, beta, delta, nb, kmesh.size(), eig_kq, plan_K, plan_S);
   return sigma_f;
   }
 
@@ -309,7 +441,27 @@ namespace triqs_tprf {
   if (std::get<1>(W_fk.mesh()) != e_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
   if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
 
+  auto _     = all_t{};
   auto fmesh = std::get<0>(W_fk.mesh());
+  auto qmesh = e_k.mesh();
+  long nb    = e_k.target().shape()[0];
+  long nq    = qmesh.size();
+
+  auto s                = g0w_spectral(beta, W_fk, v_k);
+  auto [plan_K, plan_S] = g0w_fft_plans(s.L, nb);
+
+  // -- Eigenpairs of e(k + q), computed once per momentum mesh point when
+  // -- k + q is on the mesh of e_k and otherwise by interpolation
+
+  bool on_mesh = (kmesh == qmesh);
+
+  std::vector<mesh::brzone::value_t> qpoints;
+  for (auto q : qmesh) qpoints.push_back(mesh::brzone::value_t{q});
+
+  decltype(eigenelements_on_mesh(mu, e_k)) eig_mesh;
+  if (on_mesh) eig_mesh = eigenelements_on_mesh(mu, e_k);
+
+  auto dims = qmesh.dims();
 
   g_fk_t sigma_fk({fmesh, kmesh}, e_k.target_shape());
   sigma_fk() = 0.0;
@@ -319,54 +471,187 @@ namespace triqs_tprf {
   for (unsigned int kidx = 0; kidx < arr.size(); kidx++) {
     auto &k      = arr[kidx];
     auto kpoint  = mesh::brzone::value_t{k};
-    auto sigma_f = g0w_dynamic_sigma(mu, beta, e_k, W_fk, v_k, delta, kpoint);
-    for (auto f : fmesh) { sigma_fk[f, k] = sigma_f[f]; }
+
+    std::vector<long> kq_idx(nq);
+    if (on_mesh) {
+      for (auto q : qmesh) {
+        auto kq = k.index();
+        for (int i = 0; i < 3; i++) kq[i] = (kq[i] + q.index()[i]) % dims[i];
+        kq_idx[q.data_index()] = qmesh.to_data_index(kq);
+      }
+    }
+
+    auto eig_kq = [&](long qidx) { return on_mesh ? eig_mesh[kq_idx[qidx]] : eigenelements_at_kpq(mu, e_k, kpoint, qpoints[qidx]); };
+
+    auto sigma_f = g0w_dynamic_sigma_hilbert(s, beta, delta, nb, nq, eig_kq, plan_K, plan_S);
+    sigma_fk.data()(_, k.data_index(), _, _) = sigma_f;
   }
 
   sigma_fk = mpi::all_reduce(sigma_fk);
   return sigma_fk;
   }
 
+  array<std::complex<double>, 4> g0w_dynamic_sigma_on_kpoints(double mu, double beta, e_k_cvt e_k, chi_fk_cvt W_fk, chi_k_cvt v_k, double delta,
+                                                               array<double, 2> kpoints) {
+
+    if (std::get<1>(W_fk.mesh()) != e_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_dynamic_sigma_on_kpoints: k-space meshes are not the same.\n";
+    if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_dynamic_sigma_on_kpoints: k-space meshes are not the same.\n";
+
+    auto _     = all_t{};
+    auto fmesh = std::get<0>(W_fk.mesh());
+    auto qmesh = e_k.mesh();
+    long nk    = kpoints.shape()[0];
+    long nb    = e_k.target().shape()[0];
+    long nq    = qmesh.size();
+
+    // -- The spectral function of W and the FFT plans are shared by all points
+
+    auto s                = g0w_spectral(beta, W_fk, v_k);
+    auto [plan_K, plan_S] = g0w_fft_plans(s.L, nb);
+
+    std::vector<mesh::brzone::value_t> qpoints;
+    for (auto q : qmesh) qpoints.push_back(mesh::brzone::value_t{q});
+
+    array<dcomplex, 4> sigma = nda::zeros<dcomplex>(fmesh.size(), nk, nb, nb);
+
+    mpi::communicator comm;
+    auto slice = itertools::chunk_range(0, nk, comm.size(), comm.rank());
+
+#pragma omp parallel for
+    for (long kidx = slice.first; kidx < slice.second; kidx++) {
+      auto kvec   = std::array<double, 3>{kpoints(kidx, 0), kpoints(kidx, 1), kpoints(kidx, 2)};
+      auto eig_kq = [&](long qidx) { return eigenelements_at_kpq(mu, e_k, kvec, qpoints[qidx]); };
+      sigma(_, kidx, _, _) = g0w_dynamic_sigma_hilbert(s, beta, delta, nb, nq, eig_kq, plan_K, plan_S);
+    }
+
+    sigma = mpi::all_reduce(sigma);
+    return sigma;
+  }
+
   g_fk_t g0w_dynamic_sigma(double mu, double beta, e_k_cvt e_k, chi_fk_cvt W_fk, chi_k_cvt v_k, double delta) {
   return g0w_dynamic_sigma(mu, beta, e_k, W_fk, v_k, delta, e_k.mesh());
   }
 
   // static part ...
 
+  namespace {
+
+    array<dcomplex, 2> g0w_sigma_at_kvec(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k, std::array<double, 3> kvec) {
+
+      auto kmesh = e_k.mesh();
+      long nb    = e_k.target().shape()[0];
+
+      array<dcomplex, 2> sigma_k(nb, nb);
+      sigma_k() = 0.0;
+
+      for (auto q : kmesh) {
+        auto [ekq, Ukq] = eigenelements_at_kpq(mu, e_k, kvec, mesh::brzone::value_t{q});
+
+        for (long l : range(nb)) {
+          auto f = fermi(ekq(l) * beta);
+          for (long a : range(nb)) {
+            for (long b : range(nb)) { sigma_k(a, b) -= Ukq(a, l) * std::conj(Ukq(b, l)) * v_k[q](a, a, b, b) * f / kmesh.size(); }
+          }
+        }
+      }
+
+      return sigma_k;
+    }
+
+  } // namespace
+
   array<std::complex<double>, 2> g0w_sigma(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k, mesh::brzone::value_t kpoint) {
 
   if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
 
-  auto kmesh = e_k.mesh();
-  int nb     = e_k.target().shape()[0];
+  return g0w_sigma_at_kvec(mu, beta, e_k, v_k, std::array<double, 3>{kpoint(0), kpoint(1), kpoint(2)});
+  }
 
-  array<std::complex<double>, 2> sigma_k(nb ,nb);
-  sigma_k() = 0.0;
+  array<std::complex<double>, 3> g0w_sigma_on_kpoints(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k, array<double, 2> kpoints) {
+
+    if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma_on_kpoints: k-space meshes are not the same.\n";
+
+    auto _  = all_t{};
+    long nk = kpoints.shape()[0];
+    long nb = e_k.target().shape()[0];
+
+    array<dcomplex, 3> sigma = nda::zeros<dcomplex>(nk, nb, nb);
+
+    mpi::communicator comm;
+    auto slice = itertools::chunk_range(0, nk, comm.size(), comm.rank());
+
+#pragma omp parallel for
+    for (long kidx = slice.first; kidx < slice.second; kidx++) {
+      auto kvec            = std::array<double, 3>{kpoints(kidx, 0), kpoints(kidx, 1), kpoints(kidx, 2)};
+      sigma(kidx, _, _) = g0w_sigma_at_kvec(mu, beta, e_k, v_k, kvec);
+    }
+
+    sigma = mpi::all_reduce(sigma);
+    return sigma;
+  }
+
+  // When k + q is on the mesh of e_k the static sum
+  //
+  //   Sigma_ab(k) = -1/N_k \sum_q V_aabb(q) rho_ab(k + q)
+  //
+  // is a convolution of V with the density matrix rho = U f(beta e) U^\dagger,
+  // computed once per mesh point, and is evaluated as the product
+  //
+  //   Sigma_ab(r) = -V_aabb(-r) rho_ab(r)
+  //
+  // in real space.
+
+  namespace {
+
+    e_k_t g0w_sigma_convolution(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k) {
 
-  for (auto q : kmesh) {
-    auto qpoint   = mesh::brzone::value_t{q};
-    auto kpqpoint = qpoint + kpoint;
-    auto kpqvec = std::array<double, 3>{kpqpoint(0), kpqpoint(1), kpqpoint(2)};
+      auto kmesh = e_k.mesh();
+      long nb    = e_k.target().shape()[0];
 
-    array<std::complex<double>, 2> e_kq_mat(e_k(kpqvec) - mu);
-    auto eig_kq = linalg::eigenelements(e_kq_mat);
-    auto ekq    = eig_kq.first;
-    auto Ukq    = eig_kq.second;
+      auto eig = eigenelements_on_mesh(mu, e_k);
 
-    for (int l : range(nb)) {
-      for (int a : range(nb)) {
-        for (int b : range(nb)) {
-          sigma_k(a, b) = sigma_k(a, b) - Ukq(a, l) * dagger(Ukq)(l, b) * v_k[q](a, a, b, b) * fermi(ekq(l) * beta) / kmesh.size();
+      e_k_t rho_k(kmesh, e_k.target_shape());
+      rho_k() = 0.0;
+
+#pragma omp parallel for
+      for (long kidx = 0; kidx < kmesh.size(); kidx++) {
+        auto &[ek, Uk] = eig[kidx];
+        for (long l : range(nb)) {
+          auto f = fermi(ek(l) * beta);
+          for (long a : range(nb))
+            for (long b : range(nb)) rho_k.data()(kidx, a, b) += Uk(a, l) * std::conj(Uk(b, l)) * f;
         }
       }
+
+      auto rho_r = make_gf_from_fourier(rho_k);
+      auto v_r   = make_gf_from_fourier(v_k);
+      auto rmesh = rho_r.mesh();
+      auto dims  = rmesh.dims();
+
+      e_r_t sigma_r(rmesh, e_k.target_shape());
+      sigma_r() = 0.0;
+
+      for (auto r : rmesh) {
+        auto mr = r.index();
+        for (int i = 0; i < 3; i++) mr[i] = (dims[i] - mr[i]) % dims[i];
+        long ridx = r.data_index(), mridx = rmesh.to_data_index(mr);
+
+        for (long a : range(nb))
+          for (long b : range(nb)) sigma_r.data()(ridx, a, b) = -v_r.data()(mridx, a, a, b, b) * rho_r.data()(ridx, a, b);
+      }
+
+      return make_gf_from_fourier(sigma_r);
     }
-  }
 
-  return sigma_k;
-  }
+  } // namespace
 
   e_k_t g0w_sigma(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k, mesh::brzone kmesh) {
 
+  if (kmesh == e_k.mesh()) {
+    if (e_k.mesh() != v_k.mesh()) TRIQS_RUNTIME_ERROR << "g0w_sigma: k-space meshes are not the same.\n";
+    return g0w_sigma_convolution(mu, beta, e_k, v_k);
+  }
+
   e_k_t sigma_k(kmesh, e_k.target_shape());
   sigma_k() = 0.0;
 
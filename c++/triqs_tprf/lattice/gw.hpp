@@ -166,6 +166,27 @@ namespace triqs_tprf {
 
   g_fk_t g0w_dynamic_sigma(double mu, double beta, e_k_cvt e_k, chi_fk_cvt W_fk, chi_k_cvt v_k, double delta, mesh::brzone kmesh);
 
+  /** Real frequency G0W self energy on a list of momentum points
+
+  Evaluates :math:`\Sigma_{ab}(\omega, \mathbf{k}_i)` at arbitrary momenta,
+  diagonalizing the interpolated dispersion :math:`\epsilon(\mathbf{k}_i + \mathbf{q})`
+  for every :math:`\mathbf{q}` as ``g0w_dynamic_sigma`` does for a single ``kpoint``.
+  The spectral function of :math:`W` is computed once for all points, and the
+  points are distributed over MPI ranks and OpenMP threads.
+
+  @param mu chemical potential :math:`\mu`
+  @param beta inverse temperature
+  @param e_k one-particle dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+  @param W_fk screened interaction :math:`W_{abcd}(\omega, \mathbf{k})`
+  @param v_k bare interaction :math:`V_{abcd}(\mathbf{k})`
+  @param delta broadening :math:`\delta`
+  @param kpoints momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``
+  @return self energy :math:`\Sigma_{ab}(\omega, \mathbf{k}_i)`, array of shape ``(n_\omega, n_k, n_b, n_b)``
+  */
+
+  array<std::complex<double>, 4> g0w_dynamic_sigma_on_kpoints(double mu, double beta, e_k_cvt e_k, chi_fk_cvt W_fk, chi_k_cvt v_k, double delta,
+                                                               array<double, 2> kpoints);
+
   /** Real frequency GW self energy :math:`\Sigma(\omega, \mathbf{k})` calculator via the spectral representation
 
     Computes the spectral function of the dynamic part of the screened interaction
@@ -188,6 +209,9 @@ namespace triqs_tprf {
     .. math::
        \sum_{\bar{a}b} U^\dagger_{i\bar{a}}(\mathbf{k}) \epsilon_{\bar{a}b}(\mathbf{k}) U_{bj} (\mathbf{k})
        = \delta_{ij} \epsilon_{\mathbf{k}, i}
+
+    The eigenpairs are computed once per momentum mesh point and the sum over
+    $\omega'$ is evaluated as a convolution using FFTs on the uniform real-frequency mesh.
        
     @param mu chemical potential :math:`\mu`
     @param beta inverse temperature
@@ -208,6 +232,23 @@ namespace triqs_tprf {
 
   e_k_t g0w_sigma(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k, mesh::brzone kmesh);
 
+  /** Static G0W self energy on a list of momentum points
+
+  Evaluates :math:`\Sigma_{ab}(\mathbf{k}_i)` at arbitrary momenta,
+  diagonalizing the interpolated dispersion :math:`\epsilon(\mathbf{k}_i + \mathbf{q})`
+  for every :math:`\mathbf{q}` as ``g0w_sigma`` does for a single ``kpoint``.
+  The points are distributed over MPI ranks and OpenMP threads.
+
+  @param mu chemical potential :math:`\mu`
+  @param beta inverse temperature
+  @param e_k one-particle dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+  @param v_k bare interaction :math:`V_{abcd}(\mathbf{k})`
+  @param kpoints momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``
+  @return self energy :math:`\Sigma_{ab}(\mathbf{k}_i)`, array of shape ``(n_k, n_b, n_b)``
+  */
+
+  array<std::complex<double>, 3> g0w_sigma_on_kpoints(double mu, double beta, e_k_cvt e_k, chi_k_cvt v_k, array<double, 2> kpoints);
+
   /** GW self energy :math:`\Sigma(\mathbf{k})` calculator for static interactions
 
     Computes the GW self-energy of a static interaction as the product
@@ -22,6 +22,7 @@
 
 #include <nda/nda.hpp>
 #include <nda/linalg/eigenelements.hpp>
+#include <triqs/utility/pade_approximant.hpp>
 
 #include "gw.hpp"
 #include "common.hpp"
@@ -143,6 +144,138 @@ namespace triqs_tprf {
 //  return g_fk;
 //  }
 
+  // ----------------------------------------------------
+  // Pade analytic continuation
+
+  template <typename g_out_t, typename g_in_t>
+  g_out_t pade_analytical_continuation_wk_template(g_in_t g_wk, mesh::refreq fmesh, int n_points, double freq_offset) {
+
+    auto _     = all_t{};
+    auto wmesh = std::get<0>(g_wk.mesh());
+    auto kmesh = std::get<1>(g_wk.mesh());
+
+    constexpr int rank = std::decay_t<decltype(g_wk.data())>::rank;
+    using mesh_t       = std::decay_t<decltype(wmesh)>;
+
+    double beta = wmesh.beta();
+    long ncomp  = 1;
+    for (auto n : g_wk.target_shape()) ncomp *= n;
+
+    // -- The fit uses the first n_points non-negative Matsubara frequencies
+
+    array<dcomplex, 1> z(n_points);
+    for (int n : range(n_points)) z(n) = dcomplex(0., (2 * n + (wmesh.statistic() == Fermion)) * M_PI / beta);
+
+    std::vector<long> w_idx(n_points, -1);
+    if constexpr (std::is_same_v<mesh_t, mesh::imfreq>) {
+      for (auto w : wmesh)
+        if (w.index() >= 0 && w.index() < n_points) w_idx[w.index()] = w.data_index();
+      for (auto idx : w_idx)
+        if (idx < 0) TRIQS_RUNTIME_ERROR << "pade_analytical_continuation_wk: n_points larger than the number of positive Matsubara frequencies.\n";
+    }
+
+    std::array<long, rank - 1> f_shape;
+    f_shape[0] = fmesh.size();
+    for (int i = 0; i < rank - 2; i++) f_shape[i + 1] = g_wk.target_shape()[i];
+
+    g_out_t g_fk({fmesh, kmesh}, g_wk.target_shape());
+    g_fk() = 0.0;
+
+    auto arr = mpi_view(kmesh);
+#pragma omp parallel for
+    for (unsigned int kidx = 0; kidx < arr.size(); kidx++) {
+      auto &k = arr[kidx];
+
+      array<dcomplex, 2> u(n_points, ncomp);
+
+      if constexpr (std::is_same_v<mesh_t, mesh::imfreq>) {
+        for (int n : range(n_points)) {
+          array<dcomplex, rank - 2> g_n = g_wk.data()(w_idx[n], k.data_index(), ellipsis());
+          u(n, _)                       = reshape(g_n, std::array<long, 1>{ncomp});
+        }
+      } else {
+        auto g_w = make_gf<dlr_imfreq>({wmesh}, g_wk.target());
+        g_w      = g_wk(_, k);
+        auto g_c = make_gf_dlr(g_w);
+        for (int n : range(n_points)) {
+          array<dcomplex, rank - 2> g_n = g_c(mesh::matsubara_freq(n, beta, wmesh.statistic()));
+          u(n, _)                       = reshape(g_n, std::array<long, 1>{ncomp});
+        }
+      }
+
+      array<dcomplex, 2> g_f(fmesh.size(), ncomp);
+      for (long c = 0; c < ncomp; c++) {
+        array<dcomplex, 1> u_c = u(_, c);
+        triqs::utility::pade_approximant pade(z, u_c);
+        for (auto f : fmesh) g_f(f.data_index(), c) = pade(double(f) + dcomplex(0., freq_offset));
+      }
+
+      g_fk.data()(_, k.data_index(), ellipsis()) = reshape(g_f, f_shape);
+    }
+
+    g_fk = mpi::all_reduce(g_fk);
+    return g_fk;
+  }
+
+  g_fk_t pade_analytical_continuation_wk(g_wk_cvt g_wk, mesh::refreq fmesh, int n_points, double freq_offset) {
+    return pade_analytical_continuation_wk_template<g_fk_t>(g_wk, fmesh, n_points, freq_offset);
+  }
+
+  g_fk_t pade_analytical_continuation_wk(g_Dwk_cvt g_wk, mesh::refreq fmesh, int n_points, double freq_offset) {
+    return pade_analytical_continuation_wk_template<g_fk_t>(g_wk, fmesh, n_points, freq_offset);
+  }
+
+  chi_fk_t pade_analytical_continuation_wk(chi_wk_cvt chi_wk, mesh::refreq fmesh, int n_points, double freq_offset) {
+    return pade_analytical_continuation_wk_template<chi_fk_t>(chi_wk, fmesh, n_points, freq_offset);
+  }
+
+  chi_fk_t pade_analytical_continuation_wk(chi_Dwk_cvt chi_wk, mesh::refreq fmesh, int n_points, double freq_offset) {
+    return pade_analytical_continuation_wk_template<chi_fk_t>(chi_wk, fmesh, n_points, freq_offset);
+  }
+
+  array<std::complex<double>, 3> evaluate_on_kpoints(e_k_cvt e_k, array<double, 2> kpoints) {
+
+    auto _  = all_t{};
+    long nk = kpoints.shape()[0];
+    long nb = e_k.target().shape()[0];
+
+    array<dcomplex, 3> e_out = nda::zeros<dcomplex>(nk, nb, nb);
+
+    mpi::communicator comm;
+    auto slice = itertools::chunk_range(0, nk, comm.size(), comm.rank());
+
+#pragma omp parallel for
+    for (long kidx = slice.first; kidx < slice.second; kidx++) {
+      auto kvec = std::array<double, 3>{kpoints(kidx, 0), kpoints(kidx, 1), kpoints(kidx, 2)};
+      e_out(kidx, _, _) = e_k(kvec);
+    }
+
+    e_out = mpi::all_reduce(e_out);
+    return e_out;
+  }
+
+  array<std::complex<double>, 4> evaluate_on_kpoints(g_fk_cvt g_fk, array<double, 2> kpoints) {
+
+    auto _     = all_t{};
+    auto fmesh = std::get<0>(g_fk.mesh());
+    long nk    = kpoints.shape()[0];
+    long nb    = g_fk.target().shape()[0];
+
+    array<dcomplex, 4> g_out = nda::zeros<dcomplex>(fmesh.size(), nk, nb, nb);
+
+    mpi::communicator comm;
+    auto slice = itertools::chunk_range(0, nk, comm.size(), comm.rank());
+
+#pragma omp parallel for
+    for (long kidx = slice.first; kidx < slice.second; kidx++) {
+      auto kvec = std::array<double, 3>{kpoints(kidx, 0), kpoints(kidx, 1), kpoints(kidx, 2)};
+      for (auto f : fmesh) g_out(f.data_index(), kidx, _, _) = g_fk[f, _](kvec);
+    }
+
+    g_out = mpi::all_reduce(g_out);
+    return g_out;
+  }
+
   double fermi(double e) {
     if( e < 0 ) {
       return 1. / (exp(e) + 1.);
@@ -66,6 +66,46 @@ namespace triqs_tprf {
   g_Dwk_t add_dynamic_and_static(g_Dwk_t g_dyn_wk, e_k_t g_stat_k);
   chi_Dwk_t add_dynamic_and_static(chi_Dwk_t chi_dyn_wk, chi_k_t chi_stat_k);
 
+  /** Pade analytic continuation of a lattice Green's function to real frequencies
+
+  Performs a Pade analytic continuation of every momentum and target component of
+  :math:`G(i\omega_n, \mathbf{k})`, using the first ``n_points`` non-negative
+  Matsubara frequencies, and evaluates the result at :math:`\omega + i\delta`
+  on the real frequency mesh. For DLR meshes the Matsubara frequencies are
+  obtained from the DLR coefficients. The continuation is parallellized over
+  momentum with MPI and OpenMP.
+
+  @param g_wk : Green's function :math:`G(i\omega_n, \mathbf{k})` on a Matsubara or DLR Matsubara frequency mesh.
+  @param fmesh : real frequency mesh.
+  @param n_points : number of Matsubara frequencies used in the Pade fit.
+  @param freq_offset : distance :math:`\delta` from the real axis.
+  @return g_fk : real frequency Green's function :math:`G(\omega, \mathbf{k})`.
+  */
+  g_fk_t pade_analytical_continuation_wk(g_wk_cvt g_wk, mesh::refreq fmesh, int n_points, double freq_offset);
+  g_fk_t pade_analytical_continuation_wk(g_Dwk_cvt g_wk, mesh::refreq fmesh, int n_points, double freq_offset);
+  chi_fk_t pade_analytical_continuation_wk(chi_wk_cvt chi_wk, mesh::refreq fmesh, int n_points, double freq_offset);
+  chi_fk_t pade_analytical_continuation_wk(chi_Dwk_cvt chi_wk, mesh::refreq fmesh, int n_points, double freq_offset);
+
+  /** Evaluate a momentum dependent quantity on a list of momentum points
+
+  Evaluates :math:`\epsilon_{ab}(\mathbf{k})` at arbitrary momenta using the
+  interpolation of the Brillouin zone mesh. The points are distributed over
+  MPI ranks and OpenMP threads.
+
+  @param e_k : quantity :math:`\epsilon_{ab}(\mathbf{k})` on a Brillouin zone mesh.
+  @param kpoints : momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``.
+  @return e_out : values :math:`\epsilon_{ab}(\mathbf{k}_i)`, array of shape ``(n_k, n_b, n_b)``.
+  */
+  array<std::complex<double>, 3> evaluate_on_kpoints(e_k_cvt e_k, array<double, 2> kpoints);
+
+  /** Evaluate a real frequency lattice Green's function on a list of momentum points
+
+  @param g_fk : Green's function :math:`G_{ab}(\omega, \mathbf{k})`.
+  @param kpoints : momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``.
+  @return g_out : values :math:`G_{ab}(\omega, \mathbf{k}_i)`, array of shape ``(n_\omega, n_k, n_b, n_b)``.
+  */
+  array<std::complex<double>, 4> evaluate_on_kpoints(g_fk_cvt g_fk, array<double, 2> kpoints);
+
   /** Helper function to evaluate the Fermi-Dirac distribution function
 
   .. math ::
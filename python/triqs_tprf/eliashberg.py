@@ -22,6 +22,8 @@
 #
 ################################################################################
 
+import os
+import hashlib
 import functools
 import numpy as np
 from scipy.sparse.linalg import LinearOperator
@@ -29,6 +31,8 @@ from scipy.sparse.linalg import eigs
 
 # ----------------------------------------------------------------------
 
+from h5 import HDFArchive
+import triqs.utility.mpi as mpi
 from triqs.gf import Gf
 from triqs.gf.meshes import MeshDLRImFreq
 from .lattice import eliashberg_product
@@ -49,6 +53,8 @@ def solve_eliashberg(
     solver="IRAM",
     symmetrize_fct=lambda x: x,
     k=6,
+    symmetry_subspace=None,
+    gamma_cache_dir=None,
 ):
     r""" Solve the linearized Eliashberg equation
     
@@ -84,7 +90,10 @@ def solve_eliashberg(
                           which uses Fourier transformation for optimal computational efficiency.
 
                   'SUM' : triqs_tprf.lattice.eliashberg_product, uses the explicit sum.
-                          Restrictions : wmesh of Gamma_pp_wk must be atleast twice the size of the one of g_wk.
+                          Restrictions : wmesh of Gamma_pp_wk must be atleast twice the size of the one of g_wk,
+                          when not using DLR meshes. For DLR meshes the constant part of the vertex
+                          is not fitted and must be passed as `Gamma_pp_const_k`, otherwise it is
+                          taken to be zero.
 
     solver : str, ['IRAM', 'PM'], optional
              Which eigenvalue solver shall be used:
@@ -107,6 +116,18 @@ def solve_eliashberg(
         The number of leading superconducting gaps that shall be calculated. Does
         only have an effect, if 'IRAM' is used as a solver.
 
+    symmetry_subspace : SymmetrySubspace, optional
+                        If given, the anomalous self-energy is parametrized directly
+                        by its independent elements in the symmetry sector described
+                        by this :class:`triqs_tprf.symmetries.SymmetrySubspace`.
+                        This reduces the length of the vectors handled by the
+                        eigenvalue solver and enforces the symmetry exactly.
+
+    gamma_cache_dir : str, optional
+                      Directory used to cache the preprocessed pairing vertex on disk,
+                      see :func:`preprocess_gamma_for_fft`. Only has an effect, if
+                      'FFT' is used as a product.
+
     Returns
     -------
     Es : list of float,
@@ -123,19 +144,22 @@ def solve_eliashberg(
     
     def from_x_to_wk(delta_x):
         delta_wk = g_wk.copy()
-        delta_wk.data[:] = delta_x.reshape(delta_wk.data.shape)
+        if symmetry_subspace is not None:
+            delta_wk.data[:] = symmetry_subspace.expand(delta_x)
+        else:
+            delta_wk.data[:] = delta_x.reshape(delta_wk.data.shape)
         return delta_wk
 
     def from_wk_to_x(delta_wk):
+        if symmetry_subspace is not None:
+            return symmetry_subspace.reduce(delta_wk.data)
         delta_x = delta_wk.data.copy().flatten()
         return delta_x
 
-    hasDLRMesh = type(Gamma_pp_wk.mesh.components[0]) == MeshDLRImFreq
-
     if product == "FFT":
 
         Gamma_pp_dyn_tr, Gamma_pp_const_r = preprocess_gamma_for_fft(
-            Gamma_pp_wk, Gamma_pp_const_k
+            Gamma_pp_wk, Gamma_pp_const_k, cache_dir=gamma_cache_dir
         )
 
         if np.allclose(
@@ -151,13 +175,18 @@ def solve_eliashberg(
             )
 
     elif product == "SUM":
-        if(hasDLRMesh): 
-            raise NotImplementedError(
-                "There is no implementation of the eliashberg product "
-                "called %s when using DLR. Please use the FFT product instead."%product
-            )
-
-        eli_prod = functools.partial(eliashberg_product, Gamma_pp_wk, g_wk)
+        if type(Gamma_pp_wk.mesh.components[0]) == MeshDLRImFreq:
+            # -- The constant part is a delta function in DLR imaginary time
+            # -- and is handled as a separate static term
+            Gamma_pp_const = Gf(mesh=Gamma_pp_wk.mesh.components[1], target_shape=Gamma_pp_wk.target_shape)
+            Gamma_pp_const.data[:] = 0.0
+            if isinstance(Gamma_pp_const_k, Gf):
+                Gamma_pp_const.data[:] = Gamma_pp_const_k.data
+            elif Gamma_pp_const_k is not None:
+                Gamma_pp_const.data[:] = Gamma_pp_const_k
+            eli_prod = functools.partial(eliashberg_product, Gamma_pp_wk, Gamma_pp_const, g_wk)
+        else:
+            eli_prod = functools.partial(eliashberg_product, Gamma_pp_wk, g_wk)
 
     else:
         raise NotImplementedError(
@@ -193,7 +222,7 @@ def solve_eliashberg(
     return es, eigen_modes
 
 
-def preprocess_gamma_for_fft(Gamma_pp_wk, Gamma_pp_const_k=None):
+def preprocess_gamma_for_fft(Gamma_pp_wk, Gamma_pp_const_k=None, cache_dir=None):
     r""" Prepare Gamma to be used with the FFT implementation
 
     Parameters
@@ -205,6 +234,11 @@ def preprocess_gamma_for_fft(Gamma_pp_wk, Gamma_pp_const_k=None):
                        Part of the pairing vertex that is constant in Matsubara frequency space
                        :math:`\Gamma(\mathbf{k})`. If given as a Gf its mesh attribute needs to
                        be a MeshBrZone. If not given, the constant part will be fitted.
+    cache_dir : str, optional
+                If given, the preprocessed Gamma is stored in an HDF5 file in this
+                directory, keyed by a hash of the content and meshes of
+                `Gamma_pp_wk` and `Gamma_pp_const_k`. Subsequent calls with the same
+                input load the file instead of redoing the preprocessing.
 
     Returns
     -------
@@ -217,6 +251,62 @@ def preprocess_gamma_for_fft(Gamma_pp_wk, Gamma_pp_const_k=None):
                        The constant part of Gamma with mesh attribute MeshCycLat.
     """
 
+    if cache_dir is None:
+        return _preprocess_gamma_for_fft(Gamma_pp_wk, Gamma_pp_const_k)
+
+    key = _gamma_cache_key(Gamma_pp_wk, Gamma_pp_const_k)
+    filename = os.path.join(cache_dir, "gamma_pp_%s.h5" % key)
+
+    # -- Let all ranks take the same branch as the master
+    is_cached = mpi.bcast(os.path.isfile(filename) if mpi.is_master_node() else None)
+
+    if not is_cached:
+        Gamma_pp_dyn_tr, Gamma_pp_const_r = _preprocess_gamma_for_fft(
+            Gamma_pp_wk, Gamma_pp_const_k
+        )
+
+        if mpi.is_master_node():
+            # -- Write to a temporary file and move it in place, so that an
+            # -- interrupted write never leaves a corrupt cache file behind
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_filename = "%s.%d.tmp" % (filename, os.getpid())
+            with HDFArchive(tmp_filename, "w") as arch:
+                arch["Gamma_pp_dyn_tr"] = Gamma_pp_dyn_tr
+                arch["Gamma_pp_const_r"] = Gamma_pp_const_r
+            os.replace(tmp_filename, filename)
+        mpi.barrier()
+
+        return Gamma_pp_dyn_tr, Gamma_pp_const_r
+
+    with HDFArchive(filename, "r") as arch:
+        Gamma_pp_dyn_tr = arch["Gamma_pp_dyn_tr"]
+        Gamma_pp_const_r = arch["Gamma_pp_const_r"]
+
+    return Gamma_pp_dyn_tr, Gamma_pp_const_r
+
+
+def _gamma_cache_key(Gamma_pp_wk, Gamma_pp_const_k=None):
+    """Hash of the pairing vertex input of :func:`preprocess_gamma_for_fft`"""
+
+    sha = hashlib.sha256()
+    sha.update(repr(Gamma_pp_wk.mesh).encode())
+    sha.update(repr((Gamma_pp_wk.target_shape, Gamma_pp_wk.data.dtype)).encode())
+    sha.update(np.ascontiguousarray(Gamma_pp_wk.data).tobytes())
+
+    if isinstance(Gamma_pp_const_k, Gf):
+        sha.update(repr(Gamma_pp_const_k.mesh).encode())
+        Gamma_pp_const_k = Gamma_pp_const_k.data
+    if Gamma_pp_const_k is not None:
+        Gamma_pp_const_k = np.ascontiguousarray(Gamma_pp_const_k, dtype=complex)
+        sha.update(repr(Gamma_pp_const_k.shape).encode())
+        sha.update(Gamma_pp_const_k.tobytes())
+
+    return sha.hexdigest()
+
+
+def _preprocess_gamma_for_fft(Gamma_pp_wk, Gamma_pp_const_k=None):
+    """Implementation of :func:`preprocess_gamma_for_fft` without caching"""
+
     # -- If the function has a DLR mesh we cannot use split_into_dynamic_wk_and_constant_k yet
     # TODO: implement split_into_dynamic_wk_and_constant_k for DLR-mesh Gfs
     hasDLRMesh = type(Gamma_pp_wk.mesh.components[0]) == MeshDLRImFreq
@@ -484,6 +574,11 @@ def construct_gamma_singlet_rpa(U_d, U_m, phi_d_wk, phi_m_wk):
                     The irreducible singlet vertex in the RPA limit for a symmetrized
                     calculation of the Eliashberg equation
                     :math:`\Gamma^{\mathrm{s}}(i\omega_n,\mathbf{q})`.
+
+    See Also
+    --------
+    :func:`triqs_tprf.lattice.construct_gamma_singlet_rpa_wk` : Memory efficient construction
+    directly from the density and magnetic susceptibilities.
     """
     gamma_singlet = 0.0 * phi_d_wk.copy()
 
@@ -539,6 +634,11 @@ def construct_gamma_triplet_rpa(U_d, U_m, phi_d_wk, phi_m_wk):
                     The irreducible triplet vertex in the RPA limit for a symmetrized
                     calculation of the Eliashberg equation
                     :math:`\Gamma^{\mathrm{t}}(i\omega_n,\mathbf{q})`.
+
+    See Also
+    --------
+    :func:`triqs_tprf.lattice.construct_gamma_triplet_rpa_wk` : Memory efficient construction
+    directly from the density and magnetic susceptibilities.
     """
     gamma_triplet = 0.0 * phi_d_wk.copy()
 
@@ -48,6 +48,9 @@ from triqs_tprf.lattice import \
 
 from triqs_tprf.lattice import hartree_sigma, fock_sigma
 from triqs_tprf.lattice import gw_sigma, gw_dynamic_sigma, g0w_sigma
+from triqs_tprf.lattice import g0w_dynamic_sigma
+from triqs_tprf.lattice import g0w_sigma_on_kpoints
+from triqs_tprf.lattice import g0w_dynamic_sigma_on_kpoints
 from triqs_tprf.lattice import lindhard_chi00
 
 from triqs_tprf.OperatorUtils import quartic_tensor_from_operator
@@ -106,3 +109,124 @@ def get_gw_tensor(H_int, fundamental_operators):
     U_abcd = (U_abcd + np.transpose(U_abcd, (2,3,0,1)))
 
     return U_abcd
+
+
+# ----------------------------------------------------------------------
+class G0WSigma():
+
+    r""" G0W self energy on arbitrary lists of momentum points
+
+    Computes the static G0W self energy :math:`\Sigma(\mathbf{k})` and,
+    optionally, the real frequency dynamic part :math:`\Sigma(\omega, \mathbf{k})`
+    once on the momentum mesh of ``e_k`` (with the band eigenpairs computed
+    once per mesh point) and evaluates them on arrays of momentum points,
+    e.g. band structure paths, in parallel over the points.
+
+    Momentum points on the mesh, up to reciprocal lattice vectors, are
+    looked up in the mesh self energy. For the remaining points the
+    interpolated dispersion :math:`\epsilon(\mathbf{k} + \mathbf{q})` is
+    diagonalized for every :math:`\mathbf{q}`, see ``g0w_sigma_on_kpoints``
+    and ``g0w_dynamic_sigma_on_kpoints``, so that all points agree with
+    ``g0w_sigma`` and ``g0w_dynamic_sigma`` for a single ``kpoint``.
+
+    Parameters
+    ----------
+
+    mu : float
+        Chemical potential.
+
+    beta : float
+        Inverse temperature.
+
+    e_k : TRIQS Green's function (rank 2) on a Brillouin zone mesh
+        Dispersion :math:`\epsilon_{ab}(\mathbf{k})`.
+
+    v_k : TRIQS Green's function (rank 4) on a Brillouin zone mesh
+        Bare interaction :math:`V_{abcd}(\mathbf{k})`.
+
+    W_fk : TRIQS Green's function (rank 4) on real frequency and Brillouin zone meshes, optional
+        Screened interaction :math:`W_{abcd}(\omega, \mathbf{k})`, if given
+        the dynamic self energy is also computed.
+
+    delta : float, optional
+        Broadening :math:`\delta` of the dynamic self energy.
+
+    """
+
+    def __init__(self, mu, beta, e_k, v_k, W_fk=None, delta=None):
+
+        self.mu, self.beta, self.e_k, self.v_k = mu, beta, e_k, v_k
+        self.sigma_k = g0w_sigma(mu, beta, e_k, v_k)
+
+        if W_fk is not None:
+            assert( delta is not None ), "The dynamic self energy requires delta"
+            self.W_fk, self.delta = W_fk, delta
+            self.sigma_dyn_fk = g0w_dynamic_sigma(mu, beta, e_k, W_fk, v_k, delta)
+
+    def static(self, kpoints):
+        """ Static self energy, array of shape ``(n_k, n_b, n_b)`` """
+        kpoints = self._kpoints(kpoints)
+        kidx, on_mesh = self._mesh_indices(kpoints)
+
+        sigma = np.empty((len(kpoints),) + self.sigma_k.data.shape[1:], dtype=complex)
+        sigma[on_mesh] = self.sigma_k.data[kidx[on_mesh]]
+        if not np.all(on_mesh):
+            sigma[~on_mesh] = g0w_sigma_on_kpoints(
+                self.mu, self.beta, self.e_k, self.v_k, kpoints[~on_mesh])
+        return sigma
+
+    def dynamic(self, kpoints):
+        """ Dynamic self energy, array of shape ``(n_w, n_k, n_b, n_b)`` """
+        assert( hasattr(self, 'sigma_dyn_fk') ), "No dynamic self energy, W_fk not given"
+        kpoints = self._kpoints(kpoints)
+        kidx, on_mesh = self._mesh_indices(kpoints)
+
+        shape = self.sigma_dyn_fk.data.shape
+        sigma = np.empty((shape[0], len(kpoints)) + shape[2:], dtype=complex)
+        sigma[:, on_mesh] = self.sigma_dyn_fk.data[:, kidx[on_mesh]]
+        if not np.all(on_mesh):
+            sigma[:, ~on_mesh] = g0w_dynamic_sigma_on_kpoints(
+                self.mu, self.beta, self.e_k, self.W_fk, self.v_k, self.delta, kpoints[~on_mesh])
+        return sigma
+
+    def __call__(self, kpoints):
+        """ Total self energy at the momentum points ``kpoints`` of shape ``(n_k, 3)``
+
+        Returns the static self energy if no ``W_fk`` was given and
+        otherwise the sum of the static and dynamic self energy. """
+        sigma = self.static(kpoints)
+        if hasattr(self, 'sigma_dyn_fk'):
+            sigma = sigma[None, ...] + self.dynamic(kpoints)
+        return sigma
+
+    def _mesh_indices(self, kpoints, tol=1e-9):
+        """ Mesh data indices of the momentum points and a mask of the
+        points that are on the mesh, up to reciprocal lattice vectors. """
+
+        kmesh = self.e_k.mesh
+        dims = np.array(kmesh.dims, dtype=int)
+        kvalues = np.array([k.value for k in kmesh])
+
+        # -- Mesh steps along the directions with more than one point
+        axes = [ i for i in range(3) if dims[i] > 1 ]
+        steps = np.array([ kvalues[np.ravel_multi_index(np.eye(3, dtype=int)[i], dims)] - kvalues[0]
+                           for i in axes ]).reshape(len(axes), 3)
+
+        n = np.zeros((3, len(kpoints)))
+        dk = kpoints - kvalues[0]
+        if len(axes) > 0:
+            n[axes] = np.linalg.lstsq(steps.T, dk.T, rcond=None)[0]
+        n_int = np.rint(n).astype(int)
+
+        scale = max(1., np.max(np.abs(kvalues)))
+        on_mesh = np.all(np.abs(n - n_int) < tol, axis=0)
+        on_mesh &= np.all(np.abs(n[axes].T @ steps - dk) < tol * scale, axis=1)
+
+        kidx = np.ravel_multi_index((n_int % dims[:, None]), dims)
+        return kidx, on_mesh
+
+    @staticmethod
+    def _kpoints(kpoints):
+        kpoints = np.array(kpoints, dtype=float)
+        assert( kpoints.ndim == 2 and kpoints.shape[1] == 3 ), "kpoints must have shape (n_k, 3)"
+        return kpoints
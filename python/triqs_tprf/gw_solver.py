@@ -20,10 +20,14 @@
 #
 ################################################################################
 
+import os
 import sys
+import copy
+import threading
 
 import numpy as np
 
+from h5 import HDFArchive
 from h5.formats import register_class 
 import triqs.utility.mpi as mpi
 
@@ -32,6 +36,7 @@ from triqs.gf.gf_factories import make_gf_from_fourier
 
 from triqs_tprf.lattice import lattice_dyson_g0_wk
 from triqs_tprf.lattice import lattice_dyson_g_wk
+from triqs_tprf.lattice import find_mu_for_density
 
 from triqs_tprf.lattice import rho_k_from_g_wk
 from triqs_tprf.lattice import gw_dynamic_sigma, hartree_sigma, fock_sigma
@@ -49,6 +54,10 @@ from triqs_tprf.lattice import fourier_wr_to_tr
 from triqs_tprf.lattice import chi_wr_from_chi_wk
 from triqs_tprf.lattice import chi_tr_from_chi_wr
 
+from triqs_tprf.lattice import chi0_tr_from_grt_PH
+from triqs_tprf.lattice import chi_wr_from_chi_tr
+from triqs_tprf.lattice import chi_wk_from_chi_wr
+
 from triqs_tprf.lattice import fourier_tr_to_wr
 from triqs_tprf.lattice import fourier_wr_to_wk
 
@@ -67,6 +76,39 @@ from triqs.gf.gf_factories import make_gf_dlr
 
 class GWSolver():
 
+    """ GW solver for lattice models with non-local interactions.
+
+    Parameters
+    ----------
+
+    e_k : TRIQS Greens function on a Brillouin zone mesh
+        Single-particle dispersion.
+
+    V_k : TRIQS Greens function on a Brillouin zone mesh
+        Bare interaction.
+
+    wmesh : MeshImFreq or MeshDLRImFreq
+        Fermionic frequency mesh.
+
+    mu : float, optional
+        Chemical potential (initial value when ``N_fix`` is set).
+
+    g_wk : TRIQS Greens function, optional
+        Initial Green's function (the non-interacting one if None).
+
+    N_fix : float or bool, optional
+        Fixed total density, if False the chemical potential ``mu`` is kept fixed.
+
+    N_tol : float, optional
+        Absolute tolerance on the total density :math:`N(\mu)` when
+        solving for ``mu`` at fixed density (not a tolerance on ``mu``).
+
+    mu_bracket : pair of floats, optional
+        Range ``[mu_min, mu_max]`` for the chemical potential at fixed density.
+        The solver raises if ``N_fix`` is not attained in the range.
+        If None the search is unbounded and only starts inside the band range of ``e_k``.
+
+    """
     
     def __init__(self, e_k, V_k, wmesh,
                  mu=None, g_wk=None, N_fix=False, N_tol=1e-5,
@@ -77,6 +119,8 @@ class GWSolver():
         if mpi.is_master_node():
             print(self.logo())
             print(f'beta {wmesh.beta}')
+            if type(wmesh) == MeshDLRImFreq:
+                print(f'DLR mesh')
             print(f'N_w {len(wmesh):6d}')
             print(f'N_k {len(e_k.mesh):6d}')
         
@@ -91,8 +135,10 @@ class GWSolver():
         
         if mu_bracket is None:
             self.mu_bracket = np.array([e_k.data.real.min(), e_k.data.real.max()])
+            self.mu_range = dict()
         else:
             self.mu_bracket = mu_bracket
+            self.mu_range = dict(mu_min=mu_bracket[0], mu_max=mu_bracket[1])
 
         self.g0_wk, self.mu0 = self.dyson_equation(self.mu, e_k, wmesh=wmesh, N_fix=N_fix)
         
@@ -121,11 +167,12 @@ class GWSolver():
         self.P_wr = chi_wr_from_chi_wk(self.P_wk)
         self.W_wr = chi_wr_from_chi_wk(self.W_wk)
 
+        V_k = self.V_s_k if hasattr(self, 'V_s_k') else self.V_k
         V_wk = self.W_wk.copy()
         bmesh = self.W_wk.mesh[0]
         V_wk.data[:] = 0
         for w in bmesh:
-            V_wk[w, :] = self.V_k
+            V_wk[w, :] = V_k
         self.V_wk = V_wk
         self.V_wr = chi_wr_from_chi_wk(self.V_wk)
         
@@ -202,20 +249,63 @@ class GWSolver():
         return make_gf_from_fourier(fock_sigma(V_r, rho_r))
     
         
-    @timer('GW Sigma_dyn')
-    def gw_dynamic_sigma(self, W_dyn_wk, g_wk):
- 
+    @timer('Green\'s function g_tr')
+    def calc_g_tr(self, g_wk):
         g_wr = fourier_wk_to_wr(g_wk)
         g_tr = fourier_wr_to_tr(g_wr)
-        del g_wr
+        return g_tr
+
+    
+    @timer('GW Sigma_dyn')
+    def gw_dynamic_sigma(self, W_dyn_wk, g_wk, g_tr=None, block_size=None):
+        """ Dynamic GW self energy
+
+        The interaction is transformed to imaginary time and real space
+        in blocks of the first target index, each block is contracted
+        with ``g_tr`` and discarded, so the full ``W_dyn_tr`` is never
+        stored. The peak memory of the interaction is proportional to
+        ``block_size * nb**3``.
+
+        Parameters
+        ----------
+
+        block_size : int, optional
+            Number of orbitals of the first target index of ``W_dyn_wk``
+            per block, default is all orbitals in one block.
+
+        """
+
+        if g_tr is None:
+            g_tr = self.calc_g_tr(g_wk)
+
+        nb = W_dyn_wk.target_shape[0]
+        if block_size is None: block_size = nb
+        assert( block_size >= 1 ), "block_size must be positive"
 
-        W_dyn_wr = chi_wr_from_chi_wk(W_dyn_wk)
-        W_dyn_tr = chi_tr_from_chi_wr(W_dyn_wr)
-        del W_dyn_wr
+        sigma_dyn_tr = g_tr.copy()
+        sigma_dyn_tr.data[:] = 0.
+
+        for a0 in range(0, nb, block_size):
+            a1 = min(a0 + block_size, nb)
+
+            if a1 - a0 == nb:
+                W_block_wk = W_dyn_wk
+            else:
+                W_block_wk = Gf(mesh=W_dyn_wk.mesh, target_shape=(a1 - a0, nb, nb, nb))
+                W_block_wk.data[:] = W_dyn_wk.data[..., a0:a1, :, :, :]
+
+            W_block_wr = chi_wr_from_chi_wk(W_block_wk)
+            del W_block_wk
+            W_block_tr = chi_tr_from_chi_wr(W_block_wr)
+            del W_block_wr
+
+            # -- Rows 0, ..., a1 - a0 - 1 of the result are the block rows a0, ..., a1 - 1
+            sigma_block_tr = gw_dynamic_sigma(W_block_tr, g_tr)
+            del W_block_tr
+            sigma_dyn_tr.data[..., a0:a1, :] += sigma_block_tr.data[..., :a1 - a0, :]
+            del sigma_block_tr
 
-        sigma_dyn_tr = gw_dynamic_sigma(W_dyn_tr, g_tr)
         del g_tr
-        del W_dyn_tr
 
         sigma_dyn_wr = fourier_tr_to_wr(sigma_dyn_tr)
         del sigma_dyn_tr
@@ -226,9 +316,17 @@ class GWSolver():
 
 
     @timer('Polarization P_wk')
-    def polarization(self, g_wk):
-        P_wk = -imtime_bubble_chi0_wk(
-            g_wk, nw=len(self.wmesh)//2, verbose=False)
+    def polarization(self, g_wk, g_tr=None):
+
+        if g_tr is None:
+            P_wk = -imtime_bubble_chi0_wk(
+                g_wk, nw=len(self.wmesh)//2, verbose=False)
+        else:
+            chi0_tr = chi0_tr_from_grt_PH(g_tr)
+            chi0_wr = chi_wr_from_chi_tr(chi0_tr, nw=len(self.wmesh)//2)
+            del chi0_tr
+            P_wk = -chi_wk_from_chi_wr(chi0_wr)
+            
         return P_wk
 
 
@@ -253,25 +351,119 @@ class GWSolver():
         return W_dyn_wk, W_stat_k
     
 
+    @staticmethod
+    def spin_block_gf(g, idx):
+        """ Sub block ``idx`` of the matrix valued Green's function ``g`` """
+        g_s = Gf(mesh=g.mesh, target_shape=[len(idx)]*2)
+        g_s.data[:] = g.data[..., idx[:, None], idx[None, :]]
+        return g_s
+
+
+    @staticmethod
+    def spin_block_diagonal(g, spin_blocks, tol=1e-12):
+        """ Checks that the matrix elements of ``g`` between different spin blocks vanish """
+        mask = np.ones(g.target_shape, dtype=bool)
+        for idx in spin_blocks:
+            mask[np.ix_(idx, idx)] = False
+        return np.max(np.abs(g.data[..., mask]), initial=0.) < tol
+
+
+    @staticmethod
+    def spin_block_interaction(V_k, spin_blocks, tol=1e-12):
+        r""" Spin independent interaction of a spin collinear model
+
+        Checks that the interaction :math:`V_{abcd}` only couples the
+        spin blocks as :math:`V_{\sigma\sigma\sigma'\sigma'}` with the
+        same orbital tensor for all :math:`\sigma, \sigma'` and returns
+        this orbital tensor.
+        """
+        up = spin_blocks[0]
+        ix = lambda s1, s2 : (Ellipsis,) + np.ix_(s1, s1, s2, s2)
+
+        V_s_k = Gf(mesh=V_k.mesh, target_shape=[len(up)]*4)
+        V_s_k.data[:] = V_k.data[ix(up, up)]
+
+        norm = 0.
+        for s1 in spin_blocks:
+            for s2 in spin_blocks:
+                V = V_k.data[ix(s1, s2)]
+                assert( np.max(np.abs(V - V_s_k.data)) < tol ), \
+                    "The interaction is not spin independent"
+                norm += np.sum(np.abs(V)**2)
+
+        assert( abs(norm - np.sum(np.abs(V_k.data)**2)) < tol ), \
+            "The interaction is not spin diagonal"
+
+        return V_s_k
+
+
+    @timer('GW Sigma_dyn (spin blocks)')
+    def gw_spin_block_sigma(self, g_wk, V_s_k, spin_blocks, block_size=None):
+        r""" Dynamic GW self energy of a spin collinear model
+
+        With spin independent interaction :math:`V` and spin diagonal
+        Green's function :math:`G_\sigma` the screened interaction is the
+        same for all spin combinations
+
+        .. math::
+            W = [1 - V (P_\uparrow + P_\downarrow)]^{-1} V
+
+        and the self energy is spin diagonal, :math:`\Sigma_\sigma = - W G_\sigma`.
+        Only orbital tensors (of size ``norb**4``) are stored.
+
+        The RPA solver ``solve_rpa_PH`` has no such mode. It takes a general
+        particle-hole vertex :math:`U_{abcd}`, e.g. a Kanamori interaction with
+        spin flip terms, that is not of the form :math:`V_{\sigma\sigma\sigma'\sigma'}`,
+        and the bare bubble has non-zero transverse components
+        :math:`\chi^{(0)}_{\sigma\bar{\sigma}\bar{\sigma}\sigma}`. Neither
+        reduces to one orbital tensor, so the GW loop computes its screened
+        interaction with :meth:`screened_interaction` instead.
+
+        Returns
+        -------
+
+        sigma_dyn_wk, P_wk, W_wk, W_dyn_wk
+
+        """
+
+        g_s_wk = [ self.spin_block_gf(g_wk, idx) for idx in spin_blocks ]
+        g_s_tr = [ self.calc_g_tr(g_s) for g_s in g_s_wk ]
+
+        P_wk = self.polarization(g_s_wk[0], g_tr=g_s_tr[0])
+        for g_s, g_tr in zip(g_s_wk[1:], g_s_tr[1:]):
+            P_wk += self.polarization(g_s, g_tr=g_tr)
+
+        W_wk = self.screened_interaction(P_wk, V_s_k)
+
+        W_dyn_wk = W_wk.copy()
+        for w in W_dyn_wk.mesh.components[0]:
+            W_dyn_wk[w,:] -= V_s_k
+
+        sigma_dyn_wk = g_wk.copy()
+        sigma_dyn_wk.data[:] = 0.
+        for idx, g_s, g_tr in zip(spin_blocks, g_s_wk, g_s_tr):
+            sigma_s_wk = self.gw_dynamic_sigma(W_dyn_wk, g_s, g_tr=g_tr, block_size=block_size)
+            sigma_dyn_wk.data[..., idx[:, None], idx[None, :]] = sigma_s_wk.data
+
+        return sigma_dyn_wk, P_wk, W_wk, W_dyn_wk
+
+
     @timer('Dyson equation')
     def dyson_equation(self, mu, e_k, sigma_wk=None, wmesh=None, N_fix=False):
 
         if not N_fix:
             g_wk = self._dyson_equation_dispatch(mu, e_k, sigma_wk=sigma_wk, wmesh=wmesh)
         else:
-            # -- Seek chemical potential
+            # -- Seek chemical potential, Newton warm started from mu
+            # -- with bisection fallback, then construct G once
 
-            def target_function(mu):
-                g_wk = self._dyson_equation_dispatch(mu, e_k, sigma_wk=sigma_wk, wmesh=wmesh)
-                rho_r = self.calc_rho_r(g_wk)
-                rho_loc = self.calc_rho_loc(rho_r)
-                N = self.calc_total_density(rho_loc)
-                return N - N_fix
+            mu0 = np.clip(mu, *self.mu_bracket)
 
-            from scipy.optimize import root_scalar
+            if sigma_wk is None:
+                mu = find_mu_for_density(e_k, wmesh.beta, N_fix, mu0=mu0, tol=self.N_tol, **self.mu_range)
+            else:
+                mu = find_mu_for_density(e_k, sigma_wk, N_fix, mu0=mu0, tol=self.N_tol, **self.mu_range)
 
-            sol = root_scalar(target_function, method='brentq', bracket=self.mu_bracket, rtol=self.N_tol)
-            mu = sol.root
             g_wk = self._dyson_equation_dispatch(mu, e_k, sigma_wk=sigma_wk, wmesh=wmesh)
             
         return g_wk, mu
@@ -291,15 +483,101 @@ class GWSolver():
     
     def solve_iter(self, tol=1e-7, maxiter=100,
                    hartree=True, fock=True, gw=True,
-                   verbose=True, spinless=False):
+                   verbose=True, spinless=False, mixer=None, mix='sigma',
+                   checkpoint=None, restart=False, sigma_block_size=None,
+                   spin_blocks=None):
+        """ Self-consistent solution by fixed point iteration
+
+        Parameters
+        ----------
+
+        mixer : LinearMixer or AndersonMixer, optional
+            Convergence accelerator from ``triqs_tprf.mixing``, applied to
+            the quantity selected by ``mix``. No mixing if ``None``. On a
+            Matsubara ``wmesh`` the AndersonMixer history can be kept in the
+            compact basis of ``triqs_tprf.mixing.matsubara_basis``.
+
+        mix : str, optional
+            Quantity that is mixed, either ``'sigma'`` (default) or ``'g'``.
+
+        checkpoint : str, optional
+            HDF5 file name, if given the solver state (g_wk, sigma_wk, mu
+            and the mixer history) is written every iteration. The file is
+            written by the master node in a background thread.
+
+        restart : bool, optional
+            Resume the iteration from the state in ``checkpoint``, see also
+            :meth:`restart`. The mixer history stored in the checkpoint is
+            only used when no ``mixer`` is passed.
+
+        sigma_block_size : int, optional
+            Bounds the memory of the dynamic GW self energy by transforming
+            the interaction in blocks of orbitals, see :meth:`gw_dynamic_sigma`.
+
+        spin_blocks : list of two lists of int, optional
+            Orbital indices of the spin up and spin down blocks of a spin
+            collinear model with spin independent interaction, e.g.
+            ``[[0, 2], [1, 3]]``. The polarization and screened interaction
+            are then computed and stored in the orbital (spin block)
+            representation, see :meth:`gw_spin_block_sigma`. In this mode
+            ``W_wk``, ``P_wk`` (summed over the spin blocks) and ``chi_wk``,
+            computed by ``susceptibiltiy(P_wk, W_wk)``, are tensors of the
+            orbitals of one spin block, as is the interaction ``V_s_k``
+            used by :meth:`calc_real_space`.
+
+        """
+
+        assert( mix in ['sigma', 'g'] ), f"Unknown mix option {mix}"
+        assert( checkpoint is not None or not restart ), "Restart requires a checkpoint file"
+
+        assert( not (spinless and spin_blocks is not None) ), "spinless and spin_blocks are exclusive"
+
+        if spin_blocks is not None:
+            spin_blocks = np.array(spin_blocks, dtype=int)
+            assert( spin_blocks.ndim == 2 ), "Spin blocks must have equal size"
+            assert( sorted(spin_blocks.flatten()) == list(range(self.e_k.target_shape[0])) ), \
+                "Spin blocks must partition the orbitals"
+            assert( self.spin_block_diagonal(self.e_k, spin_blocks) ), \
+                "The dispersion is not spin block diagonal"
+            self.V_s_k = self.spin_block_interaction(self.V_k, spin_blocks)
+        elif hasattr(self, 'V_s_k'):
+            del self.V_s_k
+
+        if restart:
+            state = self.read_checkpoint(checkpoint)
+            self.g_wk, self.sigma_wk, self.mu = state['g_wk'], state['sigma_wk'], state['mu']
+            if mixer is None:
+                mixer = state.get('mixer', None)
+            if spin_blocks is not None:
+                assert( self.spin_block_diagonal(self.g_wk, spin_blocks) and
+                        self.spin_block_diagonal(self.sigma_wk, spin_blocks) ), \
+                    "The checkpoint Green's function or self energy is not spin block diagonal"
+            iter_start = int(state['iter']) + 1
+        else:
+            iter_start = 0
+
+        opts = dict(tol=tol, maxiter=maxiter, hartree=hartree, fock=fock, gw=gw,
+                    spinless=spinless, mix=mix)
+        if spin_blocks is not None: opts['spin_blocks'] = spin_blocks
+        if sigma_block_size is not None: opts['sigma_block_size'] = sigma_block_size
 
         if mpi.is_master_node():
             print()
             print(f'--> GWSolver.solve_iter')
             print(f'spinless {spinless}')
+            if spin_blocks is not None:
+                print(f'spin blocks {spin_blocks.tolist()}')
             print(f' Hartree {hartree}')
             print(f'    Fock {fock}')
             print(f'      GW {gw}')
+            if mixer is not None:
+                print(f'   Mixer {type(mixer).__name__} ({mix})')
+            if checkpoint is not None:
+                print(f'Checkpoint {checkpoint}')
+            if restart:
+                print(f'Restart from iter {iter_start}')
+            if sigma_block_size is not None:
+                print(f'Sigma block size {sigma_block_size}')
             print()
         else:
             verbose = False
@@ -312,10 +590,21 @@ class GWSolver():
         sigma_wk.data[:] = 0.
 
         N_old = float('inf')
-        g_wk_old = g_wk.copy()
-        g_wk_old.data[:] = float('inf')
+        if restart:
+            g_wk_old = g_wk
+        else:
+            g_wk_old = g_wk.copy()
+            g_wk_old.data[:] = float('inf')
+
+        if mixer is not None:
+            if not restart: mixer.reset()
+            sigma_wk_in = self.sigma_wk.copy()
+
+        writer = None
         
-        for iter in range(maxiter):
+        for iter in range(iter_start, max(maxiter, iter_start + 1)):
+
+            g_wk_in = g_wk
             
             sigma_wk.data[:] = 0.
 
@@ -331,9 +620,18 @@ class GWSolver():
                 self.sigma_fock_k = self.fock_sigma(V_r, rho_r)
                 sigma_wk.data[:] += self.sigma_fock_k.data[None, ...]
 
-            if gw:
+            if gw and spin_blocks is not None:
+                if verbose: print('--> Sigma GW dynamic (spin blocks)')
+                self.sigma_dyn_wk, P_wk, W_wk, W_dyn_wk = self.gw_spin_block_sigma(
+                    g_wk, self.V_s_k, spin_blocks, block_size=sigma_block_size)
+                sigma_wk.data[:] += self.sigma_dyn_wk.data
+
+            elif gw:
+                if verbose: print('--> g_tr')
+                g_tr = self.calc_g_tr(g_wk)
+                
                 if verbose: print('--> Polarization')
-                P_wk = self.polarization(g_wk)
+                P_wk = self.polarization(g_wk, g_tr=g_tr)
 
                 if verbose: print('--> Screened interaction')
                 W_wk = self.screened_interaction(P_wk, V_k, spinless=spinless)
@@ -344,11 +642,22 @@ class GWSolver():
                     W_dyn_wk[w,:] -= V_k
 
                 if verbose: print('--> Sigma GW dynamic')
-                self.sigma_dyn_wk = self.gw_dynamic_sigma(W_dyn_wk, g_wk)
+                self.sigma_dyn_wk = self.gw_dynamic_sigma(
+                    W_dyn_wk, g_wk, g_tr=g_tr, block_size=sigma_block_size)
                 sigma_wk.data[:] += self.sigma_dyn_wk.data
+                del g_tr
+
+            if mixer is not None and mix == 'sigma':
+                if verbose: print('--> Mixing sigma')
+                sigma_wk.data[:] = mixer(sigma_wk_in.data, sigma_wk.data)
+                sigma_wk_in = sigma_wk.copy()
 
             if verbose: print('--> Dyson equation')
             g_wk, mu = self.dyson_equation(mu, e_k, sigma_wk=sigma_wk, N_fix=N_fix)
+
+            if mixer is not None and mix == 'g':
+                if verbose: print('--> Mixing g')
+                g_wk.data[:] = mixer(g_wk_in.data, g_wk.data)
             
             if verbose: print('--> done.')
 
@@ -357,10 +666,18 @@ class GWSolver():
 
             if iter > 0 and verbose and mpi.is_master_node():
                 print(f'GW: iter {iter:5d} max(abs(dg)) {diff:2.2E}')
+
+            if checkpoint is not None:
+                state = dict(g_wk=g_wk.copy(), sigma_wk=sigma_wk.copy(), mu=mu, iter=iter, opts=opts)
+                if mixer is not None: state['mixer'] = copy.deepcopy(mixer)
+                writer = self.write_checkpoint(checkpoint, state, writer=writer)
                 
             if diff < tol:
                 break
 
+        if writer is not None:
+            writer.join()
+
         rho_r = self.calc_rho_r(g_wk)
         rho_loc = self.calc_rho_loc(rho_r)
         N = self.calc_total_density(rho_loc)
@@ -373,6 +690,7 @@ class GWSolver():
         self.mu = mu
         self.g_wk = g_wk
         self.sigma_wk = sigma_wk
+        self.iter = iter
 
         if gw:
             self.W_wk = W_wk
@@ -385,6 +703,58 @@ class GWSolver():
             self.timer.write()
 
 
+    def restart(self, filename, **kwargs):
+        """ Resume ``solve_iter`` from a checkpoint file
+
+        The iteration continues with the options stored in the checkpoint,
+        keyword arguments override the stored options.
+
+        Parameters
+        ----------
+
+        filename : str
+            HDF5 checkpoint file written by ``solve_iter(checkpoint=filename)``.
+
+        """
+        opts = self.read_checkpoint(filename)['opts']
+        opts = { key : bool(val) if type(val) == np.bool_ else val for key, val in opts.items() }
+        if 'sigma_block_size' in opts: opts['sigma_block_size'] = int(opts['sigma_block_size'])
+        opts.update(kwargs)
+        self.solve_iter(checkpoint=filename, restart=True, **opts)
+
+
+    @staticmethod
+    def read_checkpoint(filename):
+        with HDFArchive(filename, 'r') as arch:
+            state = arch['gw_checkpoint']
+        return state
+
+
+    @staticmethod
+    def write_checkpoint(filename, state, writer=None):
+        """ Write checkpoint from the master node in a background thread
+
+        Waits for the previous write ``writer`` to complete. The file is first
+        written to a temporary file and then moved in place, so that an
+        interrupted write never corrupts the last checkpoint. """
+
+        if writer is not None:
+            writer.join()
+
+        if not mpi.is_master_node():
+            return None
+
+        def write():
+            tmp_filename = filename + '.tmp'
+            with HDFArchive(tmp_filename, 'w') as arch:
+                arch['gw_checkpoint'] = state
+            os.replace(tmp_filename, filename)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        return writer
+
+        
     def get_local_density_matrix(self): return self.rho_loc
 
     def get_total_density(self): return self.N
@@ -32,7 +32,100 @@ Author: Hugo U. R. Strand, hugo.strand@gmail.com (2018)
 import sys
 import itertools
 import numpy as np
-from .numpy_compat import np_eigh
+
+# ----------------------------------------------------------------------
+def fermi_difference_quotient(e_kn, beta, tol=1e-10):
+
+    r""" Band resolved Lindhard factor
+
+    .. math::
+        L_{nm} = \frac{f(\epsilon_n) - f(\epsilon_m)}{\epsilon_n - \epsilon_m}
+
+    with the limit :math:`L_{nn} = f'(\epsilon_n)` for (near) degenerate levels.
+    """
+
+    fermi = lambda e : 0.5 * (1. - np.tanh(0.5 * beta * e))
+    dfermi = lambda e : -0.25 * beta / np.cosh(0.5 * beta * e)**2
+
+    f_kn = fermi(e_kn)
+    de_knm = e_kn[:, :, None] - e_kn[:, None, :]
+    degenerate = np.abs(de_knm) < tol
+
+    L_knm = (f_kn[:, :, None] - f_kn[:, None, :]) / np.where(degenerate, 1., de_knm)
+    e_mean = 0.5 * (e_kn[:, :, None] + e_kn[:, None, :])
+    L_knm[degenerate] = dfermi(e_mean[degenerate])
+
+    return L_knm
+
+# ----------------------------------------------------------------------
+def _static_density_response_factors(e_kn, U_kan, beta):
+
+    nk, norb = U_kan.shape[:2]
+
+    L_knm = fermi_difference_quotient(e_kn, beta)
+
+    A_kCn = np.einsum('kcn,kan->kcan', U_kan, np.conj(U_kan)).reshape(nk, norb**2, norb)
+    B_kDm = np.einsum('kdm,kbm->kdbm', np.conj(U_kan), U_kan).reshape(nk, norb**2, norb)
+
+    return A_kCn @ L_knm, B_kDm
+
+# ----------------------------------------------------------------------
+def static_density_response_kcdab(e_kn, U_kan, beta):
+
+    r""" Analytic static density matrix response
+
+    First order perturbation theory in the perturbation :math:`F_{ab}`
+    of the dispersion :math:`\epsilon(\mathbf{k}) = U e U^\dagger` gives
+
+    .. math::
+        \frac{\partial \rho_{cd}(\mathbf{k})}{\partial F_{ab}} =
+        \sum_{nm} U_{cn} U^*_{an} L_{nm} U_{bm} U^*_{dm}
+
+    where :math:`L_{nm}` is given by ``fermi_difference_quotient``.
+
+    Parameters
+    ----------
+
+    e_kn : ndarray (2D)
+        Eigenvalues of :math:`\epsilon(\mathbf{k}) - \mu`.
+
+    U_kan : ndarray (3D)
+        Eigenvectors of :math:`\epsilon(\mathbf{k})`.
+
+    beta : float
+        Inverse temperature.
+
+    Returns
+    -------
+
+    K_kcdab : ndarray (5D)
+        Response :math:`\partial \rho_{cd}(\mathbf{k}) / \partial F_{ab}`.
+
+    """
+
+    nk, norb = U_kan.shape[:2]
+
+    AL_kCn, B_kDm = _static_density_response_factors(e_kn, U_kan, beta)
+    K_kCD = AL_kCn @ np.transpose(B_kDm, (0, 2, 1))
+    K_kcadb = K_kCD.reshape([nk] + [norb]*4)
+
+    return np.ascontiguousarray(np.transpose(K_kcadb, (0, 1, 3, 2, 4)))
+
+# ----------------------------------------------------------------------
+def static_density_response_cdab(e_kn, U_kan, beta):
+
+    r""" Momentum averaged analytic static density matrix response
+    :math:`\partial \rho_{cd} / \partial F_{ab}`, of the local density
+    matrix to a local perturbation, see ``static_density_response_kcdab``. """
+
+    nk, norb = U_kan.shape[:2]
+
+    AL_kCn, B_kDm = _static_density_response_factors(e_kn, U_kan, beta)
+    AL_CK = np.transpose(AL_kCn, (1, 0, 2)).reshape(norb**2, nk*norb)
+    B_DK = np.transpose(B_kDm, (1, 0, 2)).reshape(norb**2, nk*norb)
+    K_cadb = (AL_CK @ B_DK.T).reshape([norb]*4) / nk
+
+    return np.ascontiguousarray(np.transpose(K_cadb, (0, 2, 1, 3)))
 
 # ----------------------------------------------------------------------
 class BaseResponse(object):
@@ -59,6 +152,9 @@ class BaseResponse(object):
         I_ab = np.eye(self.norb)
         self.e_k.data[:] -= self.solver.mu * I_ab
 
+        e_kn, self.U_kan = self.solver.eigenelements()
+        self.e_kn = e_kn - self.solver.mu
+
         print('norb =', self.norb)
         print('shape_abcd =', self.shape_abcd)
         print('shape_AB =', self.shape_AB)
@@ -75,22 +171,24 @@ class BaseResponse(object):
     # ------------------------------------------------------------------
     def _compute_drho_k_dop(self, op):
 
-        beta, eps = self.beta, self.eps
-        
-        E_p = self.e_k.data.copy() + eps*op[None, ...]
-        E_m = self.e_k.data.copy() - eps*op[None, ...]
+        K_kcdab = self._compute_lindhard_kcdab()
+        drho_k = np.einsum('kcdab,ab->kcd', K_kcdab, op)
 
-        e_p, U_p = np_eigh(E_p)
-        e_m, U_m = np_eigh(E_m)
+        return drho_k
 
-        fermi = lambda e, beta: 1./(np.exp(beta * e) + 1)
+    # ------------------------------------------------------------------
+    def _compute_lindhard_kcdab(self):
 
-        rho_k_p = np.einsum('kab,kb,kcb->kac', U_p, fermi(e_p, beta), np.conj(U_p))
-        rho_k_m = np.einsum('kab,kb,kcb->kac', U_m, fermi(e_m, beta), np.conj(U_m))
+        """ Analytic static density matrix response, see
+        static_density_response_kcdab. The result is cached. """
 
-        drho_k = (rho_k_p - rho_k_m) / (2. * eps)
+        if hasattr(self, '_lindhard_kcdab'):
+            return self._lindhard_kcdab
 
-        return drho_k
+        self._lindhard_kcdab = static_density_response_kcdab(
+            self.e_kn, self.U_kan, self.beta)
+
+        return self._lindhard_kcdab
 
     # ----------------------------------------------------------------------
     def _compute_chi0_ab(self):
@@ -125,16 +223,12 @@ class BaseResponse(object):
     # ----------------------------------------------------------------------
     def _compute_R_kabcd(self, field_prefactor=1.):
 
-        R_kabcd = np.zeros(self.shape_kabcd, dtype=complex)
-
-        for a, b in itertools.product(list(range(self.norb)), repeat=2):
+        # -- Response to the fields F_ab = p |a><b| + p^* |b><a|, stored at [b, a]
 
-            F_ab = np.zeros(self.shape_ab, dtype=complex)
-            F_ab[a, b] += field_prefactor
-            F_ab[b, a] += np.conj(field_prefactor)
+        K_kabcd = np.transpose(self._compute_lindhard_kcdab(), (0, 3, 4, 1, 2))
 
-            R_kcd = -self._compute_drho_k_dop(F_ab)
-            R_kabcd[:, b, a, :, :] = R_kcd
+        R_kabcd = -(field_prefactor * np.transpose(K_kabcd, (0, 2, 1, 3, 4)) + \
+                    np.conj(field_prefactor) * K_kabcd)
 
         return R_kabcd
     
@@ -188,7 +282,7 @@ class HartreeFockResponse(BaseResponse):
         Converged Hartree-Fock solver.
 
     eps : float
-        Step size in finite difference linear response calculation.
+        Not used, the static response is computed analytically.
 
     """
     
@@ -273,7 +367,7 @@ class HartreeResponse(BaseResponse):
         Converged Hartree solver.
 
     eps : float
-        Step size in finite difference linear response calculation.
+        Not used, the static response is computed analytically.
 
     """
     
@@ -34,12 +34,13 @@ Author: Hugo U. R. Strand, hugo.strand@gmail.com (2018)
 import sys
 import itertools
 import numpy as np
-from .numpy_compat import np_eigvalsh, np_eigh
+from .numpy_compat import np_eigh
 
 # ----------------------------------------------------------------------
 
 from scipy.optimize import fsolve
 from scipy.optimize import brentq
+from scipy.special import expit
 
 # ----------------------------------------------------------------------
 
@@ -49,6 +50,8 @@ import triqs.utility.mpi as mpi
 # ----------------------------------------------------------------------
 
 from triqs_tprf.rpa_tensor import get_rpa_tensor
+from triqs_tprf.ParameterCollection import ParameterCollection, ParameterCollections
+from triqs_tprf.hf_response import static_density_response_cdab
 from triqs_tprf.rpa_tensor import fundamental_operators_from_gf_struct
 from triqs_tprf.OperatorUtils import is_operator_composed_of_only_fundamental_operators
 
@@ -100,6 +103,10 @@ class HartreeFockSolver(object):
 
         self.target_shape = self.e_k.target_shape
 
+        self.M = np.zeros(self.target_shape, dtype=complex)
+        self._M_MF = np.copy(self.M)
+        self._eigh_MF = None
+
         self.shape_ab = self.e_k.target_shape
         self.shape_abcd = list(self.shape_ab) * 2
 
@@ -147,7 +154,37 @@ class HartreeFockSolver(object):
     
     # ------------------------------------------------------------------
     def update_mean_field_dispersion(self):
+
+        if np.array_equal(self.M, self._M_MF):
+            return
+
         self.e_k_MF.data[:] = self.e_k.data + self.M[None, ...]
+        self._M_MF = np.copy(self.M)
+        self._eigh_MF = None
+
+    # ------------------------------------------------------------------
+    def eigenelements(self):
+
+        """ Eigenvalues and eigenvectors of the mean-field dispersion e_k_MF.
+
+        The result is cached until the mean field M changes,
+        see update_mean_field_dispersion(...).
+
+        Returns
+        -------
+
+        e_kn : ndarray (2D)
+            Eigenvalues, without the chemical potential.
+
+        U_kan : ndarray (3D)
+            Eigenvectors.
+
+        """
+
+        if self._eigh_MF is None:
+            self._eigh_MF = np_eigh(self.e_k_MF.data)
+
+        return self._eigh_MF
 
     # ------------------------------------------------------------------
     def update_chemical_potential(self, N_target, mu0=None):
@@ -155,7 +192,7 @@ class HartreeFockSolver(object):
         if mu0 is None:
             mu0 = self.mu
             
-        e = np_eigvalsh(self.e_k_MF.data)
+        e, V = self.eigenelements()
 
         fermi = lambda e : 1./(np.exp(self.beta * e) + 1)
 
@@ -173,8 +210,8 @@ class HartreeFockSolver(object):
     # ------------------------------------------------------------------
     def update_momentum_density_matrix(self):
 
-        e, V = np_eigh(self.e_k_MF.data)
-        e -= self.mu
+        e, V = self.eigenelements()
+        e = e - self.mu
         
         fermi = lambda e : 1./(np.exp(self.beta * e) + 1)
         self.rho_kab = np.einsum('kab,kb,kcb->kac', V, fermi(e), np.conj(V))
@@ -193,8 +230,8 @@ class HartreeFockSolver(object):
     # ------------------------------------------------------------------
     def update_non_int_free_energy(self):
 
-        e = np_eigvalsh(self.e_k_MF.data)
-        e -= self.mu
+        e, V = self.eigenelements()
+        e = e - self.mu
         
         self.Omega0 = -1./self.beta * np.sum( np.log(1. + np.exp(-self.beta*e)) )
         self.Omega0 /= len(self.e_k_MF.mesh)
@@ -247,6 +284,43 @@ class HartreeFockSolver(object):
 
         return rho_vec
 
+    # ------------------------------------------------------------------
+    def density_matrix_jacobian(self, rho_vec, N_target=None):
+
+        r""" Analytic Jacobian of density_matrix_step(...)
+
+        The density matrix response to the mean field, see
+        ``triqs_tprf.hf_response.static_density_response_cdab``, contracted
+        with the interaction. At fixed density the chemical potential shift
+
+        .. math::
+            \delta\mu = - \text{Tr}[K \delta M] / \text{Tr}[D],
+            \quad D_{cd} = \partial \rho_{cd} / \partial \mu
+
+        is included.
+
+        """
+
+        self.density_matrix_step(rho_vec, N_target)
+
+        e, V = self.eigenelements()
+        e = e - self.mu
+        K_cdab = static_density_response_cdab(e, V, self.beta)
+
+        if N_target is not None:
+            D_cd = -np.einsum('cdaa->cd', K_cdab)
+            dN_ab = np.einsum('ccab->ab', K_cdab)
+            K_cdab = K_cdab - np.einsum('cd,ab->cdab', D_cd, dN_ab) / np.trace(D_cd)
+
+        n = len(rho_vec)
+        drho_iab = np.array([ self.vec2mat(vec) for vec in np.eye(n) ])
+        dM_iab = np.einsum('abcd,icd->iba', -self.U_abcd, drho_iab)
+        drho_new_icd = np.einsum('cdab,iab->icd', K_cdab, dM_iab)
+
+        J = np.array([ self.mat2vec(drho_new) for drho_new in drho_new_icd ]).T
+
+        return J
+
     # ------------------------------------------------------------------
     def solve_setup(self, N_target, M0=None, mu0=None):
     
@@ -273,7 +347,7 @@ class HartreeFockSolver(object):
 
     # ------------------------------------------------------------------
     def solve_iter(self, N_target, M0=None, mu0=None,
-                   nitermax=100, mixing=0.5, tol=1e-9):
+                   nitermax=100, mixing=0.5, tol=1e-9, mixer=None):
         """ Solve the HF-equations using forward recursion at fixed density.     
 
         Parameters
@@ -297,6 +371,10 @@ class HartreeFockSolver(object):
         tol : float, optional
             Convergence in relative change of the density matrix.
 
+        mixer : LinearMixer or AndersonMixer, optional
+            Convergence accelerator from ``triqs_tprf.mixing``, replaces
+            the linear mixing if given.
+
         Returns
         -------
 
@@ -307,7 +385,10 @@ class HartreeFockSolver(object):
 
         print('MF: Forward iteration')
         print('nitermax =', nitermax)
-        print('mixing =', mixing)
+        if mixer is None:
+            print('mixing =', mixing)
+        else:
+            print('mixer =', type(mixer).__name__)
         print('tol =', tol)
         print()
         
@@ -319,6 +400,9 @@ class HartreeFockSolver(object):
         
         rho_vec = self.solve_setup(N_target, M0, mu0)
 
+        if mixer is not None:
+            mixer.reset()
+
         rho_iter = []
         
         for idx in range(self.nitermax):
@@ -337,7 +421,10 @@ class HartreeFockSolver(object):
                 print('MF: Converged drho = %3.3E\n' % drho)
                 break
 
-            rho_vec = (1. - mixing) * rho_vec_old + mixing * rho_vec_new
+            if mixer is None:
+                rho_vec = (1. - mixing) * rho_vec_old + mixing * rho_vec_new
+            else:
+                rho_vec = mixer(rho_vec_old, rho_vec_new)
 
         self.update_total_energy()
         print(self.__str__())
@@ -346,7 +433,7 @@ class HartreeFockSolver(object):
         return rho_iter
 
     # ------------------------------------------------------------------
-    def solve_newton(self, N_target, M0=None, mu0=None):
+    def solve_newton(self, N_target, M0=None, mu0=None, analytic_jacobian=True):
 
         """ Solve the HF-equations using a quasi Newton method at fixed density.
 
@@ -362,6 +449,10 @@ class HartreeFockSolver(object):
         mu0 : float, optional
             Initial chemical potential.
 
+        analytic_jacobian : bool, optional
+            Use the analytic Jacobian from density_matrix_jacobian(...),
+            otherwise the Jacobian is approximated by finite differences.
+
         """
 
         print('MF: Newton solver')
@@ -372,8 +463,12 @@ class HartreeFockSolver(object):
         def target_function(rho_vec):
             rho_vec_new = self.density_matrix_step(rho_vec, N_target)
             return rho_vec_new - rho_vec
-            
-        rho_vec = fsolve(target_function, rho0_vec)
+
+        def jacobian(rho_vec):
+            return self.density_matrix_jacobian(rho_vec, N_target) - np.eye(len(rho_vec))
+
+        fprime = jacobian if analytic_jacobian else None
+        rho_vec = fsolve(target_function, rho0_vec, fprime=fprime)
 
         self.update_total_energy()
         print(self.__str__())
@@ -381,7 +476,7 @@ class HartreeFockSolver(object):
         self.density_matrix_step(rho_vec)
 
     # ------------------------------------------------------------------
-    def solve_newton_mu(self, mu, M0=None):
+    def solve_newton_mu(self, mu, M0=None, analytic_jacobian=True):
 
         """ Solve the HF-equations using a quasi Newton method at fixed chemical potential.
 
@@ -394,6 +489,10 @@ class HartreeFockSolver(object):
         M0 : ndarray (2D), optional
             Initial mean-field (0 if None).
 
+        analytic_jacobian : bool, optional
+            Use the analytic Jacobian from density_matrix_jacobian(...),
+            otherwise the Jacobian is approximated by finite differences.
+
         """
 
         print('MF: Newton solver')
@@ -414,8 +513,12 @@ class HartreeFockSolver(object):
         def target_function(rho_vec):
             rho_vec_new = self.density_matrix_step(rho_vec)
             return rho_vec_new - rho_vec
-            
-        rho_vec = fsolve(target_function, rho0_vec)
+
+        def jacobian(rho_vec):
+            return self.density_matrix_jacobian(rho_vec) - np.eye(len(rho_vec))
+
+        fprime = jacobian if analytic_jacobian else None
+        rho_vec = fsolve(target_function, rho0_vec, fprime=fprime)
 
         self.update_total_energy()
         print(self.__str__())
@@ -580,3 +683,304 @@ TRIQS: Hartree solver
         return logo
 
 # ----------------------------------------------------------------------
+def _batch_fermi(beta_p, e_pkn):
+    return expit(-beta_p[:, None, None] * e_pkn)
+
+# ----------------------------------------------------------------------
+def _batch_chemical_potential(e_pkn, beta_p, N_p, mu_p, mu_min_p, mu_max_p,
+                              tol=1e-12, maxiter=200):
+
+    """ Chemical potentials for a stack of parameter points,
+    safeguarded Newton steps on the brackets [mu_min_p, mu_max_p]. """
+
+    n_k = e_pkn.shape[1]
+    mu_min_p, mu_max_p = np.copy(mu_min_p), np.copy(mu_max_p)
+    mu_p = np.clip(mu_p, mu_min_p, mu_max_p)
+
+    for idx in range(maxiter):
+
+        f_pkn = _batch_fermi(beta_p, e_pkn - mu_p[:, None, None])
+        r_p = np.sum(f_pkn, axis=(1, 2)) / n_k - N_p
+        dN_p = beta_p * np.sum(f_pkn * (1. - f_pkn), axis=(1, 2)) / n_k
+
+        if np.all(np.abs(r_p) < tol):
+            break
+
+        mu_max_p = np.where(r_p > 0., mu_p, mu_max_p)
+        mu_min_p = np.where(r_p < 0., mu_p, mu_min_p)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mu_newton_p = mu_p - r_p / dN_p
+
+        newton = (dN_p > 0.) & (mu_newton_p > mu_min_p) & (mu_newton_p < mu_max_p)
+        mu_p = np.where(newton, mu_newton_p, 0.5 * (mu_min_p + mu_max_p))
+
+    return mu_p
+
+# ----------------------------------------------------------------------
+def _batch_hartree_fock_solve(e_kab, beta_p, U_pabcd, N_p, M_pab, mu_p,
+                              mu_min, mu_max, nitermax, mixing, tol):
+
+    """ Forward iteration of the Hartree-Fock equations for a stack of
+    parameter points, see HartreeFockBatchSolver.solve_iter(...) """
+
+    n_p, n_k = len(beta_p), e_kab.shape[0]
+
+    def eigenelements(M_pab):
+        return np_eigh(e_kab[None, ...] + M_pab[:, None, ...])
+
+    def chemical_potential(e_pkn, idxs, mu_p):
+        e_min_p, e_max_p = e_pkn.min(axis=(1, 2)), e_pkn.max(axis=(1, 2))
+        pad_p = 20. / beta_p[idxs]
+        mu_min_p = e_min_p - pad_p if mu_min is None else np.full(len(idxs), mu_min)
+        mu_max_p = e_max_p + pad_p if mu_max is None else np.full(len(idxs), mu_max)
+        return _batch_chemical_potential(
+            e_pkn, beta_p[idxs], N_p[idxs], mu_p, mu_min_p, mu_max_p)
+
+    def density_matrix(f_pkn, V_pkab):
+        rho_pkab = (V_pkab * f_pkn[:, :, None, :]) @ np.conj(V_pkab).swapaxes(-1, -2)
+        return np.sum(rho_pkab, axis=1) / n_k
+
+    def fermi(e_pkn, idxs, mu_p):
+        return _batch_fermi(beta_p[idxs], e_pkn - mu_p[:, None, None])
+
+    def mean_field(U_pabcd, rho_pab):
+        return np.einsum('pabcd,pcd->pba', -U_pabcd, rho_pab)
+
+    # -- Initial density matrix from the initial mean field
+
+    M_pab = np.array(M_pab, dtype=complex)
+    idxs = np.arange(n_p)
+    e_pkn, V_pkab = eigenelements(M_pab)
+    mu_p = chemical_potential(e_pkn, idxs, np.array(mu_p, dtype=float))
+    rho_pab = density_matrix(fermi(e_pkn, idxs, mu_p), V_pkab)
+
+    n_iter_p = np.zeros(n_p, dtype=int)
+    converged_p = np.zeros(n_p, dtype=bool)
+
+    # -- Iterate the active (unconverged) points only
+
+    for idx in range(nitermax):
+
+        idxs = np.flatnonzero(~converged_p)
+        if len(idxs) == 0:
+            break
+
+        rho_old = rho_pab[idxs]
+        M_pab[idxs] = mean_field(U_pabcd[idxs], rho_old)
+        e_pkn, V_pkab = eigenelements(M_pab[idxs])
+        mu_p[idxs] = chemical_potential(e_pkn, idxs, mu_p[idxs])
+        rho_new = density_matrix(fermi(e_pkn, idxs, mu_p[idxs]), V_pkab)
+
+        norm = np.linalg.norm(rho_old, axis=(1, 2))
+        drho = np.linalg.norm(rho_old - rho_new, axis=(1, 2)) / norm
+
+        n_iter_p[idxs] = idx + 1
+        done = drho < tol
+        converged_p[idxs[done]] = True
+
+        rho_pab[idxs] = np.where(
+            done[:, None, None], rho_new, (1. - mixing) * rho_old + mixing * rho_new)
+
+    # -- Observables, at the last mean field and chemical potential
+
+    e_pkn, V_pkab = eigenelements(M_pab)
+    e_pkn = e_pkn - mu_p[:, None, None]
+    f_pkn = _batch_fermi(beta_p, e_pkn)
+    rho_pab = density_matrix(f_pkn, V_pkab)
+
+    e_pkn_diag = np.einsum('pkan,kab,pkbn->pkn', np.conj(V_pkab), e_kab, V_pkab).real
+    E_kin_p = np.sum(f_pkn * e_pkn_diag, axis=(1, 2)) / n_k
+    E_int_p = 0.5 * np.einsum('pab,pabcd,pcd->p', rho_pab, U_pabcd, rho_pab)
+    Omega0_p = -np.sum(np.logaddexp(0., -beta_p[:, None, None] * e_pkn), axis=(1, 2))
+    Omega0_p /= beta_p * n_k
+
+    return dict(
+        mu=mu_p, M=M_pab, rho=rho_pab, N_tot=np.einsum('paa->p', rho_pab),
+        E_kin=E_kin_p, E_int=E_int_p, E_tot=E_kin_p + E_int_p,
+        Omega0=Omega0_p, Omega=Omega0_p + E_int_p,
+        converged=converged_p, n_iter=n_iter_p)
+
+# ----------------------------------------------------------------------
+class HartreeFockBatchSolver(object):
+
+    """ Hartree-Fock solver for a batch of parameter points.
+
+    Solves the Hartree-Fock equations of ``HartreeFockSolver`` for many
+    interactions, temperatures and fillings at once. The mean fields
+    :math:`M_p` of all points are stacked so that :math:`\\epsilon_k + M_p`
+    is diagonalized in one batched ``eigh`` and all chemical potentials
+    :math:`\\mu_p` are solved for together. Chunks of points can in addition
+    be distributed over a pool of processes.
+
+    Parameters
+    ----------
+
+    e_k : TRIQS Greens function on a Brillouin zone mesh
+        Single-particle dispersion.
+
+    beta : float or list of floats
+        Inverse temperature, one for all points or one per point.
+
+    H_int : list of TRIQS Operator instances, optional
+        Local interaction Hamiltonian of each point.
+
+    gf_struct : list of pairs of block index and its size
+        gf_struct fixing orbital order between e_k and H_int
+
+    U_abcd : ndarray (5D), optional
+        Interaction tensors of all points, used instead of H_int.
+
+    mu_min, mu_max : float, optional
+        range for chemical potential search.
+
+    """
+
+    # ------------------------------------------------------------------
+    def __init__(self, e_k, beta, H_int=None, gf_struct=None, U_abcd=None,
+                 mu_max=None, mu_min=None):
+
+        assert( (H_int is None) != (U_abcd is None) ), \
+            'Error: Exactly one of H_int and U_abcd should be given'
+
+        if H_int is not None:
+            assert( gf_struct is not None ), \
+                'Error: H_int given, but gf_struct is None'
+
+            gf_struct = fix_gf_struct_type(gf_struct)
+            fundamental_operators = fundamental_operators_from_gf_struct(gf_struct)
+
+            for h_int in H_int:
+                assert( is_operator_composed_of_only_fundamental_operators(
+                    h_int, fundamental_operators) ), \
+                    'Error: H_int is incompatible with gf_struct and its fundamental_operators'
+
+            U_abcd = [ get_rpa_tensor(h_int, fundamental_operators) for h_int in H_int ]
+
+        self.U_pabcd = np.array(U_abcd, dtype=complex)
+        self.n_p = self.U_pabcd.shape[0]
+
+        self.beta = np.array(np.broadcast_to(beta, (self.n_p,)), dtype=float)
+        self.mu_max = mu_max
+        self.mu_min = mu_min
+
+        self.e_k = e_k.copy()
+        self.n_k = len(self.e_k.mesh)
+        self.target_shape = self.e_k.target_shape
+        self.norb = self.target_shape[0]
+
+        assert( self.U_pabcd.shape[1:] == tuple(self.target_shape) * 2 ), \
+            'Error: Interaction tensors incompatible with e_k'
+
+        if mpi.is_master_node():
+            print(self.logo())
+            print('points =', self.n_p)
+            print('bands =', self.norb)
+            print('n_k =', self.n_k)
+            print()
+
+    # ------------------------------------------------------------------
+    def solve_iter(self, N_target, M0=None, mu0=None, nitermax=100,
+                   mixing=0.5, tol=1e-9, processes=None, ps=None):
+
+        """ Solve the HF-equations of all points using forward recursion at fixed density.
+
+        Parameters
+        ----------
+
+        N_target : float or list of floats
+            Total density, one for all points or one per point.
+
+        M0 : ndarray (2D or 3D), optional
+            Initial mean-field, one for all points or one per point (0 if None).
+
+        mu0 : float or list of floats, optional
+            Initial chemical potential.
+
+        nitermax : int, optional
+            Maximal number of self consistent iterations.
+
+        mixing : float, optional
+            Linear mixing parameter.
+
+        tol : float, optional
+            Convergence in relative change of the density matrix.
+
+        processes : int, optional
+            Number of processes sharing the points, one chunk of points
+            per process (no process pool if None).
+
+        ps : ParameterCollections or list of ParameterCollection, optional
+            Parameters of the points, extended with the solution.
+
+        Returns
+        -------
+
+        ps : ParameterCollections
+            Solution of each point, with the attributes ``beta``, ``N_target``,
+            ``mu``, ``M``, ``rho``, ``N_tot``, ``E_kin``, ``E_int``, ``E_tot``,
+            ``Omega0``, ``Omega``, ``converged`` and ``n_iter``.
+
+        """
+
+        assert( mixing >= 0. )
+        assert( mixing <= 1. )
+
+        N_p = np.array(np.broadcast_to(N_target, (self.n_p,)), dtype=float)
+        mu_p = np.array(np.broadcast_to(0. if mu0 is None else mu0, (self.n_p,)), dtype=float)
+
+        if M0 is None:
+            M0 = np.zeros(self.target_shape)
+        M_pab = np.array(np.broadcast_to(M0, (self.n_p,) + tuple(self.target_shape)), dtype=complex)
+
+        if mpi.is_master_node():
+            print('MF: Batched forward iteration')
+            print('nitermax =', nitermax)
+            print('mixing =', mixing)
+            print('tol =', tol)
+            print('processes =', processes)
+            print()
+
+        args = (self.e_k.data, self.beta, self.U_pabcd, N_p, M_pab, mu_p)
+        kwargs = dict(mu_min=self.mu_min, mu_max=self.mu_max,
+                      nitermax=nitermax, mixing=mixing, tol=tol)
+
+        if processes is None or processes <= 1 or self.n_p <= 1:
+            res = _batch_hartree_fock_solve(*args, **kwargs)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunks = np.array_split(np.arange(self.n_p), min(processes, self.n_p))
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [ executor.submit(
+                    _batch_hartree_fock_solve, self.e_k.data,
+                    *[ arg[chunk] for arg in args[1:] ], **kwargs)
+                    for chunk in chunks ]
+                results = [ future.result() for future in futures ]
+
+            res = { key : np.concatenate([ r[key] for r in results ])
+                    for key in results[0].keys() }
+
+        if ps is None:
+            ps = [ ParameterCollection() for idx in range(self.n_p) ]
+        assert( len(ps) == self.n_p ), 'Error: ps and the number of points differ'
+
+        ps = ParameterCollections([
+            p.alter(beta=self.beta[idx], N_target=N_p[idx],
+                    **{ key : val[idx] for key, val in res.items() })
+            for idx, p in enumerate(ps) ])
+
+        if mpi.is_master_node():
+            n_conv = np.sum(res['converged'])
+            print(f'MF: Converged {n_conv} of {self.n_p} points')
+            print('MF: Max iterations =', np.max(res['n_iter']))
+            print()
+
+        return ps
+
+    # ------------------------------------------------------------------
+    def logo(self):
+        return HartreeFockSolver.logo(self).replace(
+            'Hartree-Fock solver', 'Hartree-Fock batch solver')
+
+# ----------------------------------------------------------------------
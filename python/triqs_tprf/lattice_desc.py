@@ -274,6 +274,91 @@ Returns
 out
      Real frequency lattice Green's function :math:`G_{a\bar{b}}(\omega, \mathbf{k})`""")
 
+module.add_function ("triqs_tprf::g_w_t triqs_tprf::lattice_dyson_g_w (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_w_cvt sigma_w, array<double, 1> k_weights)", doc = r"""Construct an interacting Matsubara frequency local lattice Green's function :math:`G_{a\bar{b}}(i\omega_n)` using momentum weights
+
+ Computes
+
+ .. math::
+    G_{a\bar{b}}(i\omega_n) = \sum_\mathbf{k} w_\mathbf{k} \left[
+    (i\omega_n + \mu ) \cdot \mathbf{1}  - \epsilon(\mathbf{k}) - \Sigma(i\omega_n)
+    \right]^{-1}_{a\bar{b}},
+
+ with the momentum weights :math:`w_\mathbf{k}` normalized to one. Points with zero
+ weight are skipped, e.g. when summing over an irreducible wedge of the Brillouin zone.
+ The momentum resolved Green's function is never stored.
+
+Parameters
+----------
+mu
+     chemical potential :math:`\mu`
+
+e_k
+     discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+sigma_w
+     imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n)`
+
+k_weights
+     weights :math:`w_\mathbf{k}` of the momentum mesh points
+
+Returns
+-------
+out
+     Matsubara frequency local lattice Green's function $G_{a\bar{b}}(i\omega_n)$""")
+
+module.add_function ("triqs_tprf::g_Dw_t triqs_tprf::lattice_dyson_g_w (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_Dw_cvt sigma_w, array<double, 1> k_weights)")
+
+module.add_function ("triqs_tprf::g_f_t triqs_tprf::lattice_dyson_g_f (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_f_cvt sigma_f, double delta, array<double, 1> k_weights)")
+
+module.add_function ("std::tuple<triqs_tprf::g_w_t, matrix<std::complex<double>>, matrix<std::complex<double>>> triqs_tprf::lattice_dyson_g_w_moments (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_w_cvt sigma_w, array<double, 1> k_weights, matrix<std::complex<double>> sigma_inf)", doc = r"""Local lattice Green's function, density matrix and first moment in one pass over momentum
+
+ Computes the local Green's function :math:`G_{a\bar{b}}(i\omega_n)` of ``lattice_dyson_g_w``
+ (with optional momentum weights :math:`w_\mathbf{k}`), together with the local density matrix
+
+ .. math::
+    \rho_{a\bar{b}} = \sum_\mathbf{k} w_\mathbf{k} \frac{1}{\beta} \sum_n
+    G_{a\bar{b}}(i\omega_n, \mathbf{k}) e^{i\omega_n 0^+}
+
+ and the first moment :math:`M^{(1)}` of the high frequency expansion
+ :math:`G(i\omega_n) = \mathbf{1}/i\omega_n + M^{(1)}/(i\omega_n)^2 + \ldots`,
+
+ .. math::
+    M^{(1)} = \sum_\mathbf{k} w_\mathbf{k} \epsilon(\mathbf{k}) + \Sigma(\infty) - \mu \cdot \mathbf{1} \, .
+
+ The Matsubara sum is tail corrected using the Green's function of
+ :math:`\epsilon(\mathbf{k}) + \Sigma(\infty)` as reference. Unless it is passed
+ as ``sigma_inf``, :math:`\Sigma(\infty)` is estimated as the Hermitian part of the
+ average of :math:`\Sigma` at the first and last frequency of the mesh. :math:`M^{(1)}`
+ inherits the error of this finite mesh estimate directly, and the reference density
+ matrix, and with it the accuracy of the tail correction of :math:`\rho`, also depends on it.
+ The momentum resolved Green's function is never stored.
+
+Parameters
+----------
+mu
+     chemical potential :math:`\mu`
+
+e_k
+     discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+sigma_w
+     imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n)`
+
+k_weights
+     weights :math:`w_\mathbf{k}` of the momentum mesh points (uniform if omitted or empty)
+
+sigma_inf
+     static limit :math:`\Sigma_{\bar{a}b}(\infty)` of the self-energy (estimated from the mesh if omitted)
+
+Returns
+-------
+out
+     Tuple of the local Green's function :math:`G_{a\bar{b}}(i\omega_n)`, the density matrix :math:`\rho_{a\bar{b}}` and the first moment :math:`M^{(1)}_{a\bar{b}}`""")
+
+module.add_function ("std::tuple<triqs_tprf::g_w_t, matrix<std::complex<double>>, matrix<std::complex<double>>> triqs_tprf::lattice_dyson_g_w_moments (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_w_cvt sigma_w, array<double, 1> k_weights)")
+
+module.add_function ("std::tuple<triqs_tprf::g_w_t, matrix<std::complex<double>>, matrix<std::complex<double>>> triqs_tprf::lattice_dyson_g_w_moments (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_w_cvt sigma_w)")
+
 module.add_function ("triqs_tprf::g_wr_t triqs_tprf::fourier_wk_to_wr (triqs_tprf::g_wk_cvt g_wk)", doc = r"""Inverse fast fourier transform of imaginary frequency Green's function from k-space to real space
 
     Computes: :math:`G_{a\bar{b}}(i\omega_n, \mathbf{r}) = \mathcal{F}^{-1} \left\{G_{a\bar{b}}(i\omega_n, \mathbf{k})\right\}`
@@ -615,10 +700,194 @@ module.add_function ("triqs_tprf::chi_wk_t triqs_tprf::add_dynamic_and_static(tr
 module.add_function ("triqs_tprf::g_Dwk_t triqs_tprf::add_dynamic_and_static(triqs_tprf::g_Dwk_t g_dyn_wk, triqs_tprf::e_k_t g_stat_k)", doc = r"""Add documentation!""")
 module.add_function ("triqs_tprf::chi_Dwk_t triqs_tprf::add_dynamic_and_static(triqs_tprf::chi_Dwk_t chi_dyn_wk, triqs_tprf::chi_k_t chi_stat_k)", doc = r"""Add documentation!""")
 
+module.add_function ("triqs_tprf::g_fk_t triqs_tprf::pade_analytical_continuation_wk (triqs_tprf::g_wk_cvt g_wk, triqs::mesh::refreq fmesh, int n_points, double freq_offset)", doc = r"""Pade analytic continuation of a lattice Green's function to real frequencies
+
+  Performs a Pade analytic continuation of every momentum and target component of
+  :math:`G(i\omega_n, \mathbf{k})`, using the first ``n_points`` non-negative
+  Matsubara frequencies, and evaluates the result at :math:`\omega + i\delta`
+  on the real frequency mesh. For DLR meshes the Matsubara frequencies are
+  obtained from the DLR coefficients. The continuation is parallellized over
+  momentum with MPI and OpenMP.
+
+Parameters
+----------
+g_wk
+     Green's function :math:`G(i\omega_n, \mathbf{k})` on a Matsubara or DLR Matsubara frequency mesh.
+
+fmesh
+     real frequency mesh.
+
+n_points
+     number of Matsubara frequencies used in the Pade fit.
+
+freq_offset
+     distance :math:`\delta` from the real axis.
+
+Returns
+-------
+out
+     real frequency Green's function :math:`G(\omega, \mathbf{k})`.""")
+
+module.add_function ("triqs_tprf::g_fk_t triqs_tprf::pade_analytical_continuation_wk (triqs_tprf::g_Dwk_cvt g_wk, triqs::mesh::refreq fmesh, int n_points, double freq_offset)")
+module.add_function ("triqs_tprf::chi_fk_t triqs_tprf::pade_analytical_continuation_wk (triqs_tprf::chi_wk_cvt chi_wk, triqs::mesh::refreq fmesh, int n_points, double freq_offset)")
+module.add_function ("triqs_tprf::chi_fk_t triqs_tprf::pade_analytical_continuation_wk (triqs_tprf::chi_Dwk_cvt chi_wk, triqs::mesh::refreq fmesh, int n_points, double freq_offset)")
+
+module.add_function ("array<std::complex<double>, 3> triqs_tprf::evaluate_on_kpoints (triqs_tprf::e_k_cvt e_k, array<double, 2> kpoints)", doc = r"""Evaluate a momentum dependent quantity on a list of momentum points
+
+  Evaluates :math:`\epsilon_{ab}(\mathbf{k})` at arbitrary momenta using the
+  interpolation of the Brillouin zone mesh. The points are distributed over
+  MPI ranks and OpenMP threads.
+
+Parameters
+----------
+e_k
+     quantity :math:`\epsilon_{ab}(\mathbf{k})` on a Brillouin zone mesh.
+
+kpoints
+     momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``.
+
+Returns
+-------
+out
+     values :math:`\epsilon_{ab}(\mathbf{k}_i)`, array of shape ``(n_k, n_b, n_b)``.""")
+
+module.add_function ("array<std::complex<double>, 4> triqs_tprf::evaluate_on_kpoints (triqs_tprf::g_fk_cvt g_fk, array<double, 2> kpoints)", doc = r"""Evaluate a real frequency lattice Green's function on a list of momentum points
+
+Parameters
+----------
+g_fk
+     Green's function :math:`G_{ab}(\omega, \mathbf{k})`.
+
+kpoints
+     momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``.
+
+Returns
+-------
+out
+     values :math:`G_{ab}(\omega, \mathbf{k}_i)`, array of shape ``(n_\omega, n_k, n_b, n_b)``.""")
+
 module.add_function ("double triqs_tprf::fermi(double e)", doc = r"""Add documentation!""")
 
 module.add_function ("double triqs_tprf::bose(double e)", doc = r"""Add documentation!""")
 
+module.add_function ("std::tuple<double, double> triqs_tprf::density_from_dyson (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_wk_cvt sigma_wk)", doc = r"""Total density and its chemical potential derivative from the Dyson equation
+
+ Computes
+
+ .. math::
+    N(\mu) = \frac{1}{N_k} \sum_{\mathbf{k}} \frac{1}{\beta} \sum_{n}
+    \text{Tr} \, G(i\omega_n, \mathbf{k}) e^{i\omega_n 0^+}
+    \, , \quad
+    \frac{dN}{d\mu} = - \frac{1}{N_k} \sum_{\mathbf{k}} \frac{1}{\beta} \sum_{n}
+    \text{Tr} \, G^2(i\omega_n, \mathbf{k})
+
+ with :math:`G(i\omega_n, \mathbf{k}) = [(i\omega_n + \mu) \cdot \mathbf{1} - \epsilon(\mathbf{k}) - \Sigma(i\omega_n, \mathbf{k})]^{-1}`,
+ without storing :math:`G`. The Matsubara sums are tail corrected using the
+ Green's function of :math:`\epsilon(\mathbf{k}) + \Sigma(\infty, \mathbf{k})`
+ as reference, for which the sums are known analytically.
+
+Parameters
+----------
+mu
+     chemical potential :math:`\mu`
+
+e_k
+     discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+sigma_wk
+     imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n, \mathbf{k})`
+
+Returns
+-------
+out
+     Tuple of the total density :math:`N` and its derivative :math:`dN/d\mu`""")
+
+module.add_function ("std::tuple<double, double> triqs_tprf::density_from_dyson (double mu, triqs_tprf::e_k_cvt e_k, triqs_tprf::g_Dwk_cvt sigma_wk)")
+
+module.add_function ("double triqs_tprf::find_mu_for_density (triqs_tprf::e_k_cvt e_k, double beta, double N, double mu0 = 0., double tol = 1e-10, int max_iter = 200, double mu_min = -std::numeric_limits<double>::infinity(), double mu_max = std::numeric_limits<double>::infinity())", doc = r"""Chemical potential for a given total density of a non-interacting (or static mean-field) lattice
+
+ Solves :math:`N(\mu) = N` for :math:`\mu` with
+
+ .. math::
+    N(\mu) = \frac{1}{N_k} \sum_{\mathbf{k}, n} f(\epsilon_n(\mathbf{k}) - \mu)
+
+ where :math:`\epsilon_n(\mathbf{k})` are the band energies of :math:`\epsilon(\mathbf{k})`,
+ which are computed once. A static (Hartree-Fock) self energy is included by adding it to
+ :math:`\epsilon(\mathbf{k})`. Uses Newton steps with a bisection fallback, restricted to
+ :math:`\mu_{min} \le \mu \le \mu_{max}`. An error is raised if :math:`N` is not attained in this range.
+
+Parameters
+----------
+e_k
+     discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+beta
+     inverse temperature :math:`\beta`
+
+N
+     target total density :math:`N`
+
+mu0
+     initial chemical potential
+
+tol
+     tolerance in the total density
+
+max_iter
+     maximal number of iterations
+
+mu_min
+     lower bound of the chemical potential search range
+
+mu_max
+     upper bound of the chemical potential search range
+
+Returns
+-------
+out
+     Chemical potential :math:`\mu`""")
+
+module.add_function ("double triqs_tprf::find_mu_for_density (triqs_tprf::e_k_cvt e_k, triqs_tprf::g_wk_cvt sigma_wk, double N, double mu0 = 0., double tol = 1e-10, int max_iter = 200, double mu_min = -std::numeric_limits<double>::infinity(), double mu_max = std::numeric_limits<double>::infinity())", doc = r"""Chemical potential for a given total density from the Dyson equation
+
+ Solves :math:`N(\mu) = N` for :math:`\mu`, evaluating :math:`N(\mu)` and :math:`dN/d\mu` with
+ the tail corrected Matsubara sums of ``density_from_dyson``, without constructing
+ :math:`G`. Uses Newton steps with a bisection fallback, restricted to
+ :math:`\mu_{min} \le \mu \le \mu_{max}`. An error is raised if :math:`N` is not
+ attained in this range. The Green's function can then be constructed once, using e.g. ``lattice_dyson_g_wk``.
+
+Parameters
+----------
+e_k
+     discretized lattice dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+sigma_wk
+     imaginary frequency self-energy :math:`\Sigma_{\bar{a}b}(i\omega_n, \mathbf{k})`
+
+N
+     target total density :math:`N`
+
+mu0
+     initial chemical potential
+
+tol
+     tolerance in the total density
+
+max_iter
+     maximal number of iterations
+
+mu_min
+     lower bound of the chemical potential search range
+
+mu_max
+     upper bound of the chemical potential search range
+
+Returns
+-------
+out
+     Chemical potential :math:`\mu`""")
+
+module.add_function ("double triqs_tprf::find_mu_for_density (triqs_tprf::e_k_cvt e_k, triqs_tprf::g_Dwk_cvt sigma_wk, double N, double mu0 = 0., double tol = 1e-10, int max_iter = 200, double mu_min = -std::numeric_limits<double>::infinity(), double mu_max = std::numeric_limits<double>::infinity())")
+
 module.add_function ("triqs_tprf::e_k_t triqs_tprf::rho_k_from_g_wk (triqs_tprf::g_wk_cvt g_wk)", doc = r"""Density matrix from lattic Green's function
       
 Parameters
@@ -793,12 +1062,77 @@ module.add_function ("triqs_tprf::g_f_t triqs_tprf::g0w_dynamic_sigma (double mu
 
 module.add_function ("triqs_tprf::g_fk_t triqs_tprf::g0w_dynamic_sigma (double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_fk_cvt W_fk, triqs_tprf::chi_k_cvt v_k, double delta, mesh::brzone kmesh)", doc = r"""add documentation!""")
 
+module.add_function ("array<std::complex<double>, 4> triqs_tprf::g0w_dynamic_sigma_on_kpoints (double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_fk_cvt W_fk, triqs_tprf::chi_k_cvt v_k, double delta, array<double, 2> kpoints)", doc = r"""Real frequency G0W self energy on a list of momentum points
+
+  Evaluates :math:`\Sigma_{ab}(\omega, \mathbf{k}_i)` at arbitrary momenta,
+  diagonalizing the interpolated dispersion :math:`\epsilon(\mathbf{k}_i + \mathbf{q})`
+  for every :math:`\mathbf{q}` as ``g0w_dynamic_sigma`` does for a single ``kpoint``.
+  The spectral function of :math:`W` is computed once for all points, and the
+  points are distributed over MPI ranks and OpenMP threads.
+
+Parameters
+----------
+mu
+     chemical potential :math:`\mu`
+
+beta
+     inverse temperature
+
+e_k
+     one-particle dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+W_fk
+     screened interaction :math:`W_{abcd}(\omega, \mathbf{k})`
+
+v_k
+     bare interaction :math:`V_{abcd}(\mathbf{k})`
+
+delta
+     broadening :math:`\delta`
+
+kpoints
+     momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``
+
+Returns
+-------
+out
+     self energy :math:`\Sigma_{ab}(\omega, \mathbf{k}_i)`, array of shape ``(n_\omega, n_k, n_b, n_b)``""")
+
 module.add_function ("triqs_tprf::g_fk_t triqs_tprf::g0w_dynamic_sigma (double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_fk_cvt W_fk, triqs_tprf::chi_k_cvt v_k, double delta)", doc = r"""add documentation!""")
 
 module.add_function ("array<std::complex<double>, 2> g0w_sigma(double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_k_cvt v_k, mesh::brzone::value_t kpoint)", doc = r"""Add some docs""")
 
 module.add_function ("triqs_tprf::e_k_t triqs_tprf::g0w_sigma (double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_k_cvt v_k, mesh::brzone kmesh)", doc = r"""Add some docs""")
 
+module.add_function ("array<std::complex<double>, 3> triqs_tprf::g0w_sigma_on_kpoints (double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_k_cvt v_k, array<double, 2> kpoints)", doc = r"""Static G0W self energy on a list of momentum points
+
+  Evaluates :math:`\Sigma_{ab}(\mathbf{k}_i)` at arbitrary momenta,
+  diagonalizing the interpolated dispersion :math:`\epsilon(\mathbf{k}_i + \mathbf{q})`
+  for every :math:`\mathbf{q}` as ``g0w_sigma`` does for a single ``kpoint``.
+  The points are distributed over MPI ranks and OpenMP threads.
+
+Parameters
+----------
+mu
+     chemical potential :math:`\mu`
+
+beta
+     inverse temperature
+
+e_k
+     one-particle dispersion :math:`\epsilon_{\bar{a}b}(\mathbf{k})`
+
+v_k
+     bare interaction :math:`V_{abcd}(\mathbf{k})`
+
+kpoints
+     momentum points :math:`\mathbf{k}_i`, array of shape ``(n_k, 3)``
+
+Returns
+-------
+out
+     self energy :math:`\Sigma_{ab}(\mathbf{k}_i)`, array of shape ``(n_k, n_b, n_b)``""")
+
 module.add_function ("triqs_tprf::e_k_t triqs_tprf::g0w_sigma (double mu, double beta, triqs_tprf::e_k_cvt e_k, triqs_tprf::chi_k_cvt v_k)", doc = r"""GW self energy :math:`\Sigma(\mathbf{k})` calculator for static interactions
 
     Computes the GW self-energy of a static interaction as the product
@@ -1115,6 +1449,9 @@ module.add_function ("triqs_tprf::g_wk_t triqs_tprf::eliashberg_product (triqs_t
 
      by summation.
 
+     The summation is performed as a matrix product for each bosonic frequency
+     transfer, using a precomputed index table for the momentum transfer.
+
 Parameters
 ----------
 Gamma_pp
@@ -1131,6 +1468,36 @@ Returns
 out
      Gives the result of the product :math:`\Delta^{\mathrm{s/t}, \mathrm{out}}`""")
 
+module.add_function ("triqs_tprf::g_Dwk_t triqs_tprf::eliashberg_product (triqs_tprf::chi_Dwk_vt Gamma_pp, triqs_tprf::g_Dwk_vt g_wk, triqs_tprf::g_Dwk_vt delta_wk)", doc = r"""""")
+
+module.add_function ("triqs_tprf::g_Dwk_t triqs_tprf::eliashberg_product (triqs_tprf::chi_Dwk_vt Gamma_pp, triqs_tprf::chi_k_vt Gamma_pp_const_k, triqs_tprf::g_Dwk_vt g_wk, triqs_tprf::g_Dwk_vt delta_wk)", doc = r"""Linearized Eliashberg product via summation on DLR meshes
+
+     The frequency convolution is performed as a product in DLR imaginary time.
+     The part of the vertex that is constant in frequency, e.g. the bare
+     interaction in RPA vertices, is a delta function in imaginary time that can
+     not be represented by DLR. It is subtracted from the vertex and added as a
+     separate static term. The overload without ``Gamma_pp_const_k`` assumes
+     that the vertex decays to zero at large frequencies.
+
+Parameters
+----------
+Gamma_pp
+     particle-particle vertex :math:`\Gamma^{\mathrm{s/t}}_{a\bar{b}c\bar{d}}(i\nu_n,\mathbf{k})`, including the constant part
+
+Gamma_pp_const_k
+     part of the vertex that is constant in frequency :math:`\Gamma^{\mathrm{s/t}}_{a\bar{b}c\bar{d}}(\mathbf{k})`
+
+g_wk
+     single particle Green's function :math:`G_{a\bar{b}}(i\nu_n,\mathbf{k})`
+
+delta_wk
+     superconducting gap :math:`\Delta^{\mathrm{s/t}, \mathrm{in}}_{\bar{a}\bar{b}}(i\nu_n,\mathbf{k})`
+
+Returns
+-------
+out
+     Gives the result of the product :math:`\Delta^{\mathrm{s/t}, \mathrm{out}}`""")
+
 module.add_function ("triqs_tprf::g_wk_t triqs_tprf::eliashberg_product_fft (triqs_tprf::chi_tr_vt Gamma_pp_dyn_tr, triqs_tprf::chi_r_vt Gamma_pp_const_r, triqs_tprf::g_wk_vt g_wk, triqs_tprf::g_wk_vt delta_wk)", doc = r"""Linearized Eliashberg product via FFT
 
      Computes the linearized Eliashberg product in the singlet/triplet channel given by
@@ -1312,6 +1679,91 @@ Returns
 out
      The reducible ladder vertex in the density/magnetic channel :math:`\Phi^{\mathrm{d/m}}(i\omega_n,\mathbf{q})`""")
 
+module.add_function ("triqs_tprf::chi_wk_t triqs_tprf::construct_gamma_singlet_rpa_wk (triqs_tprf::chi_wk_vt chi_d, triqs_tprf::chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d, array_contiguous_view<std::complex<double>, 4> U_m)", doc = r"""Computes the irreducible singlet vertex in the RPA limit directly from the susceptibilities.
+
+    The irreducible singlet vertex is given by
+
+    .. math::
+        \Gamma^{\text{s}}_{a\overline{b}c\overline{d}}(Q=0, K, K') \equiv
+        \frac{1}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{d}}
+        +
+        \frac{3}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{m}}
+        +
+        \text{Complex Conjugate}
+        \left[
+        3 
+        \Phi^{\text{m}}_{c\overline{b}a\overline{d}}(K-K')
+        +
+        \Phi^{\text{d}}_{c\overline{b}a\overline{d}}(K-K')
+        \right]
+        \,,
+
+    with the reducible ladder vertices :math:`\Phi^{\text{d/m}} = U^{\text{d/m}}\chi^{\text{d/m}}U^{\text{d/m}}`,
+    see :meth:`construct_phi_wk`. The reducible ladder vertices are computed on the fly
+    for every frequency and momentum and are never stored.
+
+Parameters
+----------
+chi_d
+     density susceptibility  :math:`\chi^{\mathrm{d}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+
+chi_m
+     magnetic susceptibility  :math:`\chi^{\mathrm{m}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+
+U_d
+     density local and static vertex  :math:`U^{\mathrm{d}}_{a\bar{b}c\bar{d}}`
+
+U_m
+     magnetic local and static vertex  :math:`U^{\mathrm{m}}_{a\bar{b}c\bar{d}}`
+
+Returns
+-------
+out
+     The irreducible singlet vertex :math:`\Gamma^{\mathrm{s}}(i\omega_n,\mathbf{q})`""")
+
+module.add_function ("triqs_tprf::chi_wk_t triqs_tprf::construct_gamma_triplet_rpa_wk (triqs_tprf::chi_wk_vt chi_d, triqs_tprf::chi_wk_vt chi_m, array_contiguous_view<std::complex<double>, 4> U_d, array_contiguous_view<std::complex<double>, 4> U_m)", doc = r"""Computes the irreducible triplet vertex in the RPA limit directly from the susceptibilities.
+
+    The irreducible triplet vertex is given by
+
+    .. math::
+        \Gamma^{\text{t}}_{a\overline{b}c\overline{d}}(Q=0, K, K') \equiv
+        -
+        \frac{1}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{d}}
+        +
+        \frac{1}{2}U_{a\overline{b}c\overline{d}}^{\mathrm{m}} 
+        +
+        \text{Complex Conjugate}
+        \left[
+        -
+        \Phi^{\text{m}}_{c\overline{b}a\overline{d}}(K-K')
+        -
+        \Phi^{\text{d}}_{c\overline{b}a\overline{d}}(K-K')
+        \right]
+        \,,
+
+    with the reducible ladder vertices :math:`\Phi^{\text{d/m}} = U^{\text{d/m}}\chi^{\text{d/m}}U^{\text{d/m}}`,
+    see :meth:`construct_phi_wk`. The reducible ladder vertices are computed on the fly
+    for every frequency and momentum and are never stored.
+
+Parameters
+----------
+chi_d
+     density susceptibility  :math:`\chi^{\mathrm{d}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+
+chi_m
+     magnetic susceptibility  :math:`\chi^{\mathrm{m}}_{\bar{a}b\bar{c}d}(i\omega_n,\mathbf{q})`
+
+U_d
+     density local and static vertex  :math:`U^{\mathrm{d}}_{a\bar{b}c\bar{d}}`
+
+U_m
+     magnetic local and static vertex  :math:`U^{\mathrm{m}}_{a\bar{b}c\bar{d}}`
+
+Returns
+-------
+out
+     The irreducible triplet vertex :math:`\Gamma^{\mathrm{t}}(i\omega_n,\mathbf{q})`""")
+
 module.add_function ("array<std::complex<double>, 6> triqs_tprf::cluster_mesh_fourier_interpolation (array<double, 2> k_vecs, triqs_tprf::chi_wr_cvt chi)", doc = r"""""")
 
 module.add_function ("triqs_tprf::chi_tr_t triqs_tprf::chi0_tr_from_grt_PH (triqs_tprf::g_tr_cvt g_tr)", doc = r"""Generalized susceptibility imaginary time bubble in the particle-hole channel :math:`\chi^{(0)}_{\bar{a}b\bar{c}d}(\tau, \mathbf{r})`
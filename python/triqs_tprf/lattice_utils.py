@@ -61,6 +61,7 @@ from triqs_tprf.lattice import chi_w0r_from_chi_tr
 from triqs_tprf.lattice import chi_wk_from_chi_wr
 
 from triqs_tprf.lattice import dlr_on_imfreq
+from triqs_tprf.lattice import pade_analytical_continuation_wk as _pade_analytical_continuation_wk
 
 # ----------------------------------------------------------------------
 def add_fake_bosonic_mesh(gf, beta=None):
@@ -198,7 +199,15 @@ def imtime_bubble_chi0_wk(g_wk, nw=1, save_memory=False, verbose=True):
     nw_g = len(wmesh)
     nk = len(kmesh)
 
-    ntau = 2 * nw_g
+    # -- On DLR meshes the bosonic frequencies are given by the DLR basis
+    # -- and the bubble is always computed on the full DLR imaginary time mesh
+    
+    dlr = type(wmesh) == MeshDLRImFreq
+    if dlr:
+        nw = nw_g
+        save_memory = False
+        
+    ntau = nw_g if dlr else 2 * nw_g
 
     # -- Memory Approximation
 
@@ -212,7 +221,7 @@ def imtime_bubble_chi0_wk(g_wk, nw=1, save_memory=False, verbose=True):
     nchi_w = nw * norb**4 # storing \chi(w)
     nchi_r = np.prod(nk) * norb**4 # storing \chi(r)
 
-    if nw == 1:
+    if nw == 1 and not dlr:
         ntot_case_1 = ng_tr + ng_wr
         ntot_case_2 = ng_tr + nchi_wr + ncores*(nchi_t + 2*ng_t)
         ntot_case_3 = 4 * nchi_wr
@@ -245,7 +254,7 @@ def imtime_bubble_chi0_wk(g_wk, nw=1, save_memory=False, verbose=True):
     g_tr = fourier_wr_to_tr(g_wr)
     del g_wr
     
-    if nw == 1:
+    if nw == 1 and not dlr:
         if verbose: mpi.report('--> chi0_w0r_from_grt_PH (bubble in tau & r)')
         chi0_wr = chi0_w0r_from_grt_PH(g_tr)
         del g_tr
@@ -544,6 +553,9 @@ def pade_analytical_continuation_wk(
     freq_offset : float
         Distance from the real axis used in the fit.
 
+    Matrix and rank 4 tensor valued Green's functions are continued by
+    the parallel C++ implementation :func:`triqs_tprf.lattice.pade_analytical_continuation_wk`.
+
     Returns
     -------
 
@@ -552,6 +564,10 @@ def pade_analytical_continuation_wk(
     
     """
     
+    if len(g_wk.target_shape) in [2, 4]:
+        return _pade_analytical_continuation_wk(
+            g_wk, fmesh, n_points, freq_offset)
+    
     wmesh = g_wk.mesh[0]
     kmesh = g_wk.mesh[1]
 
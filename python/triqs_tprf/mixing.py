@@ -0,0 +1,216 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+""" Convergence accelerators for self-consistent fixed point iterations
+
+A mixer takes the input :math:`x_{in}` and output :math:`x_{out} = F(x_{in})`
+of one fixed point iteration and returns the input of the next iteration.
+"""
+
+import numpy as np
+
+from h5.formats import register_class 
+
+# ----------------------------------------------------------------------
+class LinearMixer():
+
+    r""" Linear mixing
+
+    .. math::
+        x_{next} = x_{in} + \alpha ( x_{out} - x_{in} )
+
+    Parameters
+    ----------
+
+    alpha : float, optional
+        Mixing parameter, ``alpha = 1`` corresponds to no mixing.
+
+    """
+
+    def __init__(self, alpha=0.5):
+        assert( alpha > 0. )
+        assert( alpha <= 1. )
+        self.alpha = alpha
+
+    def reset(self):
+        pass
+
+    def __call__(self, x_in, x_out):
+        return x_in + self.alpha * (x_out - x_in)
+
+    def __reduce_to_dict__(self):
+        return dict(alpha=self.alpha)
+
+    @classmethod
+    def __factory_from_dict__(cls, name, d):
+        return cls(d['alpha'])
+
+# ----------------------------------------------------------------------
+class AndersonMixer():
+
+    r""" Anderson mixing (Pulay mixing, DIIS)
+
+    Using the residual :math:`f = x_{out} - x_{in}` and the differences
+    :math:`\Delta x_i`, :math:`\Delta f_i` between consecutive iterations
+    in the history, the next input is
+
+    .. math::
+        x_{next} = x_{in} + \alpha f - \sum_i \gamma_i (\Delta x_i + \alpha \Delta f_i)
+
+    where :math:`\gamma` minimizes :math:`\| f - \sum_i \gamma_i \Delta f_i \|`.
+
+    The history holds :math:`2 (\text{depth} + 1)` copies of the mixed
+    quantity. With a ``basis`` :math:`U` of orthonormal columns along the
+    first (frequency) axis, e.g. from :func:`matsubara_basis`, only the
+    coefficients :math:`U^\dagger x` are stored and the history correction
+    is expanded back with :math:`U`. The linear step :math:`x_{in} + \alpha f`
+    is always taken on the full quantity, so the fixed point is not affected
+    by the truncation of the basis. On a DLR mesh the values on the DLR
+    nodes are already compact and no basis is needed.
+
+    Parameters
+    ----------
+
+    alpha : float, optional
+        Linear mixing parameter used for the residual.
+
+    depth : int, optional
+        Number of previous iterations kept in the history.
+
+    basis : ndarray, optional
+        Matrix :math:`U` of shape ``(n_w, n_c)`` with orthonormal columns,
+        in which the history is stored.
+
+    """
+
+    def __init__(self, alpha=0.5, depth=5, basis=None):
+        assert( alpha > 0. )
+        assert( depth >= 1 )
+        self.alpha = alpha
+        self.depth = depth
+        self.basis = basis
+        self.reset()
+
+    def reset(self):
+        self.x_prev, self.f_prev = None, None
+        self.dx, self.df = [], []
+
+    def _compress(self, x):
+        if self.basis is None:
+            return x.flatten()
+        return (self.basis.conj().T @ x.reshape(len(self.basis), -1)).flatten()
+
+    def _expand(self, c, shape):
+        if self.basis is None:
+            return c.reshape(shape)
+        return (self.basis @ c.reshape(self.basis.shape[1], -1)).reshape(shape)
+
+    def __call__(self, x_in, x_out):
+
+        shape = np.shape(x_in)
+        x = np.array(x_in)
+        f = np.array(x_out) - x
+
+        c_x, c_f = self._compress(x), self._compress(f)
+
+        if self.x_prev is not None:
+            self.dx.append(c_x - self.x_prev)
+            self.df.append(c_f - self.f_prev)
+            self.dx, self.df = self.dx[-self.depth:], self.df[-self.depth:]
+
+        self.x_prev, self.f_prev = c_x, c_f
+
+        x_next = x + self.alpha * f
+
+        if len(self.df) > 0:
+            dX = np.array(self.dx).T
+            dF = np.array(self.df).T
+            gamma = np.linalg.lstsq(dF, c_f, rcond=None)[0]
+            x_next -= self._expand((dX + self.alpha * dF) @ gamma, shape)
+
+        return x_next
+
+    def __reduce_to_dict__(self):
+        d = dict(alpha=self.alpha, depth=self.depth)
+        if self.basis is not None:
+            d['basis'] = self.basis
+        if self.x_prev is not None:
+            d['x_prev'], d['f_prev'] = self.x_prev, self.f_prev
+        if len(self.dx) > 0:
+            d['dx'], d['df'] = np.array(self.dx), np.array(self.df)
+        return d
+
+    @classmethod
+    def __factory_from_dict__(cls, name, d):
+        ret = cls(d['alpha'], int(d['depth']), basis=d.get('basis', None))
+        if 'x_prev' in d:
+            ret.x_prev, ret.f_prev = d['x_prev'], d['f_prev']
+        if 'dx' in d:
+            ret.dx, ret.df = list(d['dx']), list(d['df'])
+        return ret
+
+# ----------------------------------------------------------------------
+def matsubara_basis(wmesh, w_max, eps=1e-12):
+
+    r""" Compact basis for Green's functions on a Matsubara frequency mesh
+
+    Orthonormal basis of the span of a constant and the kernel
+    :math:`1/(i\omega_n - \omega)` for real frequencies
+    :math:`|\omega| \le \omega_{max}`, truncated at the relative singular
+    value ``eps``. As for the DLR, the number of basis functions grows only
+    logarithmically with :math:`\beta \omega_{max}` and ``1/eps``.
+
+    Parameters
+    ----------
+
+    wmesh : MeshImFreq
+        Matsubara frequency mesh.
+
+    w_max : float
+        Real frequency cutoff, should exceed the spectral width.
+
+    eps : float, optional
+        Relative accuracy of the basis.
+
+    Returns
+    -------
+
+    basis : ndarray
+        Matrix of shape ``(n_w, n_c)`` with orthonormal columns.
+
+    """
+
+    iw = np.array([ complex(w.value) for w in wmesh ])
+
+    # -- Real frequency grid, linear below 2 pi / beta and geometric above
+    w_c = 2. * np.pi / wmesh.beta
+    n_log = int(np.ceil(np.log(max(w_max / w_c, 1.)) / np.log(1.05))) + 1
+    w = np.concatenate((np.linspace(0., w_c, num=16, endpoint=False), w_c * 1.05**np.arange(n_log)))
+    w = np.concatenate((-w[:0:-1], w))
+
+    K = np.hstack((np.ones((len(iw), 1)), 1. / (iw[:, None] - w[None, :])))
+    U, s, _ = np.linalg.svd(K, full_matrices=False)
+
+    return U[:, s > eps * s[0]]
+
+# -- Register mixers in Triqs formats
+register_class(LinearMixer)
+register_class(AndersonMixer)
@@ -0,0 +1,973 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+r""" Lattice point-group symmetry and the irreducible Brillouin zone
+
+A point-group operation :math:`g` with Cartesian rotation matrix :math:`S_g`
+and orbital representation :math:`D_g` is a symmetry of the lattice when
+
+.. math::
+    \epsilon(S_g \mathbf{k}) = D_g \epsilon(\mathbf{k}) D_g^\dagger \, .
+
+All k-local quantities then only have to be computed on the irreducible wedge
+of the Brillouin zone and can be unfolded to the full momentum mesh.
+"""
+
+import itertools
+
+import numpy as np
+
+from h5.formats import register_class
+
+from triqs.gf import Gf, MeshProduct, MeshReFreq
+from triqs.utility import mpi
+
+import triqs_tprf.lattice as lattice
+
+# ----------------------------------------------------------------------
+def hypercubic_point_group(dim=3):
+
+    r""" Cartesian rotation matrices of the hypercubic point group
+
+    All signed permutations of the first ``dim`` Cartesian axes, i.e. the
+    :math:`C_{4v}` group (8 operations) for ``dim = 2`` and the :math:`O_h`
+    group (48 operations) for ``dim = 3``.
+
+    Parameters
+    ----------
+
+    dim : int, optional
+        Dimension of the hypercubic lattice.
+
+    Returns
+    -------
+
+    operations : list of (3, 3) ndarrays
+        Rotation matrices, the identity is the first element.
+
+    """
+
+    assert( dim in [1, 2, 3] ), "Only dim = 1, 2 or 3 is supported."
+
+    operations = []
+    for perm in itertools.permutations(range(dim)):
+        for signs in itertools.product([1, -1], repeat=dim):
+            S = np.eye(3)
+            S[:dim, :dim] = 0.
+            for i, (j, s) in enumerate(zip(perm, signs)):
+                S[i, j] = s
+            operations.append(S)
+
+    return operations
+
+# ----------------------------------------------------------------------
+def _complete_basis(units):
+
+    """ Complete the lattice vectors of a low dimensional lattice to a 3x3 basis """
+
+    units = np.array(units, dtype=float).reshape(-1, 3)
+    dim = units.shape[0]
+    if dim == 3:
+        return units
+    # -- Orthonormal complement from the null space of the given vectors
+    _, _, vh = np.linalg.svd(units)
+    return np.vstack([units, vh[dim:]])
+
+# ----------------------------------------------------------------------
+def _group_closure(operations, representations, atol):
+
+    """ Close the set of operations (and representations) under multiplication """
+
+    nb = representations[0].shape[0]
+    ops = [np.eye(3)]
+    reps = [np.eye(nb, dtype=complex)]
+
+    def index(S):
+        for idx, S_g in enumerate(ops):
+            if np.allclose(S, S_g, atol=atol):
+                return idx
+        return None
+
+    for S, D in zip(operations, representations):
+        if index(S) is None:
+            ops.append(np.array(S, dtype=float))
+            reps.append(np.array(D, dtype=complex))
+
+    n_ops = 0
+    while n_ops < len(ops):
+        n_ops = len(ops)
+        for a, b in itertools.product(range(n_ops), repeat=2):
+            S = ops[a] @ ops[b]
+            if index(S) is None:
+                ops.append(S)
+                reps.append(reps[a] @ reps[b])
+        assert( len(ops) <= 48 ), "The operations do not generate a finite point group."
+
+    return np.array(ops), np.array(reps)
+
+# ----------------------------------------------------------------------
+class IrreducibleBrillouinZone():
+
+    r""" Irreducible wedge of a momentum mesh under a lattice point group
+
+    Builds the tables relating every point of the momentum mesh to its
+    representative in the irreducible wedge, i.e. the star of every
+    irreducible point, the integration weights and the unfold operators
+    :math:`D_g` with :math:`X(S_g \mathbf{k}) = D_g X(\mathbf{k}) D_g^\dagger`.
+
+    The given operations are closed under multiplication, so it is enough to
+    pass the generators of the point group. Phase factors from orbital
+    positions away from the unit cell origin are not included, they have to
+    be absorbed in the orbital representation matrices.
+
+    The kernels distribute the irreducible momentum points over the MPI
+    ranks and check that the dispersion is invariant under the point group,
+    see :meth:`check_representations`.
+
+    Parameters
+    ----------
+
+    tb_lattice : TBLattice
+        Tight binding lattice defining the Bravais lattice vectors.
+
+    kmesh : MeshBrZone
+        Momentum mesh, every operation has to map the mesh onto itself.
+
+    operations : list of (3, 3) array_like
+        Cartesian rotation matrices of the point-group operations.
+
+    representations : list of (nb, nb) array_like, optional
+        Orbital representation matrices :math:`D_g` of the operations,
+        default is the identity (orbitals invariant under the point group).
+
+    atol : float, optional
+        Tolerance used when comparing operations.
+
+    Attributes
+    ----------
+
+    ibz_k : (n_ibz,) ndarray
+        Mesh indices of the irreducible momentum points.
+
+    k_to_ibz : (nk,) ndarray
+        Index into ``ibz_k`` of the representative of every momentum point.
+
+    k_to_op : (nk,) ndarray
+        Index of the operation mapping the representative onto the point.
+
+    star_table : (n_ops, nk) ndarray
+        Mesh index of :math:`S_g \mathbf{k}` for all operations and points.
+
+    weights : (n_ibz,) ndarray
+        Star size of every irreducible point divided by the number of points.
+
+    """
+
+    def __init__(self, tb_lattice, kmesh, operations, representations=None, atol=1e-8):
+
+        if representations is None:
+            nb = tb_lattice.n_orbitals
+            representations = [np.eye(nb)] * len(operations)
+
+        assert( len(operations) == len(representations) ), \
+            "The number of operations and representations differ."
+
+        self.kmesh = kmesh
+        self.ops, self.reps = _group_closure(operations, representations, atol)
+        self.n_ops = len(self.ops)
+        self.nb = self.reps.shape[-1]
+
+        # -- Operations in reduced reciprocal lattice coordinates
+
+        A = _complete_basis(tb_lattice.bl.units)
+        M = np.einsum('ij,gjk,kl->gil', A, self.ops, np.linalg.inv(A))
+        self.ops_reduced = np.rint(M).astype(int)
+
+        assert( np.allclose(M, self.ops_reduced, atol=atol) ), \
+            "The operations are not symmetries of the Bravais lattice."
+
+        self.dims = np.array(kmesh.dims, dtype=int)
+        self.nk = int(np.prod(self.dims))
+
+        for M_g in self.ops_reduced:
+            i, j = np.nonzero(M_g)
+            if np.any(self.dims[i] != self.dims[j]):
+                raise ValueError("The momentum mesh is not invariant under the point group.")
+
+        # -- Star table, mesh index of S_g k
+
+        n = np.array(np.unravel_index(np.arange(self.nk), self.dims)).T
+        self.star_table = np.array([
+            np.ravel_multi_index(((n @ M_g.T) % self.dims).T, self.dims)
+            for M_g in self.ops_reduced])
+
+        self._init_wedge()
+
+    def _init_wedge(self):
+
+        """ Irreducible wedge from the star table, the representative is the smallest index in the star """
+
+        k_rep = np.min(self.star_table, axis=0)
+        self.ibz_k, self.k_to_ibz, counts = np.unique(
+            k_rep, return_inverse=True, return_counts=True)
+        self.k_to_op = np.argmax(
+            self.star_table[:, k_rep] == np.arange(self.nk)[None, :], axis=0)
+
+        self.n_ibz = len(self.ibz_k)
+        self.weights = counts / self.nk
+
+        for attr in ['star_table', 'ibz_k', 'k_to_ibz', 'k_to_op', 'weights']:
+            getattr(self, attr).flags.writeable = False
+
+    @property
+    def k_weights(self):
+
+        """ Momentum weights on the full mesh, star weights on the irreducible points and zero elsewhere """
+
+        k_weights = np.zeros(self.nk)
+        k_weights[self.ibz_k] = self.weights
+        return k_weights
+
+    def star(self, i):
+
+        """ Mesh indices of the star of the irreducible point ``i`` """
+
+        return np.flatnonzero(self.k_to_ibz == i)
+
+    def __reduce_to_dict__(self):
+        return dict(kmesh=self.kmesh, ops=self.ops, reps=self.reps,
+                    ops_reduced=self.ops_reduced, star_table=np.array(self.star_table))
+
+    @classmethod
+    def __factory_from_dict__(cls, name, d):
+        ret = cls.__new__(cls)
+        ret.kmesh = d['kmesh']
+        ret.ops, ret.reps = np.array(d['ops']), np.array(d['reps'])
+        ret.ops_reduced = np.array(d['ops_reduced'], dtype=int)
+        ret.star_table = np.array(d['star_table'], dtype=int)
+        ret.n_ops, ret.nb = len(ret.ops), ret.reps.shape[-1]
+        ret.dims = np.array(ret.kmesh.dims, dtype=int)
+        ret.nk = int(np.prod(ret.dims))
+        ret._init_wedge()
+        return ret
+
+    def check_representations(self, e_k, atol=1e-8):
+
+        r""" Check that :math:`\epsilon(S_g \mathbf{k}) = D_g \epsilon(\mathbf{k}) D_g^\dagger` for all operations
+
+        Parameters
+        ----------
+
+        e_k : Gf
+            Dispersion on the momentum mesh.
+
+        Returns
+        -------
+
+        ok : bool
+
+        """
+
+        e = e_k.data
+        for S, D in zip(self.star_table, self.reps):
+            if not np.allclose(e[S], D @ e @ D.conj().T, atol=atol):
+                return False
+        return True
+
+    def restrict(self, data, target_rank=2):
+
+        """ Restrict mesh data to the irreducible points
+
+        Parameters
+        ----------
+
+        data : ndarray
+            Data with the momentum axis directly before the ``target_rank`` target indices.
+
+        target_rank : int, optional
+            Rank of the target space, 2 for one-particle and 4 for two-particle quantities.
+
+        Returns
+        -------
+
+        data_ibz : ndarray
+            Data with the momentum axis restricted to the irreducible points.
+
+        """
+
+        return np.take(data, self.ibz_k, axis=-(target_rank + 1))
+
+    def unfold(self, data_ibz, target_rank=2, k_indices=None):
+
+        r""" Unfold data on the irreducible points to (a subset of) the full mesh
+
+        One-particle quantities transform as
+        :math:`X(S_g \mathbf{k}) = D_g X(\mathbf{k}) D_g^\dagger`.
+        Two-particle quantities follow the TPRF ordering
+        :math:`\chi_{\bar{a}b\bar{c}d}` of the particle-hole bubble
+        :math:`-G_{d\bar{a}} G_{b\bar{c}}`, and transform with
+        :math:`D^*_g \otimes D_g \otimes D^*_g \otimes D_g`.
+
+        Parameters
+        ----------
+
+        data_ibz : ndarray
+            Data with the momentum axis, restricted to the irreducible points,
+            directly before the ``target_rank`` target indices.
+
+        target_rank : int, optional
+            Rank of the target space, 2 or 4.
+
+        k_indices : array_like, optional
+            Mesh indices to unfold to, default is the full mesh.
+
+        Returns
+        -------
+
+        data : ndarray
+            Unfolded data with the momentum axis running over ``k_indices``.
+
+        """
+
+        assert( target_rank in [2, 4] ), "Only target rank 2 and 4 are supported."
+
+        if k_indices is None:
+            k_indices = np.arange(self.nk)
+        k_indices = np.asarray(k_indices)
+
+        data = np.take(data_ibz, self.k_to_ibz[k_indices], axis=-(target_rank + 1))
+        D = self.reps[self.k_to_op[k_indices]]
+        Dc = D.conj()
+
+        if target_rank == 2:
+            return np.einsum('kaA,...kAB,kbB->...kab', D, data, Dc, optimize=True)
+        else:
+            return np.einsum('kaA,kbB,kcC,kdD,...kABCD->...kabcd',
+                             Dc, D, Dc, D, data, optimize=True)
+
+    def symmetrize_local(self, data):
+
+        r""" Point-group average :math:`\frac{1}{N_g} \sum_g D_g X D_g^\dagger` of local data
+
+        Parameters
+        ----------
+
+        data : ndarray
+            Data with the two orbital indices last.
+
+        Returns
+        -------
+
+        data : ndarray
+
+        """
+
+        return np.einsum('gaA,...AB,gbB->...ab',
+                         self.reps, data, self.reps.conj(), optimize=True) / self.n_ops
+
+    def _distribute(self, compute, shape):
+
+        """ Evaluate ``compute(i)`` on the irreducible points ``i``, distributed over the MPI ranks """
+
+        data = np.zeros((self.n_ibz,) + tuple(shape), dtype=complex)
+        for i in range(mpi.rank, self.n_ibz, mpi.size):
+            data[i] = compute(i)
+        return mpi.all_reduce(data)
+
+    def _check_dispersion(self, e_k):
+        assert( self.check_representations(e_k) ), \
+            "The dispersion is not invariant under the point group."
+
+    def _kq_indices(self, qidx):
+
+        """ Mesh indices of :math:`\mathbf{k} + \mathbf{q}` for all :math:`\mathbf{k}` and the mesh index ``qidx`` of :math:`\mathbf{q}` """
+
+        n = np.array(np.unravel_index(np.arange(self.nk), self.dims))
+        n_q = np.array(np.unravel_index(qidx, self.dims))
+        return np.ravel_multi_index((n + n_q[:, None]) % self.dims[:, None], self.dims)
+
+    def _gf(self, data_ibz, mesh, unfold):
+
+        """ Wrap irreducible data on the product of ``mesh`` and the momentum mesh """
+
+        g_ibz = IBZGf(self, data_ibz, mesh=mesh)
+        return g_ibz.to_gf() if unfold else g_ibz
+
+    def lattice_dyson_g0_wk(self, mu, e_k, mesh, unfold=True):
+
+        r""" Free lattice Green's function computed on the irreducible wedge
+
+        .. math::
+            G^{(0)}_{ab}(z, \mathbf{k}) = \left[ (z + \mu ) \cdot \mathbf{1} - \epsilon(\mathbf{k}) \right]^{-1}_{ab}
+
+        Parameters
+        ----------
+
+        mu : float
+            Chemical potential :math:`\mu`.
+
+        e_k : Gf
+            Dispersion on the momentum mesh of the irreducible zone.
+
+        mesh : MeshImFreq or MeshDLRImFreq
+            Frequency mesh.
+
+        unfold : bool, optional
+            Return the unfolded Gf, otherwise the compact IBZGf.
+
+        Returns
+        -------
+
+        g0_wk : Gf or IBZGf
+            Green's function :math:`G^{(0)}_{ab}(z, \mathbf{k})`.
+
+        """
+
+        self._check_dispersion(e_k)
+
+        z = np.array([complex(w) for w in mesh]) + mu
+        e, U = np.linalg.eigh(self.restrict(e_k.data))
+
+        g0 = self._distribute(
+            lambda i : np.einsum('an,wn,bn->wab', U[i], 1. / (z[:, None] - e[i][None]), U[i].conj()),
+            (len(z), self.nb, self.nb))
+
+        return self._gf(np.moveaxis(g0, 0, 1), mesh, unfold)
+
+    def lattice_dyson_g_wk(self, mu, e_k, sigma, unfold=True):
+
+        r""" Lattice Green's function computed on the irreducible wedge
+
+        .. math::
+            G_{ab}(z, \mathbf{k}) = \left[ (z + \mu ) \cdot \mathbf{1} - \epsilon(\mathbf{k}) - \Sigma(z, \mathbf{k}) \right]^{-1}_{ab}
+
+        The self-energy has to be invariant under the point group.
+
+        Parameters
+        ----------
+
+        mu : float
+            Chemical potential :math:`\mu`.
+
+        e_k : Gf
+            Dispersion on the momentum mesh of the irreducible zone.
+
+        sigma : Gf
+            Local self-energy :math:`\Sigma(z)` or momentum dependent self-energy :math:`\Sigma(z, \mathbf{k})`.
+
+        unfold : bool, optional
+            Return the unfolded Gf, otherwise the compact IBZGf.
+
+        Returns
+        -------
+
+        g_wk : Gf or IBZGf
+            Green's function :math:`G_{ab}(z, \mathbf{k})`.
+
+        """
+
+        self._check_dispersion(e_k)
+
+        if isinstance(sigma.mesh, MeshProduct):
+            mesh = sigma.mesh[0]
+            sigma_ibz = np.moveaxis(self.restrict(sigma.data), 1, 0)
+            sigma_i = lambda i : sigma_ibz[i]
+        else:
+            mesh = sigma.mesh
+            sigma_i = lambda i : sigma.data
+
+        z = np.array([complex(w) for w in mesh]) + mu
+        zI = z[:, None, None] * np.eye(self.nb)[None]
+        e_ibz = self.restrict(e_k.data)
+
+        g = self._distribute(
+            lambda i : np.linalg.inv(zI - e_ibz[i][None] - sigma_i(i)),
+            (len(z), self.nb, self.nb))
+
+        return self._gf(np.moveaxis(g, 0, 1), mesh, unfold)
+
+    def lattice_dyson_g_w(self, mu, e_k, sigma_w):
+
+        r""" Local lattice Green's function summed over the irreducible wedge
+
+        The weighted sum over the irreducible points, which are distributed
+        over the MPI ranks, is symmetrized with the point-group average. This
+        equals the sum over the full mesh for a self-energy invariant under
+        the point group.
+
+        Parameters
+        ----------
+
+        mu : float
+            Chemical potential :math:`\mu`.
+
+        e_k : Gf
+            Dispersion on the momentum mesh of the irreducible zone.
+
+        sigma_w : Gf
+            Local self-energy :math:`\Sigma(z)`.
+
+        Returns
+        -------
+
+        g_w : Gf
+            Local Green's function :math:`G_{ab}(z)`.
+
+        """
+
+        self._check_dispersion(e_k)
+
+        z = np.array([complex(w) for w in sigma_w.mesh]) + mu
+        zI = z[:, None, None] * np.eye(self.nb)[None]
+        e_ibz = self.restrict(e_k.data)
+
+        g = self._distribute(
+            lambda i : self.weights[i] * np.linalg.inv(zI - e_ibz[i][None] - sigma_w.data),
+            (len(z), self.nb, self.nb))
+
+        g_w = sigma_w.copy()
+        g_w.data[:] = self.symmetrize_local(np.sum(g, axis=0))
+        return g_w
+
+    def lindhard_chi00(self, e_k, mesh, mu, beta=None, delta=0., unfold=True):
+
+        r""" Generalized Lindhard susceptibility computed on the irreducible wedge of momentum transfers
+
+        .. math::
+            \chi^{(00)}_{\bar{a}b\bar{c}d}(z, \mathbf{q}) =
+            \frac{1}{N_k} \sum_{\mathbf{k}, i, j}
+            U_{ai}(\mathbf{k}) U^*_{di}(\mathbf{k})
+            U_{cj}(\mathbf{k} + \mathbf{q}) U^*_{bj}(\mathbf{k} + \mathbf{q})
+            \frac{f(\epsilon_i(\mathbf{k})) - f(\epsilon_j(\mathbf{k} + \mathbf{q}))}
+            {z + \epsilon_j(\mathbf{k} + \mathbf{q}) - \epsilon_i(\mathbf{k})}
+
+        as ``triqs_tprf.lattice.lindhard_chi00``, but only for the irreducible
+        momentum transfers :math:`\mathbf{q}`, which are distributed over the MPI ranks.
+
+        Parameters
+        ----------
+
+        e_k : Gf
+            Dispersion on the momentum mesh of the irreducible zone.
+
+        mesh : MeshImFreq, MeshDLRImFreq or MeshReFreq
+            Bosonic frequency mesh.
+
+        mu : float
+            Chemical potential :math:`\mu`.
+
+        beta : float, optional
+            Inverse temperature, required for real frequencies.
+
+        delta : float, optional
+            Broadening :math:`z = \omega + i \delta` for real frequencies.
+
+        unfold : bool, optional
+            Return the unfolded Gf, otherwise the compact IBZGf.
+
+        Returns
+        -------
+
+        chi00_wk : Gf or IBZGf
+            Lindhard susceptibility :math:`\chi^{(00)}_{\bar{a}b\bar{c}d}(z, \mathbf{q})`.
+
+        """
+
+        if isinstance(mesh, MeshReFreq):
+            assert( beta is not None ), "The inverse temperature is required for real frequencies."
+            z = np.array([complex(w) for w in mesh]) + 1.j * delta
+        else:
+            assert( mesh.statistic == 'Boson' ), "lindhard_chi00: statistic is incorrect."
+            beta = mesh.beta
+            z = np.array([complex(w) for w in mesh])
+
+        self._check_dispersion(e_k)
+
+        e, U = np.linalg.eigh(e_k.data - mu * np.eye(self.nb))
+        f = 0.5 * (1. - np.tanh(0.5 * beta * e))
+        df = 0.25 * beta / np.cosh(0.5 * beta * e)**2
+
+        def chi00_q(i):
+            kq = self._kq_indices(self.ibz_k[i])
+            de = e[kq][:, None, :] - e[:, :, None]
+            dn = f[:, :, None] - f[kq][:, None, :]
+
+            denom = z[:, None, None, None] + de[None]
+            pole = (np.abs(z)[:, None, None, None] < 1e-10) & (np.abs(de)[None] < 1e-10)
+            factor = np.where(pole, df[None, :, :, None], dn[None] / np.where(pole, 1., denom))
+
+            return np.einsum('kai,kdi,kcj,kbj,wkij->wabcd',
+                             U, U.conj(), U[kq], U[kq].conj(), factor, optimize=True) / self.nk
+
+        chi = self._distribute(chi00_q, (len(z),) + (self.nb,)*4)
+
+        return self._gf(np.moveaxis(chi, 0, 1), mesh, unfold)
+
+    def g0w_sigma(self, mu, beta, e_k, v_k, W_fk=None, delta=None, unfold=True):
+
+        r""" G0W self energy computed on the irreducible wedge
+
+        Evaluates ``triqs_tprf.lattice.g0w_sigma`` at the irreducible momentum
+        points, which are distributed over the MPI ranks. Without ``W_fk`` this
+        is the static self energy :math:`\Sigma_{ab}(\mathbf{k})`, otherwise
+        the real frequency self energy :math:`\Sigma_{ab}(\omega, \mathbf{k})`.
+        The interactions have to be invariant under the point group.
+
+        Parameters
+        ----------
+
+        mu : float
+            Chemical potential :math:`\mu`.
+
+        beta : float
+            Inverse temperature.
+
+        e_k : Gf
+            Dispersion on the momentum mesh of the irreducible zone.
+
+        v_k : Gf
+            Bare interaction :math:`V_{abcd}(\mathbf{k})`.
+
+        W_fk : Gf, optional
+            Real frequency screened interaction :math:`W_{abcd}(\omega, \mathbf{k})`.
+
+        delta : float, optional
+            Broadening, required with ``W_fk``.
+
+        unfold : bool, optional
+            Return the unfolded Gf, otherwise the compact IBZGf.
+
+        Returns
+        -------
+
+        sigma_k or sigma_fk : Gf or IBZGf
+            Self energy :math:`\Sigma_{ab}(\mathbf{k})` or :math:`\Sigma_{ab}(\omega, \mathbf{k})`.
+
+        """
+
+        self._check_dispersion(e_k)
+
+        kpoints = [k.value for k in self.kmesh]
+        kpoint = lambda i : kpoints[self.ibz_k[i]]
+
+        if W_fk is None:
+            sigma = self._distribute(
+                lambda i : lattice.g0w_sigma(mu, beta, e_k, v_k, kpoint(i)), (self.nb, self.nb))
+            return self._gf(sigma, None, unfold)
+
+        assert( delta is not None ), "The broadening is required with W_fk."
+        fmesh = W_fk.mesh[0]
+        sigma = self._distribute(
+            lambda i : lattice.g0w_sigma(mu, beta, e_k, W_fk, v_k, delta, kpoint(i)).data,
+            (len(fmesh), self.nb, self.nb))
+
+        return self._gf(np.moveaxis(sigma, 0, 1), fmesh, unfold)
+
+    def solve_rpa_PH(self, chi0_wk, U_abcd, unfold=True):
+
+        r""" Random phase approximation in the particle-hole channel on the irreducible wedge
+
+        .. math::
+            \chi = \left[ 1 - \chi^{(0)} U \right]^{-1} \chi^{(0)}
+
+        Both :math:`\chi^{(0)}` and the interaction have to be invariant under the point group.
+
+        Parameters
+        ----------
+
+        chi0_wk : Gf
+            Bare particle-hole bubble :math:`\chi^{(0)}_{\bar{a}b\bar{c}d}(\omega, \mathbf{k})`.
+
+        U_abcd : (nb, nb, nb, nb) ndarray
+            Interaction tensor.
+
+        unfold : bool, optional
+            Return the unfolded Gf, otherwise the compact IBZGf.
+
+        Returns
+        -------
+
+        chi_wk : Gf or IBZGf
+            Generalized susceptibility :math:`\chi_{\bar{a}b\bar{c}d}(\omega, \mathbf{k})`.
+
+        """
+
+        nb = chi0_wk.target_shape[0]
+        chi0 = self.restrict(chi0_wk.data, target_rank=4)
+        shape = chi0.shape
+
+        # -- PH grouping (permuting the last two indices)
+        chi0 = np.swapaxes(chi0, -1, -2).reshape(shape[:2] + (nb**2, nb**2))
+        U = np.swapaxes(U_abcd, -1, -2).reshape(nb**2, nb**2)
+
+        chi = np.linalg.solve(np.eye(nb**2) - chi0 @ U, chi0)
+        chi = np.swapaxes(chi.reshape(shape), -1, -2)
+
+        return self._gf(chi, chi0_wk.mesh[0], unfold)
+
+# ----------------------------------------------------------------------
+class IBZGf():
+
+    r""" Momentum dependent Green's function stored on the irreducible wedge
+
+    Only the data on the irreducible momentum points is kept, together with
+    the symmetry tables of the irreducible Brillouin zone. Elements are
+    unfolded lazily on access and the full Gf is built in blocks of momentum
+    points, so the full data is never held twice.
+
+    Parameters
+    ----------
+
+    ibz : IrreducibleBrillouinZone
+        Irreducible Brillouin zone of the momentum mesh.
+
+    data : ndarray
+        Data on the irreducible points with shape ``(n_ibz,) + target_shape``
+        or ``(len(mesh), n_ibz) + target_shape``.
+
+    mesh : Mesh, optional
+        Frequency or time mesh preceding the momentum mesh.
+
+    """
+
+    def __init__(self, ibz, data, mesh=None):
+
+        self.ibz, self.mesh = ibz, mesh
+        self.data = np.asarray(data)
+        self.target_rank = self.data.ndim - (1 if mesh is None else 2)
+
+        assert( self.target_rank in [2, 4] ), "Only target rank 2 and 4 are supported."
+        assert( self.data.shape[-(self.target_rank + 1)] == ibz.n_ibz ), \
+            "The data does not match the number of irreducible points."
+
+    @classmethod
+    def from_gf(cls, g, ibz):
+
+        """ Restrict a Gf on the (frequency and) momentum mesh to the irreducible wedge """
+
+        mesh = g.mesh[0] if isinstance(g.mesh, MeshProduct) else None
+        data = ibz.restrict(g.data, target_rank=len(g.target_shape))
+        return cls(ibz, data.copy(), mesh=mesh)
+
+    @property
+    def target_shape(self):
+        return self.data.shape[-self.target_rank:]
+
+    def __getitem__(self, key):
+
+        """ Unfolded target data at the momentum point ``k`` or ``(w, k)`` """
+
+        if self.mesh is None:
+            data, k = self.data, key
+        else:
+            w, k = key
+            data = self.data[getattr(w, 'data_index', w)]
+
+        k = getattr(k, 'data_index', k)
+        data = self.ibz.unfold(data, target_rank=self.target_rank, k_indices=[k])
+        return np.take(data, 0, axis=-(self.target_rank + 1))
+
+    def _k_blocks(self, k_block):
+        nk = self.ibz.nk
+        return [np.arange(k, min(k + k_block, nk)) for k in range(0, nk, k_block)]
+
+    def unfold_blocks(self, k_block=256):
+
+        """ Iterate over the unfolded data in blocks of momentum points
+
+        Parameters
+        ----------
+
+        k_block : int, optional
+            Number of momentum points per block.
+
+        Yields
+        ------
+
+        k_indices : ndarray
+            Mesh indices of the momentum points in the block.
+
+        data : ndarray
+            Unfolded data with the momentum axis running over ``k_indices``.
+
+        """
+
+        for k_indices in self._k_blocks(k_block):
+            yield k_indices, self.ibz.unfold(
+                self.data, target_rank=self.target_rank, k_indices=k_indices)
+
+    def unfold_element(self, idx, k_block=256):
+
+        """ Unfold a single target element to the full momentum mesh
+
+        Parameters
+        ----------
+
+        idx : tuple of int
+            Target indices of the element.
+
+        k_block : int, optional
+            Number of momentum points per block.
+
+        Returns
+        -------
+
+        data : ndarray
+            Element data with shape ``(nk,)`` or ``(len(mesh), nk)``.
+
+        """
+
+        assert( len(idx) == self.target_rank ), "Wrong number of target indices."
+
+        ibz, rank = self.ibz, self.target_rank
+        D, Dc = ibz.reps, ibz.reps.conj()
+        vecs = [D, Dc] if rank == 2 else [Dc, D, Dc, D]
+
+        target = 'ABCD'[:rank]
+        subscripts = ','.join(['k' + t for t in target]) + ',...k' + target + '->...k'
+
+        out = np.empty(self.data.shape[:-(rank + 1)] + (ibz.nk,), dtype=complex)
+        for k_indices in self._k_blocks(k_block):
+            ops = ibz.k_to_op[k_indices]
+            x = np.take(self.data, ibz.k_to_ibz[k_indices], axis=-(rank + 1))
+            v = [vec[ops, i] for vec, i in zip(vecs, idx)]
+            out[..., k_indices] = np.einsum(subscripts, *v, x, optimize=True)
+
+        return out
+
+    def to_gf(self, k_block=256):
+
+        """ Unfold to a regular Gf, streamed in blocks of momentum points
+
+        Parameters
+        ----------
+
+        k_block : int, optional
+            Number of momentum points per block.
+
+        Returns
+        -------
+
+        g : Gf
+            Gf on the full (frequency and) momentum mesh.
+
+        """
+
+        mesh = self.ibz.kmesh if self.mesh is None else MeshProduct(self.mesh, self.ibz.kmesh)
+        g = Gf(mesh=mesh, target_shape=self.target_shape)
+
+        k_axis = -(self.target_rank + 1)
+        for k_indices, data in self.unfold_blocks(k_block):
+            idx = [slice(None)] * g.data.ndim
+            idx[k_axis] = k_indices
+            g.data[tuple(idx)] = data
+
+        return g
+
+    def __reduce_to_dict__(self):
+        d = dict(ibz=self.ibz, data=self.data)
+        if self.mesh is not None:
+            d['mesh'] = self.mesh
+        return d
+
+    @classmethod
+    def __factory_from_dict__(cls, name, d):
+        return cls(d['ibz'], d['data'], mesh=d.get('mesh', None))
+
+# ----------------------------------------------------------------------
+def _fourier_by_element(g_ibz, fourier, k_block):
+
+    """ Fourier transform an IBZGf one unfolded target element at a time """
+
+    element_shape = (1,) * g_ibz.target_rank
+    g_wk = Gf(mesh=MeshProduct(g_ibz.mesh, g_ibz.ibz.kmesh), target_shape=element_shape)
+
+    g_wr = None
+    for idx in np.ndindex(*g_ibz.target_shape):
+        g_wk.data[:] = g_ibz.unfold_element(idx, k_block=k_block).reshape(g_wk.data.shape)
+        element_wr = fourier(g_wk)
+        if g_wr is None:
+            g_wr = Gf(mesh=element_wr.mesh, target_shape=g_ibz.target_shape)
+        g_wr.data[(Ellipsis,) + idx] = element_wr.data[(Ellipsis,) + (0,) * g_ibz.target_rank]
+
+    return g_wr
+
+# ----------------------------------------------------------------------
+def fourier_wk_to_wr(g_wk, k_block=256):
+
+    r""" Fourier transform :math:`G_{ab}(i\omega_n, \mathbf{k}) \rightarrow G_{ab}(i\omega_n, \mathbf{r})`
+
+    Accepts both a regular Gf and an IBZGf. An IBZGf is unfolded and
+    transformed one target element at a time.
+
+    Parameters
+    ----------
+
+    g_wk : Gf or IBZGf
+        Green's function on a frequency and momentum mesh.
+
+    k_block : int, optional
+        Number of momentum points per unfold block.
+
+    Returns
+    -------
+
+    g_wr : Gf
+        Green's function on the real-space mesh.
+
+    """
+
+    if isinstance(g_wk, IBZGf):
+        return _fourier_by_element(g_wk, lattice.fourier_wk_to_wr, k_block)
+    return lattice.fourier_wk_to_wr(g_wk)
+
+# ----------------------------------------------------------------------
+def chi_wr_from_chi_wk(chi_wk, k_block=256):
+
+    r""" Fourier transform :math:`\chi_{\bar{a}b\bar{c}d}(i\omega_n, \mathbf{k}) \rightarrow \chi_{\bar{a}b\bar{c}d}(i\omega_n, \mathbf{r})`
+
+    Accepts both a regular Gf and an IBZGf. An IBZGf is unfolded and
+    transformed one target element at a time.
+
+    Parameters
+    ----------
+
+    chi_wk : Gf or IBZGf
+        Generalized susceptibility on a frequency and momentum mesh.
+
+    k_block : int, optional
+        Number of momentum points per unfold block.
+
+    Returns
+    -------
+
+    chi_wr : Gf
+        Generalized susceptibility on the real-space mesh.
+
+    """
+
+    if isinstance(chi_wk, IBZGf):
+        return _fourier_by_element(chi_wk, lattice.chi_wr_from_chi_wk, k_block)
+    return lattice.chi_wr_from_chi_wk(chi_wk)
+
+# -- Register the irreducible zone and IBZGf in Triqs formats
+register_class(IrreducibleBrillouinZone)
+register_class(IBZGf)
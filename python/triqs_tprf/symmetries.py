@@ -24,7 +24,9 @@
 
 import numpy as np
 
-def enforce_symmetry(gf, variables, symmetries):
+from functools import lru_cache
+
+def enforce_symmetry(gf, variables, symmetries, inplace=False):
     """Symmetrize Green's function in the given variables
 
     Parameters
@@ -38,6 +40,8 @@ def enforce_symmetry(gf, variables, symmetries):
     symmetries : str or iterator of str,
                  Gives the symmetry for the respective variable, e.g. "even"
                  or ["odd", "even"]
+    inplace : bool, optional
+              Symmetrize the data of `gf` directly instead of a copy.
 
     Returns
     -------
@@ -62,7 +66,7 @@ def enforce_symmetry(gf, variables, symmetries):
         if symmetry not in ['even', 'odd']:
             raise ValueError("Symmetry can only be 'even' or 'odd'.") 
 
-    gf_symmetrized = gf.copy()
+    gf_symmetrized = gf if inplace else gf.copy()
     
     for variable, symmetry in zip(variables, symmetries):
         symmetrize_fct = variable_symmetrize_fct[variable]
@@ -214,8 +218,8 @@ def _invert_momentum(momentum, momentum_mesh):
     inv_k = tuple(inv_k)
     return inv_k
 
-def _split_momentum(gf):
-    """Split Green's function data in momentum and inversed momentum
+def _momentum_pairs(gf):
+    """Linear momentum indices of the pairs :math:`(\mathbf{k}, -\mathbf{k})`
 
     Parameters
     ----------
@@ -223,29 +227,19 @@ def _split_momentum(gf):
          Green's function with a MeshProduct containing and a 
          MeshBrZone in second position.
 
-    Yields
-    ------
-    positive_half : np.array
-    negative_half : np.array
+    Returns
+    -------
+    k_idx : np.array,
+            Indices of the momenta with :math:`\mathbf{k} < -\mathbf{k}`.
+    inv_k_idx : np.array,
+                Indices of the corresponding inverted momenta.
+    self_idx : np.array,
+               Indices of the momenta with :math:`\mathbf{k} = -\mathbf{k}`.
     """
-    nk = gf.data.shape[1]
-    momentum_mesh = gf.mesh[1].dims
-    # Drop dimensions which are not meshed over, i.e. value of 1
-    momentum_mesh = [mesh for mesh in momentum_mesh if mesh != 1]
-
-    for idx in range(nk):
-        unraveled_idx = np.unravel_index(idx, momentum_mesh) 
-        unraveled_inv_idx = _invert_momentum(unraveled_idx, momentum_mesh)
-        inv_idx = np.ravel_multi_index(unraveled_inv_idx,  momentum_mesh)
-
-        positive_half = gf.data[slice(None), idx]
-        negative_half = gf.data[slice(None), inv_idx]
-
-        if idx == inv_idx: 
-            # Give same id to both halfs for identification of k = -k
-            yield positive_half, positive_half
-        else:       
-            yield positive_half, negative_half
+    inv_idx = _inverse_momentum_indices(gf)
+    idx = np.arange(len(inv_idx))
+    pair = idx < inv_idx
+    return idx[pair], inv_idx[pair], idx[idx == inv_idx]
 
 def _check_momentum_symmetry(gf, atol=1e-08):
     """Check if momentum symmetry of Green's function is even or odd
@@ -263,27 +257,36 @@ def _check_momentum_symmetry(gf, atol=1e-08):
     +1 if the Green's function is even in momentum space, -1 if odd,
     and None if undefined.
     """
-    signs= []
-    for positive_half, negative_half in _split_momentum(gf):
-        
-        # If the k-point and its inverse are numercial zero the symmetry does
-        # not matter
-        if np.allclose(positive_half, 0.0, atol=atol) and \
-           np.allclose(negative_half, 0.0, atol=atol):
-            continue
-
-        # Check if k = -k, if not equal to 0.0 the gf must be even 
-        if id(positive_half) == id(negative_half):
-            if not np.allclose(0.0, positive_half):
-                signs.append(+1)
-            continue
-
-        if np.allclose(positive_half, negative_half, atol=atol):
-            signs.append(+1)
-        elif np.allclose(-1*positive_half, negative_half, atol=atol):
-            signs.append(-1)
-        else:
-            return None
+    inv_idx = _inverse_momentum_indices(gf)
+    data = np.moveaxis(gf.data, 1, 0).reshape(len(inv_idx), -1)
+    inv_data = data[inv_idx]
+
+    def all_close(a, b, **kwargs):
+        return np.all(np.isclose(a, b, **kwargs), axis=1)
+
+    # If the k-point and its inverse are numercial zero the symmetry does
+    # not matter
+    zero = all_close(data, 0.0, atol=atol)
+    active = ~(zero & zero[inv_idx])
+
+    # Check if k = -k, if not equal to 0.0 the gf must be even 
+    self_inv = inv_idx == np.arange(len(inv_idx))
+    self_active = active & self_inv
+    pair_active = active & ~self_inv
+
+    signs = []
+    if np.any(~all_close(0.0, data[self_active])):
+        signs.append(+1)
+
+    even = all_close(data[pair_active], inv_data[pair_active], atol=atol)
+    odd = all_close(-1*data[pair_active], inv_data[pair_active], atol=atol)
+
+    if np.any(~even & ~odd):
+        return None
+    if np.any(even):
+        signs.append(+1)
+    if np.any(~even & odd):
+        signs.append(-1)
 
     return _overall_sign(signs)
 
@@ -301,77 +304,59 @@ def _symmetrize_momentum(gf, symmetry='even'):
                    'even' : no sign change :math:`\mathbf{k}\rightarrow\mathbf{k}`
                    'odd'  : sign change :math:`\mathbf{k}\rightarrow\mathbf{k}`
     """
-    for positive_half, negative_half in _split_momentum(gf):
-        # Check if k = -k, i.e. needs different symmetry treatment
-        if id(positive_half) == id(negative_half):
-            if symmetry == "odd":
-                positive_half *= 0.0
-            continue
-
-        avg = _average_halfs(positive_half, negative_half)
-
-        # Use slice access so that the data in the Green's function get changed
-        positive_half[:] = avg
-        if symmetry == "even":
-            negative_half[:] = avg
-        else:
-            negative_half[:] = -1 * avg
+    k_idx, inv_k_idx, self_idx = _momentum_pairs(gf)
+
+    # The data at -k is kept and copied to k, in place
+    sign = +1 if symmetry == "even" else -1
+    gf.data[:, k_idx] = sign * gf.data[:, inv_k_idx]
+
+    # Check if k = -k, i.e. needs different symmetry treatment
+    if symmetry == "odd":
+        gf.data[:, self_idx] = 0.0
 
 # -- Orbitals
 # ============================================================================
-def _split_orbital_triangle(gf):
-    """Split Green's function data in upper and lower triangle without diagonal
+@lru_cache(maxsize=None)
+def _orbital_triangle_indices(norb):
+    """Index tables of the upper triangle and its transpose without diagonal
 
     Parameters
     ----------
-    gf : Gf,
-         One-particle Green's function with a MeshProduct with two meshes.
-    
-    Yields
-    ------
-    upper_triangle : np.array
-    lower_triangle : np.array
-    """
-    target_shape = gf.target_shape
-    nparticle = len(target_shape)
-    if nparticle != 2:
-        raise ValueError("The Green's function must be a one-particle one.")
-    
-    norb = target_shape[0]
-    mesh_slice = (slice(None),) * gf.mesh.rank
-
-    upper_triangle_slice = np.triu_indices(norb, k=1)
-    lower_triangle_slice = np.tril_indices(norb, k=-1)
-    combined_slice = upper_triangle_slice + lower_triangle_slice
-
-    for upper_1, upper_2, lower_1, lower_2 in zip(*combined_slice):
-        upper_triangle = gf.data[mesh_slice + (upper_1, upper_2)]
-        lower_triangle = gf.data[mesh_slice + (lower_1, lower_2)]
+    norb : int,
+           Number of orbitals.
 
-        yield upper_triangle, lower_triangle
+    Returns
+    -------
+    upper : tuple of np.array,
+    lower : tuple of np.array,
+    diagonal : tuple of np.array,
+    """
+    upper_1, upper_2 = np.triu_indices(norb, k=1)
+    diagonal = np.arange(norb)
+    for idx in [upper_1, upper_2, diagonal]:
+        idx.setflags(write=False)
+    return (upper_1, upper_2), (upper_2, upper_1), (diagonal, diagonal)
 
-def _split_orbital_diagonal(gf):
-    """Extract the diagonal part of the Green's function data 
+def _orbital_indices(gf):
+    """Index tables of the orbital triangles and diagonal of the Green's function data
 
     Parameters
     ----------
     gf : Gf,
          One-particle Green's function with a MeshProduct with two meshes.
     
-    Yields
-    ------
-    diagonal : np.array
+    Returns
+    -------
+    upper : tuple of np.array,
+    lower : tuple of np.array,
+    diagonal : tuple of np.array,
     """
     target_shape = gf.target_shape
     nparticle = len(target_shape)
     if nparticle != 2:
         raise ValueError("The Green's function must be a one-particle one.")
 
-    norb = target_shape[0]
-    mesh_slice = (slice(None),) * gf.mesh.rank
-
-    for orb in range(norb):
-        yield gf.data[mesh_slice + (orb,)*nparticle]
+    return _orbital_triangle_indices(target_shape[0])
 
 def _check_orbital_symmetry(gf, atol=1e-08):
     """Check if orbital symmetry of Green's function is even or odd
@@ -388,18 +373,30 @@ def _check_orbital_symmetry(gf, atol=1e-08):
     +1 if the Green's function is even in orbital space, -1 if odd,
     and None if undefined.
     """
+    upper, lower, diagonal = _orbital_indices(gf)
+    mesh_slice = (Ellipsis,)
+    mesh_axes = tuple(range(gf.data.ndim - 2))
+
+    def all_close(a, b, **kwargs):
+        return np.all(np.isclose(a, b, **kwargs), axis=mesh_axes)
+
+    upper_triangle = gf.data[mesh_slice + upper]
+    lower_triangle = gf.data[mesh_slice + lower]
+    diagonal = gf.data[mesh_slice + diagonal]
+
+    even = all_close(upper_triangle, lower_triangle, atol=atol)
+    odd = all_close(upper_triangle, -1*lower_triangle, atol=atol)
+
+    if np.any(~even & ~odd):
+        return None
+
     signs = []
-    for upper_triangle, lower_triangle in _split_orbital_triangle(gf):
-        if np.allclose(upper_triangle, lower_triangle, atol=atol):
-            signs.append(+1)
-        elif np.allclose(upper_triangle, -1*lower_triangle, atol=atol):
-            signs.append(-1)
-        else:
-            return None
-
-    for diagonal in _split_orbital_diagonal(gf):
-        if not np.allclose(diagonal, 0.0, atol=atol):
-            signs.append(+1)
+    if np.any(even):
+        signs.append(+1)
+    if np.any(~even & odd):
+        signs.append(-1)
+    if np.any(~all_close(diagonal, 0.0, atol=atol)):
+        signs.append(+1)
 
     return _overall_sign(signs)
     
@@ -411,17 +408,199 @@ def _symmetrize_orbital(gf, symmetry="even"):
     gf : Gf,
          One-particle Green's function with a MeshProduct with two meshes.
     """
-    for upper_triangle, lower_triangle in _split_orbital_triangle(gf):
-        avg = _average_halfs(upper_triangle, lower_triangle)
-
-        # Use slice access so that the data in the Green's function get changed
-        upper_triangle[:] = avg
-        if symmetry == "even":
-            lower_triangle[:] = avg
-        else:
-            lower_triangle[:] = -1 * avg
+    upper, lower, diagonal = _orbital_indices(gf)
+    mesh_slice = (Ellipsis,)
 
+    # The lower triangle is kept and copied to the upper, in place
+    lower_triangle = gf.data[mesh_slice + lower]
+    gf.data[mesh_slice + upper] = lower_triangle
     if symmetry == "odd":
-        for diagonal in _split_orbital_diagonal(gf):
-            diagonal *= 0.0
+        gf.data[mesh_slice + lower] = -1 * lower_triangle
+        gf.data[mesh_slice + diagonal] = 0.0
+
+
+# -- Symmetry subspaces
+# ============================================================================
+def _inverse_momentum_indices(gf):
+    r"""Linear momentum indices of :math:`-\mathbf{k}` for every :math:`\mathbf{k}`
+
+    The index table is cached per momentum mesh.
+
+    Parameters
+    ----------
+    gf : Gf,
+         Green's function with a MeshProduct containing and a 
+         MeshBrZone in second position.
+
+    Returns
+    -------
+    inv_idx : np.array,
+              Array with `inv_idx[k] = -k` in linear momentum indices.
+    """
+    momentum_mesh = gf.mesh[1].dims
+    # Drop dimensions which are not meshed over, i.e. value of 1
+    momentum_mesh = tuple(int(mesh) for mesh in momentum_mesh if mesh != 1)
+
+    return _inverse_momentum_index_table(momentum_mesh)
+
+@lru_cache(maxsize=None)
+def _inverse_momentum_index_table(momentum_mesh):
+    """See _inverse_momentum_indices"""
+    nk = int(np.prod(momentum_mesh))
+
+    unraveled_idx = np.array(np.unravel_index(np.arange(nk), momentum_mesh))
+    unraveled_inv_idx = (-unraveled_idx) % np.array(momentum_mesh)[:, None]
+    inv_idx = np.ravel_multi_index(tuple(unraveled_inv_idx), momentum_mesh)
+    inv_idx.setflags(write=False)
+
+    return inv_idx
+
+class SymmetrySubspace():
+    r"""Parametrization of a Green's function in a definite symmetry sector
+
+    Green's functions that are even or odd in frequency, momentum and/or orbital
+    space are fully determined by a subset of their elements. This class
+    identifies these independent elements and maps between the full data
+    of a Green's function and the reduced vector of independent elements.
+    It can be used to solve eigenvalue problems directly in a symmetry sector,
+    see the parameter `symmetry_subspace` of
+    :func:`triqs_tprf.eliashberg.solve_eliashberg`.
+
+    Parameters
+    ----------
+    gf : Gf,
+         One-particle fermionic Green's function with a MeshProduct containing
+         a MeshImFreq on first and a MeshBrZone in second position. Only used
+         to determine the shape of the data.
+    variables : str or iterator of str,
+                Tells what variable(s) define the symmetry sector, e.g. "momentum"
+                or ["frequency", "momentum"]
+    symmetries : str or iterator of str,
+                 Gives the symmetry for the respective variable, e.g. "even"
+                 or ["odd", "even"]
+
+    Attributes
+    ----------
+    size : int,
+           Number of independent elements, i.e. the length of the reduced vectors.
+    """
 
+    def __init__(self, gf, variables, symmetries):
+
+        if type(variables) == str:
+            variables = [variables]
+        if type(symmetries) == str:
+            symmetries = [symmetries]
+        if len(variables) != len(symmetries):
+            raise ValueError("Variables and symmetries must be of equal length.")
+
+        variable_index_map = {"frequency" : self._frequency_index_map,
+                              "momentum" : self._momentum_index_map,
+                              "orbital" : self._orbital_index_map,}
+
+        for variable in variables:
+            if variable not in list(variable_index_map.keys()):
+                raise ValueError("No symmetrize function for this variable exists.") 
+
+        for symmetry in symmetries:
+            if symmetry not in ['even', 'odd']:
+                raise ValueError("Symmetry can only be 'even' or 'odd'.") 
+
+        self.shape = gf.data.shape
+        full_size = int(np.prod(self.shape))
+        indices = np.arange(full_size).reshape(self.shape)
+
+        # -- The symmetry group generated by the (commuting) inversions
+        group = [(indices.flatten(), +1)]
+        for variable, symmetry in zip(variables, symmetries):
+            index_map = variable_index_map[variable](gf, indices).flatten()
+            sign = +1 if symmetry == "even" else -1
+            group += [(index_map[idx], sign * group_sign) for idx, group_sign in group]
+
+        images = np.array([idx for idx, _ in group])
+        signs = np.array([sign for _, sign in group])
+
+        # -- Every element is represented by the smallest index in its orbit
+        rep_element = np.argmin(images, axis=0)
+        representative = images[rep_element, np.arange(full_size)]
+        sign = signs[rep_element]
+
+        # -- Orbits mapped onto themselves with a sign change are identically zero
+        is_zero = np.zeros(full_size, dtype=bool)
+        for idx, group_sign in group:
+            if group_sign == -1:
+                is_zero |= (idx == np.arange(full_size))
+        is_zero = np.bincount(representative, weights=is_zero.astype(float),
+                              minlength=full_size) > 0
+        is_zero = is_zero[representative]
+
+        independent = np.unique(representative[~is_zero])
+        column = -np.ones(full_size, dtype=int)
+        column[independent] = np.arange(len(independent))
+
+        self.size = len(independent)
+        self._mask = ~is_zero
+        self._column = column[representative][self._mask]
+        self._sign = sign[self._mask]
+        self._weight = np.bincount(self._column, minlength=self.size)
+
+    @staticmethod
+    def _frequency_index_map(gf, indices):
+        wmesh = gf.mesh[0]
+        if not wmesh.statistic == 'Fermion':
+            raise ValueError("The Green's function must be a fermionic one")
+        iw = np.array([complex(w) for w in wmesh])
+        inverse = np.argmin(np.abs(iw[:, None] + iw[None, :]), axis=1)
+        if not np.allclose(iw[inverse], -iw):
+            raise ValueError("The frequency mesh is not symmetric under w -> -w.")
+        return indices[inverse]
+
+    @staticmethod
+    def _momentum_index_map(gf, indices):
+        return indices[:, _inverse_momentum_indices(gf)]
+
+    @staticmethod
+    def _orbital_index_map(gf, indices):
+        if len(gf.target_shape) != 2:
+            raise ValueError("The Green's function must be a one-particle one.")
+        return np.swapaxes(indices, -1, -2)
+
+    def reduce(self, data):
+        """Project the full data onto the independent elements
+
+        Elements related by symmetry are averaged, i.e. `expand(reduce(data))`
+        is the projection of `data` onto the symmetry sector.
+
+        Parameters
+        ----------
+        data : np.ndarray,
+               Data of a Green's function with the shape of the one used
+               for construction.
+
+        Returns
+        -------
+        x : np.ndarray,
+            The reduced vector with `size` elements.
+        """
+        values = self._sign * data.flatten()[self._mask]
+        x = np.bincount(self._column, weights=values.real, minlength=self.size) \
+            + 1.j * np.bincount(self._column, weights=values.imag, minlength=self.size)
+        return x / self._weight
+
+    def expand(self, x):
+        """Construct the full data from the independent elements
+
+        Parameters
+        ----------
+        x : np.ndarray,
+            The reduced vector with `size` elements.
+
+        Returns
+        -------
+        data : np.ndarray,
+               Data of a Green's function with the shape of the one used
+               for construction.
+        """
+        data = np.zeros(int(np.prod(self.shape)), dtype=complex)
+        data[self._mask] = self._sign * x[self._column]
+        return data.reshape(self.shape)
@@ -34,12 +34,11 @@ from triqs.gf import Gf, MeshImFreq, MeshProduct, BlockGf
 from triqs.gf.tools import fit_legendre
 from triqs.gf.gf_fnt import enforce_discontinuity
 
-from triqs_tprf.lattice import lattice_dyson_g0_wk, solve_rpa_PH, construct_phi_wk
+from triqs_tprf.lattice import lattice_dyson_g0_wk, solve_rpa_PH, construct_gamma_singlet_rpa_wk
 from triqs_tprf.tight_binding import create_model_for_tests
 from triqs_tprf.ParameterCollection import ParameterCollection
 from triqs_tprf.lattice_utils import imtime_bubble_chi0_wk
 from triqs_tprf.rpa_tensor import kanamori_charge_and_spin_quartic_interaction_tensors
-from triqs_tprf.eliashberg import construct_gamma_singlet_rpa
 
 # ----------------------------------------------------------------------
 def show_version_info(info):
@@ -191,10 +190,7 @@ def create_eliashberg_ingredients(p):
     chi_d = solve_rpa_PH(chi0_wk, U_d)
     chi_m = solve_rpa_PH(chi0_wk, -U_m)  # Minus for correct charge rpa equation
 
-    phi_d_wk = construct_phi_wk(chi_d, U_d)
-    phi_m_wk = construct_phi_wk(chi_m, U_m)
-
-    gamma = construct_gamma_singlet_rpa(U_d, U_m, phi_d_wk, phi_m_wk)
+    gamma = construct_gamma_singlet_rpa_wk(chi_d, chi_m, U_d, U_m)
 
     eliashberg_ingredients = ParameterCollection(
                                 g0_wk = g0_wk,
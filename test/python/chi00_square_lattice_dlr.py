@@ -15,6 +15,7 @@ from triqs_tprf.lattice import lattice_dyson_g0_wk
 from triqs.gf.meshes import MeshDLRImFreq
 from triqs_tprf.lattice import dlr_on_imfreq
 from triqs_tprf.lattice import lindhard_chi00
+from triqs_tprf.lattice_utils import imtime_bubble_chi0_wk
 
 # ----------------------------------------------------------------------
 
@@ -91,6 +92,14 @@ def test_square_lattice_chi00_dlr():
     print('--> compare')
     compare_g_Dwk_and_g_wk(chi00_Dwk_analytic, chi00_wk_analytic)
 
+    print('--> chi00_wk imtime bubble on DLR mesh')
+    DLRwmesh = MeshDLRImFreq(beta, 'Fermion', lamb, eps)
+    g0_Dwk = lattice_dyson_g0_wk(mu=mu, e_k=e_k, mesh=DLRwmesh)
+    chi00_Dwk_imtime = imtime_bubble_chi0_wk(g0_Dwk, verbose=False)
+
+    print('--> compare')
+    compare_g_Dwk_and_g_wk(chi00_Dwk_imtime, chi00_wk_analytic, decimal=6)
+
 # ----------------------------------------------------------------------
 if __name__ == '__main__':
     test_square_lattice_chi00_dlr()
@@ -0,0 +1,81 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq, MeshProduct
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import lattice_dyson_g_wk
+from triqs_tprf.lattice import rho_k_from_g_wk
+from triqs_tprf.lattice import density_from_dyson
+
+
+def test_density_from_dyson():
+
+    nw = 256
+    nk = 8
+    beta = 5.0
+    mu = 0.2
+
+    t = -1.0 * np.eye(2)
+    t_loc = np.array([[0.3, 0.1], [0.1, -0.4]])
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : t_loc,
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    sigma_wk = Gf(mesh=MeshProduct(wmesh, kmesh), target_shape=e_k.target_shape)
+
+    s0 = np.array([[0.5, 0.05], [0.05, 0.2]])
+    for w in wmesh:
+        sigma_wk[w, :] = s0 + 0.4 / (complex(w) - 1.0) * np.eye(2)
+
+    def density_ref(mu):
+        g_wk = lattice_dyson_g_wk(mu, e_k, sigma_wk)
+        rho_k = rho_k_from_g_wk(g_wk)
+        return np.sum(np.einsum('kaa->k', rho_k.data).real) / len(kmesh)
+
+    N, dN = density_from_dyson(mu, e_k, sigma_wk)
+
+    dmu = 1e-4
+    dN_ref = (density_ref(mu + dmu) - density_ref(mu - dmu)) / (2 * dmu)
+
+    print(f'N  {N} {density_ref(mu)}')
+    print(f'dN {dN} {dN_ref}')
+
+    np.testing.assert_almost_equal(N, density_ref(mu), decimal=4)
+    np.testing.assert_almost_equal(dN, dN_ref, decimal=3)
+
+
+if __name__ == '__main__':
+
+    test_density_from_dyson()
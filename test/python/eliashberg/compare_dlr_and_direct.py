@@ -1,12 +1,13 @@
 # ----------------------------------------------------------------------
 
+import itertools
 import numpy as np
 
 import triqs.utility.mpi as mpi
 
 from triqs_tprf.lattice import lattice_dyson_g0_wk
 from triqs_tprf.lattice import eliashberg_g_delta_g_product, dynamic_and_constant_to_tr
-from triqs_tprf.lattice import eliashberg_product_fft, eliashberg_product_fft_constant
+from triqs_tprf.lattice import eliashberg_product, eliashberg_product_fft, eliashberg_product_fft_constant
 from triqs_tprf.lattice import dlr_on_imfreq, dlr_on_imtime
 
 from triqs_tprf.lattice import fourier_wk_to_wr
@@ -17,6 +18,7 @@ from triqs.gf import Gf, MeshImFreq, MeshBrZone
 from triqs.gf.meshes import MeshDLRImFreq, MeshDLR
 from triqs.gf.mesh_product import MeshProduct
 from triqs.lattice.lattice_tools import BrillouinZone, BravaisLattice
+from triqs.lattice.tight_binding import TBLattice
 
 from triqs.gf.gf_factories import make_gf_dlr
 
@@ -162,5 +164,90 @@ def eliashberg_compare_dlr_and_direct():
     delta_Dwk_out_const = eliashberg_product_fft_constant(I_r, g0_Dwk, delta_Dwk)
     compare_g_Dwk_and_g_wk(delta_Dwk_out_const, delta_wk_out_const)
 
+    print("--> eliashberg_product")
+
+    I_zero_k = I_k.copy()
+    I_zero_k.data[:] = 0.0
+    I_full_Dtr, I_zero_r = dynamic_and_constant_to_tr(I_Dwk, I_zero_k)
+
+    delta_Dwk_out_sum = eliashberg_product(I_Dwk, g0_Dwk, delta_Dwk)
+    delta_Dwk_out_fft = eliashberg_product_fft(I_full_Dtr, I_zero_r, g0_Dwk, delta_Dwk)
+    np.testing.assert_array_almost_equal(delta_Dwk_out_sum.data, delta_Dwk_out_fft.data)
+
+    print("--> eliashberg_product with a constant vertex part")
+
+    # -- A vertex that is constant in frequency is a delta function in
+    # -- imaginary time, it has to be passed separately on DLR meshes
+    I_const_k = I_k.copy()
+    for k in kmesh:
+        kx, ky, kz = k.value
+        I_const_k.data[k.data_index, :] = 0.5 + 0.2 * np.cos(kx) + 0.1 * np.cos(ky)
+
+    I_tot_Dwk = I_Dwk.copy()
+    I_tot_Dwk.data[:] += I_const_k.data[None, ...]
+
+    I_dyn_Dtr, I_const_r = dynamic_and_constant_to_tr(I_Dwk, I_const_k)
+
+    delta_Dwk_out_sum = eliashberg_product(I_tot_Dwk, I_const_k, g0_Dwk, delta_Dwk)
+    delta_Dwk_out_fft = eliashberg_product_fft(I_dyn_Dtr, I_const_r, g0_Dwk, delta_Dwk)
+    np.testing.assert_array_almost_equal(delta_Dwk_out_sum.data, delta_Dwk_out_fft.data)
+
+def eliashberg_g_delta_g_product_multi_orbital():
+    """ The orbital sum of the DLR product, done as one batched convolution
+    per block of k-points, compared with the orbital by orbital Matsubara product """
+
+    mu = 0.2
+    beta = 2.0
+    nk = 4
+
+    nw = 50
+    lamb = 20.
+    eps = 1e-8
+
+    t = -np.array([[1.0, 0.3], [0.3, 0.5]])
+    H = TBLattice(
+        units = [(1, 0, 0)],
+        hopping = {
+            (0,) : np.array([[0.2, 0.1j], [-0.1j, -0.3]]),
+            (+1,) : t, (-1,) : t.T,
+            },
+        orbital_positions = [(0,0,0)] * 2,
+        )
+
+    kmesh = H.get_kmesh(n_k=(nk, 1, 1))
+    e_k = H.fourier(kmesh)
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    DLRwmesh = MeshDLRImFreq(beta, 'Fermion', lamb, eps)
+
+    g0_wk = lattice_dyson_g0_wk(mu, e_k, wmesh)
+    g0_Dwk = lattice_dyson_g0_wk(mu, e_k, DLRwmesh)
+
+    h_k = e_k.data + np.array([[0.5, 0.2], [0.2, -0.4]])[None, ...]
+
+    delta_wk = Gf(mesh=g0_wk.mesh, target_shape=g0_wk.target_shape)
+    for w in wmesh:
+        delta_wk.data[w.data_index] = np.linalg.inv(w.value * np.eye(2)[None, ...] - h_k)
+
+    delta_Dwk = Gf(mesh=g0_Dwk.mesh, target_shape=g0_Dwk.target_shape)
+    for w in DLRwmesh:
+        delta_Dwk.data[w.data_index] = np.linalg.inv(w.value * np.eye(2)[None, ...] - h_k)
+
+    F_wk = eliashberg_g_delta_g_product(g0_wk, delta_wk)
+    F_Dwk = eliashberg_g_delta_g_product(g0_Dwk, delta_Dwk)
+
+    # -- Orbital by orbital product F_dc = sum_ef G_cf(k) G*_ed(-k) Delta_ef(k)
+
+    mk = [ kmesh.index_to_linear([(-i) % nk, 0, 0]) for i in range(nk) ]
+    F_ref = np.zeros_like(F_wk.data)
+    for d, c, e, f in itertools.product(range(2), repeat=4):
+        F_ref[..., d, c] += g0_wk.data[..., c, f] * np.conj(g0_wk.data[:, mk, e, d]) * delta_wk.data[..., e, f]
+
+    np.testing.assert_array_almost_equal(F_wk.data, F_ref)
+    assert( np.max(np.abs(F_ref[..., 0, 1])) > 1e-3 )
+
+    compare_g_Dwk_and_g_wk(F_Dwk, F_wk, decimal=6)
+
 if __name__ == "__main__":
     eliashberg_compare_dlr_and_direct()
+    eliashberg_g_delta_g_product_multi_orbital()
@@ -7,6 +7,7 @@ from triqs.gf import MeshProduct, MeshImFreq, MeshBrZone
 
 # from triqs_tprf.lattice import gamma_PP_spin_charge, gamma_PP_singlet, gamma_PP_triplet
 from triqs_tprf.lattice import construct_phi_wk
+from triqs_tprf.lattice import construct_gamma_singlet_rpa_wk, construct_gamma_triplet_rpa_wk
 from triqs_tprf.eliashberg import (
     construct_gamma_singlet_rpa,
     construct_gamma_triplet_rpa,
@@ -65,6 +66,18 @@ def test_gamma_triplet_constant_only(chi_d, chi_m, U_d, U_m):
     benchmark_value = -0.5 * U_d + 0.5 * U_m
     np.testing.assert_equal(gamma_triplet.data[0, 0], benchmark_value)
 
+def test_gamma_from_chi_equals_gamma_from_phi(chi_d, chi_m, U_d, U_m):
+    phi_d_wk = construct_phi_wk(chi_d, U_d)
+    phi_m_wk = construct_phi_wk(chi_m, U_m)
+
+    gamma_singlet = construct_gamma_singlet_rpa(U_d, U_m, phi_d_wk, phi_m_wk)
+    gamma_singlet_wk = construct_gamma_singlet_rpa_wk(chi_d, chi_m, U_d, U_m)
+    np.testing.assert_allclose(gamma_singlet_wk.data, gamma_singlet.data)
+
+    gamma_triplet = construct_gamma_triplet_rpa(U_d, U_m, phi_d_wk, phi_m_wk)
+    gamma_triplet_wk = construct_gamma_triplet_rpa_wk(chi_d, chi_m, U_d, U_m)
+    np.testing.assert_allclose(gamma_triplet_wk.data, gamma_triplet.data)
+
 if __name__ == "__main__":
     p = ParameterCollection(
         dim=2,
@@ -95,3 +108,4 @@ if __name__ == "__main__":
     test_gamma_singlet_constant_only(chi_d, chi_m, U_d, U_m)
     test_gamma_triplet_mesh_type(chi_d, chi_m, U_d, U_m)
     test_gamma_triplet_constant_only(chi_d, chi_m, U_d, U_m)
+    test_gamma_from_chi_equals_gamma_from_phi(chi_d, chi_m, U_d, U_m)
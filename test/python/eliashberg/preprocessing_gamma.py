@@ -48,6 +48,34 @@ def test_preprocess_gamma_for_fft_types(gamma):
 
     assert type(gamma_const_r.mesh) == MeshCycLat
 
+def test_preprocess_gamma_for_fft_cache(gamma):
+    import tempfile
+
+    gamma_dyn_tr_ref, gamma_const_r_ref = preprocess_gamma_for_fft(gamma)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for repeat in range(2):
+            gamma_dyn_tr, gamma_const_r = preprocess_gamma_for_fft(gamma, cache_dir=cache_dir)
+            np.testing.assert_allclose(gamma_dyn_tr.data, gamma_dyn_tr_ref.data)
+            np.testing.assert_allclose(gamma_const_r.data, gamma_const_r_ref.data)
+
+        gamma_const_k = gamma_const_r_ref.data[0]
+        preprocess_gamma_for_fft(gamma, gamma_const_k, cache_dir=cache_dir)
+
+        import os
+        assert len(os.listdir(cache_dir)) == 2
+
+def test_gamma_cache_key_target(gamma):
+    from triqs.gf import Gf
+    from triqs_tprf.eliashberg import _gamma_cache_key
+
+    # -- Same mesh and data bytes, but a different target shape
+    nb2 = gamma.target_shape[0] * gamma.target_shape[1]
+    gamma_mat = Gf(mesh=gamma.mesh, target_shape=[nb2, nb2])
+    gamma_mat.data[:] = gamma.data.reshape(gamma_mat.data.shape)
+
+    assert _gamma_cache_key(gamma) != _gamma_cache_key(gamma_mat)
+
 def save_new_preprocess_gamma_for_fft_benchmark(filename, p):
     eliashberg_ingredients = create_eliashberg_ingredients(p)
     gamma = eliashberg_ingredients.gamma
@@ -98,6 +126,8 @@ if __name__ == '__main__':
     test_split_into_dynamic_wk_and_constant_k_mesh_values(gamma, U_d, U_m)
     test_dynamic_and_constant_to_tr_mesh_types(gamma)
     test_preprocess_gamma_for_fft_types(gamma)
+    test_preprocess_gamma_for_fft_cache(gamma)
+    test_gamma_cache_key_target(gamma)
 
     #save_new_preprocess_gamma_for_fft_benchmark(p.filename, p)
     test_preprocess_gamma_for_fft_benchmark(gamma, p)
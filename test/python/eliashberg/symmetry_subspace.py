@@ -0,0 +1,112 @@
+# ----------------------------------------------------------------------
+
+""" Compare the Eliashberg eigenvalues obtained by enforcing a symmetry after
+every product with the ones obtained directly in the symmetry subspace. """
+
+# ----------------------------------------------------------------------
+
+import functools
+
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+
+from triqs.gf import Gf, MeshDLRImFreq
+from triqs.gf.mesh_product import MeshProduct
+
+# ----------------------------------------------------------------------
+
+from triqs_tprf.ParameterCollection import ParameterCollection
+from triqs_tprf.utilities import create_eliashberg_ingredients
+from triqs_tprf.eliashberg import solve_eliashberg
+
+# ----------------------------------------------------------------------
+
+from triqs_tprf.symmetries import enforce_symmetry, check_symmetry
+from triqs_tprf.symmetries import SymmetrySubspace
+
+# ----------------------------------------------------------------------
+
+def test_subspace_projection(g0_wk, variables, symmetries):
+    subspace = SymmetrySubspace(g0_wk, variables, symmetries)
+
+    assert subspace.size < g0_wk.data.size
+
+    gf = g0_wk.copy()
+    gf.data[:] = np.random.random(gf.data.shape)
+
+    gf_projected = gf.copy()
+    gf_projected.data[:] = subspace.expand(subspace.reduce(gf.data))
+    gf_symmetrized = enforce_symmetry(gf_projected, variables, symmetries)
+
+    np.testing.assert_allclose(gf_projected.data, gf_symmetrized.data)
+
+def test_solve_eliashberg_in_subspace(g0_wk, gamma, variables, symmetries):
+    symmetrize_fct = functools.partial(enforce_symmetry, 
+                                       variables=variables,
+                                       symmetries=symmetries)
+    subspace = SymmetrySubspace(g0_wk, variables, symmetries)
+
+    E_ref, _ = solve_eliashberg(gamma, g0_wk, product='FFT', solver='IRAM',
+                                symmetrize_fct=symmetrize_fct, k=1)
+    E, eigen_modes = solve_eliashberg(gamma, g0_wk, product='FFT', solver='IRAM',
+                                      symmetry_subspace=subspace, k=1)
+
+    print(E_ref, E)
+    np.testing.assert_allclose(E_ref, E, atol=1e-8)
+
+    translate_symmetries = {"even" : +1, "odd" : -1}
+    expected_symmetries = {variable : translate_symmetries[symmetry] \
+                    for (variable, symmetry) in zip(variables, symmetries)}
+
+    for delta in eigen_modes:
+        if not expected_symmetries == check_symmetry(delta):
+            raise AssertionError("Incorrect symmetries were produced.")
+
+def test_subspace_frequency_inversion(g0_wk):
+    """ The frequency map requires a mesh that is symmetric under w -> -w,
+    which DLR meshes are in general not. """
+
+    wmesh = MeshDLRImFreq(g0_wk.mesh[0].beta, 'Fermion', 10., 1e-8)
+    gf = Gf(mesh=MeshProduct(wmesh, g0_wk.mesh[1]), target_shape=g0_wk.target_shape)
+
+    iw = np.array([complex(w) for w in wmesh])
+    symmetric = np.allclose(np.sort_complex(iw), np.sort_complex(-iw))
+
+    try:
+        SymmetrySubspace(gf, "frequency", "even")
+        assert symmetric
+    except ValueError:
+        assert not symmetric
+
+if __name__ == "__main__":
+    p = ParameterCollection(
+            dim = 2,
+            norb = 2,
+            t1 = 1.0,
+            t2 = 0.5,
+            t12 = 0.1,
+            t21 = 0.1,
+            mu = 0.1,
+            beta = 1,
+            U = 1.0,
+            Up = 0.8,
+            J = 0.1,
+            Jp = 0.1,
+            nk = 3,
+            nw = 50,
+            plot=False
+            )
+
+    eliashberg_ingredients = create_eliashberg_ingredients(p)
+    g0_wk = eliashberg_ingredients.g0_wk
+    gamma = eliashberg_ingredients.gamma
+
+    test_subspace_frequency_inversion(g0_wk)
+
+    variables = ["frequency", "momentum", "orbital"]
+    for symmetries in [('even', 'odd', 'even'), ('odd', 'even', 'even')]:
+        test_subspace_projection(g0_wk, variables, symmetries)
+        test_solve_eliashberg_in_subspace(g0_wk, gamma, variables, symmetries)
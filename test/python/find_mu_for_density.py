@@ -0,0 +1,112 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from scipy.optimize import brentq
+
+from triqs.gf import Gf, MeshImFreq, MeshProduct
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import density_from_dyson
+from triqs_tprf.lattice import find_mu_for_density
+
+
+def get_e_k(nk=8):
+
+    t = -1.0 * np.eye(2)
+    t_loc = np.array([[0.3, 0.1], [0.1, -0.4]])
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : t_loc,
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    return e_k
+
+
+def test_find_mu_for_density_static():
+
+    beta = 5.0
+    e_k = get_e_k()
+    eps = np.linalg.eigvalsh(e_k.data)
+
+    def density(mu):
+        return np.sum(1. / (np.exp(beta * (eps - mu)) + 1.)) / len(e_k.mesh)
+
+    for N in [0.3, 1.0, 1.7]:
+        mu = find_mu_for_density(e_k, beta, N)
+        mu_ref = brentq(lambda mu : density(mu) - N, eps.min() - 10., eps.max() + 10.)
+
+        print(f'N {N} mu {mu} {mu_ref}')
+        np.testing.assert_almost_equal(mu, mu_ref)
+
+        # -- Far away initial guess
+        mu = find_mu_for_density(e_k, beta, N, mu0=20.)
+        np.testing.assert_almost_equal(mu, mu_ref)
+
+        # -- Search range containing the solution
+        mu = find_mu_for_density(e_k, beta, N, mu0=20., mu_min=mu_ref - 1., mu_max=mu_ref + 0.5)
+        np.testing.assert_almost_equal(mu, mu_ref)
+
+        # -- Search range not containing the solution
+        for mu_min, mu_max in [(mu_ref + 0.1, mu_ref + 2.), (mu_ref - 2., mu_ref - 0.1)]:
+            try:
+                find_mu_for_density(e_k, beta, N, mu_min=mu_min, mu_max=mu_max)
+                raise AssertionError('Expected a RuntimeError for a range without solution')
+            except RuntimeError:
+                pass
+
+
+def test_find_mu_for_density_dyson():
+
+    nw = 256
+    beta = 5.0
+    e_k = get_e_k()
+    kmesh = e_k.mesh
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    sigma_wk = Gf(mesh=MeshProduct(wmesh, kmesh), target_shape=e_k.target_shape)
+
+    s0 = np.array([[0.5, 0.05], [0.05, 0.2]])
+    for w in wmesh:
+        sigma_wk[w, :] = s0 + 0.4 / (complex(w) - 1.0) * np.eye(2)
+
+    for N in [0.5, 1.0, 1.5]:
+        mu = find_mu_for_density(e_k, sigma_wk, N, tol=1e-10)
+        N_mu, dN_mu = density_from_dyson(mu, e_k, sigma_wk)
+
+        print(f'N {N} {N_mu} mu {mu}')
+        np.testing.assert_almost_equal(N_mu, N, decimal=9)
+
+
+if __name__ == '__main__':
+
+    test_find_mu_for_density_static()
+    test_find_mu_for_density_dyson()
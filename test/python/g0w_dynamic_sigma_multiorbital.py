@@ -0,0 +1,71 @@
+import numpy as np
+
+from triqs.gf import Gf, MeshReFreq
+from triqs.gf.mesh_product import MeshProduct
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import g0w_dynamic_sigma
+
+
+def test_g0w_dynamic_sigma_multiorbital():
+    """ Compares the momentum mesh overload of the dynamic G0W self energy,
+    which reuses the band eigenpairs on the mesh, with the evaluation at
+    separate k points for a multi-orbital model with inter-orbital hopping.
+    The chemical potential only enters on the diagonal of e(k) - mu. """
+
+    mu = 0.4
+    beta = 10.0
+    nk = 4
+    norb = 3
+    delta = 0.05
+    g2 = 0.1
+    wD = 0.2
+
+    t = -1.0 * np.eye(norb)
+    t[0, 1] = t[1, 0] = 0.3
+    t[1, 2] = t[2, 1] = -0.2
+    H_loc = np.array([[-0.5, 0.1, 0.0], [0.1, 0.3, 0.2], [0.0, 0.2, 0.6]])
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : H_loc,
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)] * norb,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    V_k = Gf(mesh=kmesh, target_shape=[norb]*4)
+    V_k.data[:] = 0.
+    for k in kmesh:
+        kx, ky, kz = k.value
+        for a in range(norb):
+            for b in range(norb):
+                V_k.data[k.data_index, a, a, b, b] = 1.0 + 0.5*(a == b) + 0.2*np.cos(kx) + 0.1*np.cos(ky)
+
+    fmesh = MeshReFreq(-5.0, 5.0, 30) # excludes zero, where the Bose factor diverges
+    W_fk = Gf(mesh=MeshProduct(fmesh, kmesh), target_shape=[norb]*4)
+    for f in fmesh:
+        w = f.value + 1.j*delta
+        W_fk.data[f.data_index, :] = V_k.data * (1 + g2 * 2.0 * wD / (w**2 - wD**2))
+
+    sigma_fk = g0w_dynamic_sigma(mu, beta, e_k, W_fk, V_k, delta, kmesh)
+
+    e_shift_k = e_k.copy()
+    e_shift_k.data[:] -= mu * np.eye(norb)[None, ...]
+    sigma_shift_fk = g0w_dynamic_sigma(0., beta, e_shift_k, W_fk, V_k, delta, kmesh)
+
+    assert( np.all(np.isfinite(sigma_fk.data)) )
+    np.testing.assert_array_almost_equal(sigma_fk.data, sigma_shift_fk.data)
+
+    for k in kmesh:
+        sigma_ref = g0w_dynamic_sigma(mu, beta, e_k, W_fk, V_k, delta, k.value)
+        np.testing.assert_array_almost_equal(sigma_fk.data[:, k.data_index], sigma_ref.data)
+
+
+if __name__ == "__main__":
+    test_g0w_dynamic_sigma_multiorbital()
@@ -0,0 +1,118 @@
+import numpy as np
+
+from triqs.gf import Gf, MeshReFreq
+from triqs.gf.mesh_product import MeshProduct
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import g0w_sigma, g0w_dynamic_sigma
+from triqs_tprf.gw import G0WSigma
+
+
+def get_model(nk, delta, norb=2, g2=0.1, wD=0.2):
+    """ Two-orbital square lattice with a momentum dependent interaction
+    screened by a dispersionless phonon. The real frequency mesh excludes
+    zero, where the Bose factor diverges. """
+
+    t = -1.0 * np.eye(norb)
+    t[0, 1] = t[1, 0] = 0.3
+    H_loc = np.diag([-0.5, 0.5])
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : H_loc,
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)] * norb,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    V_k = Gf(mesh=kmesh, target_shape=[norb]*4)
+    V_k.data[:] = 0.
+    for k in kmesh:
+        kx, ky, kz = k.value
+        for a in range(norb):
+            for b in range(norb):
+                V_k.data[k.data_index, a, a, b, b] = 1.0 + 0.5*(a == b) + 0.2*np.cos(kx) + 0.1*np.cos(ky)
+
+    fmesh = MeshReFreq(-5.0, 5.0, 20)
+    W_fk = Gf(mesh=MeshProduct(fmesh, kmesh), target_shape=[norb]*4)
+    for f in fmesh:
+        w = f.value + 1.j*delta
+        W_fk.data[f.data_index, :] = V_k.data * (1 + g2 * 2.0 * wD / (w**2 - wD**2))
+
+    return e_k, V_k, W_fk
+
+
+def test_g0w_sigma_kpoints():
+    """ Compares the cached mesh evaluation of the G0W self energy with
+    the direct evaluation at separate k points, and the evaluation on
+    lists of k points. """
+
+    mu = 0.3
+    beta = 10.0
+    nk = 6
+    norb = 2
+    delta = 0.05
+
+    e_k, V_k, W_fk = get_model(nk, delta, norb=norb)
+    kmesh = e_k.mesh
+    fmesh = W_fk.mesh[0]
+
+    print('--> g0w_sigma on the mesh')
+    sigma_k = g0w_sigma(mu, beta, e_k, V_k)
+    sigma_dyn_fk = g0w_dynamic_sigma(mu, beta, e_k, W_fk, V_k, delta)
+
+    print('--> g0w_sigma per k point')
+    for k in kmesh:
+        sigma_ref = g0w_sigma(mu, beta, e_k, V_k, k.value)
+        np.testing.assert_array_almost_equal(sigma_k.data[k.data_index], sigma_ref)
+
+        sigma_dyn_ref = g0w_dynamic_sigma(mu, beta, e_k, W_fk, V_k, delta, k.value)
+        np.testing.assert_array_almost_equal(sigma_dyn_fk.data[:, k.data_index], sigma_dyn_ref.data)
+
+    print('--> G0WSigma on lists of k points')
+    sigma = G0WSigma(mu, beta, e_k, V_k, W_fk=W_fk, delta=delta)
+
+    kpoints = np.array([k.value for k in kmesh])
+    np.testing.assert_array_almost_equal(sigma.static(kpoints), sigma_k.data)
+    np.testing.assert_array_almost_equal(sigma.dynamic(kpoints), sigma_dyn_fk.data)
+    np.testing.assert_array_almost_equal(
+        sigma(kpoints), sigma_k.data[None, ...] + sigma_dyn_fk.data)
+
+    kpath = np.linspace(0, 1, num=17)[:, None] * np.array([np.pi, np.pi, 0])[None, :]
+    assert( sigma.static(kpath).shape == (len(kpath), norb, norb) )
+    assert( sigma(kpath).shape == (len(fmesh), len(kpath), norb, norb) )
+
+
+def test_g0w_sigma_kpoints_off_mesh():
+    """ Compares G0WSigma off the momentum mesh with the per k point
+    evaluation, both diagonalize the interpolated dispersion. """
+
+    mu = 0.3
+    beta = 10.0
+    nk = 6
+    delta = 0.05
+
+    e_k, V_k, W_fk = get_model(nk, delta)
+    sigma = G0WSigma(mu, beta, e_k, V_k, W_fk=W_fk, delta=delta)
+
+    kpath = np.linspace(0, 1, num=17)[:, None] * np.array([np.pi, np.pi, 0])[None, :]
+
+    sigma_stat = sigma.static(kpath)
+    sigma_dyn = sigma.dynamic(kpath)
+
+    for kidx, kpoint in enumerate(kpath):
+        sigma_stat_ref = g0w_sigma(mu, beta, e_k, V_k, kpoint)
+        sigma_dyn_ref = g0w_dynamic_sigma(mu, beta, e_k, W_fk, V_k, delta, kpoint)
+
+        np.testing.assert_array_almost_equal(sigma_stat[kidx], sigma_stat_ref, decimal=10)
+        np.testing.assert_array_almost_equal(sigma_dyn[:, kidx], sigma_dyn_ref.data, decimal=10)
+
+
+if __name__ == "__main__":
+    test_g0w_sigma_kpoints()
+    test_g0w_sigma_kpoints_off_mesh()
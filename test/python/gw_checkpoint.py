@@ -0,0 +1,122 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.gw_solver import GWSolver
+from triqs_tprf.mixing import AndersonMixer
+
+
+def test_gw_checkpoint_restart():
+
+    nw = 128
+    nk = 4
+    beta = 5.0
+    mu = 0.5
+    U = 2.0
+
+    t = -1.0 * np.eye(1)
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)],
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    V_k = Gf(mesh=kmesh, target_shape=[1]*4)
+    V_k.data[:] = U
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    filename = 'gw_checkpoint.h5'
+
+    gw_ref = GWSolver(e_k, V_k, wmesh, mu=mu, N_fix=0.9)
+    gw_ref.solve_iter(tol=1e-12, maxiter=6, spinless=True, mixer=AndersonMixer(depth=3))
+
+    gw = GWSolver(e_k, V_k, wmesh, mu=mu, N_fix=0.9)
+    gw.solve_iter(tol=1e-12, maxiter=3, spinless=True, mixer=AndersonMixer(depth=3),
+                  checkpoint=filename)
+
+    gw_restart = GWSolver(e_k, V_k, wmesh, mu=mu, N_fix=0.9)
+    gw_restart.restart(filename, maxiter=6)
+
+    np.testing.assert_almost_equal(gw_ref.mu, gw_restart.mu)
+    np.testing.assert_array_almost_equal(gw_ref.g_wk.data, gw_restart.g_wk.data)
+    np.testing.assert_array_almost_equal(gw_ref.sigma_wk.data, gw_restart.sigma_wk.data)
+
+    # -- An explicitly passed mixer takes precedence over the stored history
+
+    mixer = AndersonMixer(depth=2)
+    gw_restart = GWSolver(e_k, V_k, wmesh, mu=mu, N_fix=0.9)
+    gw_restart.restart(filename, maxiter=6, mixer=mixer)
+
+    assert( mixer.x_prev is not None )
+    assert( len(mixer.dx) == 2 )
+    
+
+def test_gw_checkpoint_sigma_block_size():
+
+    nw = 64
+    nk = 4
+    beta = 5.0
+    U = 2.0
+
+    t = -1.0 * np.eye(2)
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    V_k = Gf(mesh=kmesh, target_shape=[2]*4)
+    V_k.data[:] = 0.
+    for a in range(2):
+        V_k.data[:, a, a, a, a] = U
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    filename = 'gw_checkpoint_sigma_block_size.h5'
+
+    gw = GWSolver(e_k, V_k, wmesh, mu=0.5)
+    gw.solve_iter(tol=1e-12, maxiter=2, sigma_block_size=1, checkpoint=filename)
+
+    opts = GWSolver.read_checkpoint(filename)['opts']
+    assert( int(opts['sigma_block_size']) == 1 )
+
+
+if __name__ == '__main__':
+
+    test_gw_checkpoint_restart()
+    test_gw_checkpoint_sigma_block_size()
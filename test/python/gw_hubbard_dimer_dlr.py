@@ -423,6 +423,40 @@ def test_gw_hubbard_dimer(verbose=False):
         plt.show()
 
 
+def test_gw_self_consistent_dlr_vs_imfreq():
+
+    beta, U, t, lamb, eps = 10.0, 1.0, 1.0, 100., 1e-10
+
+    I = np.eye(1)
+    H_r = TBLattice(hopping = {
+        (+1,): -0.5 * t * I,
+        (-1,): -0.5 * t * I,
+        }, units = [(1, 0, 0)], orbital_positions = [(0,0,0)])
+
+    kmesh = H_r.get_kmesh(n_k=(2, 1, 1))
+    e_k = H_r.fourier(kmesh)
+
+    V_k = Gf(mesh=kmesh, target_shape=[1]*4)
+    V_k.data[:] = U
+
+    N_fix = 0.8
+    
+    opts = dict(mu=0.0, N_fix=N_fix, mu_bracket=[-5., 5.])
+    
+    gw = GWSolver(e_k, V_k, MeshImFreq(beta, 'Fermion', 1024), **opts)
+    gw.solve_iter(tol=1e-9, spinless=True)
+
+    gw_dlr = GWSolver(e_k, V_k, MeshDLRImFreq(beta, 'Fermion', lamb, eps), **opts)
+    gw_dlr.solve_iter(tol=1e-9, spinless=True)
+
+    print(f'mu  {gw.mu} {gw_dlr.mu}')
+    print(f'rho {gw.rho_loc} {gw_dlr.rho_loc}')
+
+    np.testing.assert_almost_equal(gw_dlr.N, N_fix, decimal=4)
+    np.testing.assert_almost_equal(gw.mu, gw_dlr.mu, decimal=3)
+    np.testing.assert_array_almost_equal(gw.rho_loc, gw_dlr.rho_loc, decimal=4)
+    
+
 def print_tensor(U, tol=1e-9):
     assert( len(U.shape) == 4)
     n = U.shape[0]
@@ -437,3 +471,4 @@ def print_tensor(U, tol=1e-9):
 if __name__ == '__main__':
 
     test_gw_hubbard_dimer(verbose=False)
+    test_gw_self_consistent_dlr_vs_imfreq()
@@ -0,0 +1,116 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.gw_solver import GWSolver
+from triqs_tprf.mixing import LinearMixer, AndersonMixer, matsubara_basis
+
+
+def test_mixers_linear_fixed_point():
+
+    np.random.seed(1337)
+    n = 20
+    A = 0.9 * np.random.random((n, n)) / n
+    b = np.random.random(n)
+    x_ref = np.linalg.solve(np.eye(n) - A, b)
+
+    F = lambda x : A @ x + b
+
+    def solve(mixer, maxiter=200, tol=1e-10):
+        x = np.zeros(n)
+        for iter in range(maxiter):
+            x_new = mixer(x, F(x))
+            if np.max(np.abs(x_new - x)) < tol: break
+            x = x_new
+        return x_new, iter
+
+    x_lin, iter_lin = solve(LinearMixer(alpha=0.5))
+    x_and, iter_and = solve(AndersonMixer(alpha=0.5, depth=5))
+
+    print(f'linear   iterations {iter_lin}')
+    print(f'anderson iterations {iter_and}')
+
+    np.testing.assert_array_almost_equal(x_lin, x_ref)
+    np.testing.assert_array_almost_equal(x_and, x_ref)
+    assert( iter_and < iter_lin )
+    
+
+def test_gw_mixing():
+
+    nw = 128
+    nk = 4
+    beta = 5.0
+    mu = 0.5
+    U = 2.0
+
+    t = -1.0 * np.eye(1)
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)],
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    V_k = Gf(mesh=kmesh, target_shape=[1]*4)
+    V_k.data[:] = U
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+
+    gw = GWSolver(e_k, V_k, wmesh, mu=mu)
+    gw.solve_iter(tol=1e-9, spinless=True)
+
+    basis = matsubara_basis(wmesh, w_max=20.)
+    assert( basis.shape[1] < len(wmesh) )
+
+    for mixer, mix in [
+            (LinearMixer(alpha=0.7), 'sigma'),
+            (AndersonMixer(alpha=0.5, depth=4), 'sigma'),
+            (AndersonMixer(alpha=0.5, depth=4), 'g'),
+            (AndersonMixer(alpha=0.5, depth=4, basis=basis), 'sigma'),
+            (AndersonMixer(alpha=0.5, depth=4, basis=basis), 'g'),
+            ]:
+        
+        gw_mix = GWSolver(e_k, V_k, wmesh, mu=mu)
+        gw_mix.solve_iter(tol=1e-9, spinless=True, mixer=mixer, mix=mix)
+
+        print(f'{type(mixer).__name__} ({mix}) iterations {gw_mix.iter}, plain {gw.iter}')
+
+        np.testing.assert_array_almost_equal(gw.sigma_wk.data, gw_mix.sigma_wk.data)
+        np.testing.assert_array_almost_equal(gw.g_wk.data, gw_mix.g_wk.data)
+
+        if type(mixer) == AndersonMixer:
+            assert( gw_mix.iter < gw.iter )
+        
+
+if __name__ == '__main__':
+
+    test_mixers_linear_fixed_point()
+    test_gw_mixing()
@@ -0,0 +1,90 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq
+from triqs.lattice.tight_binding import TBLattice
+from triqs.operators import n, c
+
+from triqs_tprf.gw import get_gw_tensor
+from triqs_tprf.gw_solver import GWSolver
+
+
+def test_gw_dynamic_sigma_blocked():
+
+    nw = 64
+    nk = 4
+    beta = 5.0
+    mu = 0.2
+    U = 1.5
+    J = 0.3
+
+    t = -1.0 * np.eye(4)
+    t[0, 2] = t[2, 0] = t[1, 3] = t[3, 1] = 0.2
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)] * 4,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    H_int = U * n('up', 0) * n('do', 0) + U * n('up', 1) * n('do', 1) + \
+        (U - 2*J) * (n('up', 0) + n('do', 0)) * (n('up', 1) + n('do', 1))
+    fundamental_operators = [c('up', 0), c('do', 0), c('up', 1), c('do', 1)]
+
+    V_k = Gf(mesh=kmesh, target_shape=[4]*4)
+    V_k.data[:] = get_gw_tensor(H_int, fundamental_operators)
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+
+    gw = GWSolver(e_k, V_k, wmesh, mu=mu)
+    g_wk = gw.g_wk
+
+    P_wk = gw.polarization(g_wk)
+    W_wk = gw.screened_interaction(P_wk, V_k)
+    W_dyn_wk, W_stat_k = gw.dynamic_and_static_interaction(W_wk)
+
+    sigma_ref = gw.gw_dynamic_sigma(W_dyn_wk, g_wk)
+
+    for block_size in [1, 3, 4, 8]:
+        sigma = gw.gw_dynamic_sigma(W_dyn_wk, g_wk, block_size=block_size)
+        np.testing.assert_array_almost_equal(sigma.data, sigma_ref.data)
+
+    gw_ref = GWSolver(e_k, V_k, wmesh, mu=mu)
+    gw_ref.solve_iter(maxiter=3, hartree=False, fock=False)
+
+    gw_blk = GWSolver(e_k, V_k, wmesh, mu=mu)
+    gw_blk.solve_iter(maxiter=3, hartree=False, fock=False, sigma_block_size=2)
+
+    np.testing.assert_array_almost_equal(gw_ref.sigma_wk.data, gw_blk.sigma_wk.data)
+
+
+if __name__ == '__main__':
+
+    test_gw_dynamic_sigma_blocked()
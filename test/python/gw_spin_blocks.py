@@ -0,0 +1,110 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.gw_solver import GWSolver
+
+
+def test_gw_spin_blocks():
+
+    nw = 64
+    nk = 4
+    beta = 5.0
+    mu = 0.3
+    h = 0.2
+
+    # -- Two orbitals, orbital order (up_0, up_1, do_0, do_1)
+
+    spin_blocks = [[0, 1], [2, 3]]
+    
+    t_orb = np.array([[-1.0, 0.2], [0.2, -0.5]])
+    t = np.kron(np.eye(2), t_orb)
+    H_loc = np.diag([-h, -h, +h, +h])
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : H_loc,
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)] * 4,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    U_orb = np.array([[1.5, 0.8], [0.8, 1.2]])
+    
+    V_k = Gf(mesh=kmesh, target_shape=[4]*4)
+    V_k.data[:] = 0.
+    for a in range(4):
+        for b in range(4):
+            V_k.data[:, a, a, b, b] = U_orb[a % 2, b % 2]
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+
+    gw = GWSolver(e_k, V_k, wmesh, mu=mu)
+    gw.solve_iter(maxiter=3)
+
+    gw_s = GWSolver(e_k, V_k, wmesh, mu=mu)
+    gw_s.solve_iter(maxiter=3, spin_blocks=spin_blocks)
+
+    assert( gw_s.W_wk.target_shape == (2, 2, 2, 2) )
+
+    np.testing.assert_array_almost_equal(gw.sigma_wk.data, gw_s.sigma_wk.data)
+    np.testing.assert_array_almost_equal(gw.g_wk.data, gw_s.g_wk.data)
+
+    up, do = spin_blocks
+    np.testing.assert_array_almost_equal(
+        gw.W_wk.data[(Ellipsis,) + np.ix_(up, up, do, do)], gw_s.W_wk.data)
+    np.testing.assert_array_almost_equal(
+        gw.W_wk.data[(Ellipsis,) + np.ix_(do, do, do, do)], gw_s.W_wk.data)
+
+    # -- Solving again without spin blocks returns to the full orbital space
+
+    gw_s.solve_iter(maxiter=3)
+    
+    assert( not hasattr(gw_s, 'V_s_k') )
+    assert( gw_s.W_wk.target_shape == (4, 4, 4, 4) )
+    gw_s.calc_real_space()
+
+    # -- Spin mixing dispersions are rejected
+
+    e_k_mix = e_k.copy()
+    e_k_mix.data[:, 0, 2] = e_k_mix.data[:, 2, 0] = 0.1
+
+    gw_mix = GWSolver(e_k_mix, V_k, wmesh, mu=mu)
+    try:
+        gw_mix.solve_iter(maxiter=1, spin_blocks=spin_blocks)
+        raise Exception('Spin mixing dispersion not detected')
+    except AssertionError:
+        pass
+
+    
+if __name__ == '__main__':
+
+    test_gw_spin_blocks()
@@ -0,0 +1,77 @@
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+
+from triqs.operators import n
+
+from triqs_tprf.tight_binding import TBLattice
+from triqs_tprf.hf_solver import HartreeFockSolver
+from triqs_tprf.hf_response import HartreeFockResponse
+
+# ----------------------------------------------------------------------
+def chi0_abcd_finite_difference(hfr, eps=1e-6):
+
+    """ Reference static bare response from finite differences
+    of the density matrix in the field F_ab = p |a><b| + p^* |b><a|. """
+
+    beta, nk, norb = hfr.beta, hfr.n_k, hfr.norb
+    fermi = lambda e : 1./(np.exp(beta * e) + 1)
+
+    def rho(E):
+        e, U = np.linalg.eigh(E)
+        return np.einsum('kab,kb,kcb->ac', U, fermi(e), np.conj(U)) / nk
+
+    R = {}
+    for p in [1., 1.j]:
+        R[p] = np.zeros([norb]*4, dtype=complex)
+        for a in range(norb):
+            for b in range(norb):
+                F = np.zeros((norb, norb), dtype=complex)
+                F[a, b] += p
+                F[b, a] += np.conj(p)
+                drho = rho(hfr.e_k.data + eps*F) - rho(hfr.e_k.data - eps*F)
+                R[p][b, a] = -drho / (2*eps)
+
+    return 0.5 * (R[1.] + R[1.j].imag)
+
+# ----------------------------------------------------------------------
+def test_hf_response_analytic():
+
+    beta, n_k = 5.0, 8
+    U = 1.5
+
+    h_loc = np.array([[0.1, 0.2], [0.2, -0.1]])
+    T = -1.0 * np.eye(2)
+    
+    t_r = TBLattice(
+        units = [(1, 0, 0)],
+        hopping = {
+            (0,): h_loc,
+            (+1,): T,
+            (-1,): T,
+            },
+        orbital_positions = [(0,0,0)] * 2,
+        orbital_names = ['up', 'do'],
+        )    
+
+    kmesh = t_r.get_kmesh(n_k)
+    e_k = t_r.fourier(kmesh)
+
+    gf_struct = [[0, 2]]
+    H_int = U * n(0, 0) * n(0, 1)
+
+    hfs = HartreeFockSolver(e_k, beta, H_int=H_int, gf_struct=gf_struct)
+    hfs.solve_newton(N_target=1.0, M0=np.zeros((2, 2)))
+
+    hfr = HartreeFockResponse(hfs)
+
+    chi0_abcd_ref = chi0_abcd_finite_difference(hfr)
+
+    np.testing.assert_array_almost_equal(hfr.chi0_abcd, chi0_abcd_ref, decimal=6)
+
+# ----------------------------------------------------------------------
+if __name__ == '__main__':
+
+    test_hf_response_analytic()
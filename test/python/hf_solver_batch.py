@@ -0,0 +1,50 @@
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+
+from triqs_tprf.hf_solver import HartreeFockSolver
+from triqs_tprf.hf_solver import HartreeFockBatchSolver
+from triqs_tprf.ParameterCollection import ParameterCollection
+from triqs_tprf.ParameterCollection import parameter_scan
+
+from hf_solver_newton import get_e_k, get_H_int
+
+# ----------------------------------------------------------------------
+def test_hf_batch_solver():
+
+    e_k = get_e_k()
+    gf_struct = [[0, 4]]
+    M0 = np.diag([-0.5, -0.3, 0.5, 0.3])
+
+    p = ParameterCollection(beta=5.0, J=0.3)
+    ps = parameter_scan(p, U=[1.0, 3.0, 5.0], N=[1.0, 2.0, 2.5])
+    H_int = [ get_H_int(p.U, p.J) for p in ps ]
+
+    hfbs = HartreeFockBatchSolver(e_k, ps.beta, H_int=H_int, gf_struct=gf_struct)
+
+    ps_batch = hfbs.solve_iter(ps.N, M0=M0, tol=1e-10, ps=ps)
+    ps_pool = hfbs.solve_iter(ps.N, M0=M0, tol=1e-10, ps=ps, processes=2)
+
+    assert( np.all(ps_batch.converged) )
+    np.testing.assert_array_almost_equal(ps_batch.U, ps.U)
+    np.testing.assert_array_almost_equal(ps_batch.N_tot, ps.N)
+    np.testing.assert_array_almost_equal(
+        np.array(list(ps_batch.rho)), np.array(list(ps_pool.rho)))
+
+    for p in ps_batch:
+        hfs = HartreeFockSolver(
+            e_k, p.beta, H_int=get_H_int(p.U, p.J), gf_struct=gf_struct)
+        hfs.solve_iter(p.N, M0=M0, tol=1e-10)
+
+        np.testing.assert_array_almost_equal(p.rho, hfs.density_matrix())
+        np.testing.assert_array_almost_equal(p.M, hfs.mean_field_matrix())
+        np.testing.assert_almost_equal(p.mu, hfs.chemical_potential())
+        np.testing.assert_almost_equal(p.E_tot, hfs.E_tot)
+        np.testing.assert_almost_equal(p.Omega, hfs.Omega)
+
+# ----------------------------------------------------------------------
+if __name__ == '__main__':
+
+    test_hf_batch_solver()
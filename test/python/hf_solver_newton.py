@@ -0,0 +1,101 @@
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+
+from triqs.operators import n, c_dag, c
+
+from triqs_tprf.tight_binding import TBLattice
+from triqs_tprf.hf_solver import HartreeFockSolver
+from triqs_tprf.mixing import AndersonMixer
+
+# ----------------------------------------------------------------------
+def get_e_k(n_k=16):
+
+    h_loc = np.kron(np.eye(2), np.array([[0.2, 0.1], [0.1, -0.2]]))
+    T = -1.0 * np.eye(4)
+    
+    t_r = TBLattice(
+        units = [(1, 0, 0)],
+        hopping = {
+            (0,): h_loc,
+            (+1,): T,
+            (-1,): T,
+            },
+        orbital_positions = [(0,0,0)] * 4,
+        orbital_names = ['up_0', 'up_1', 'do_0', 'do_1'],
+        )
+
+    kmesh = t_r.get_kmesh(n_k)
+    e_k = t_r.fourier(kmesh)
+
+    return e_k
+
+# ----------------------------------------------------------------------
+def get_H_int(U, J):
+
+    H_int = U * n(0, 0) * n(0, 2) + U * n(0, 1) * n(0, 3) + \
+        (U - 2*J) * (n(0, 0) + n(0, 2)) * (n(0, 1) + n(0, 3)) + \
+        J * (c_dag(0, 0) * c(0, 1) * c_dag(0, 3) * c(0, 2) + \
+             c_dag(0, 1) * c(0, 0) * c_dag(0, 2) * c(0, 3))
+
+    return H_int
+
+# ----------------------------------------------------------------------
+def get_solver(beta=5.0, n_k=16, U=3.0, J=0.5):
+
+    gf_struct = [[0, 4]]
+    return HartreeFockSolver(get_e_k(n_k), beta, H_int=get_H_int(U, J), gf_struct=gf_struct)
+
+# ----------------------------------------------------------------------
+def test_hf_density_matrix_jacobian():
+
+    hfs = get_solver()
+    
+    M0 = np.diag([-0.5, -0.3, 0.5, 0.3]) + 0.05j * (np.eye(4, k=1) - np.eye(4, k=-1))
+    rho_vec = hfs.solve_setup(2.0, M0=M0)
+    
+    for N_target in [None, 2.0]:
+        J = hfs.density_matrix_jacobian(rho_vec, N_target)
+
+        J_fd = np.zeros_like(J)
+        eps = 1e-6
+        for i in range(len(rho_vec)):
+            d_vec = np.zeros_like(rho_vec)
+            d_vec[i] = eps
+            J_fd[:, i] = (hfs.density_matrix_step(rho_vec + d_vec, N_target) - \
+                          hfs.density_matrix_step(rho_vec - d_vec, N_target)) / (2*eps)
+
+        np.testing.assert_array_almost_equal(J, J_fd, decimal=6)
+
+# ----------------------------------------------------------------------
+def test_hf_solver_newton_and_anderson():
+
+    N_target = 2.0
+    M0 = np.diag([-0.5, -0.3, 0.5, 0.3])
+    
+    hfs = get_solver()
+    hfs.solve_newton(N_target, M0=M0)
+
+    hfs_fd = get_solver()
+    hfs_fd.solve_newton(N_target, M0=M0, analytic_jacobian=False)
+
+    np.testing.assert_array_almost_equal(hfs.density_matrix(), hfs_fd.density_matrix())
+    np.testing.assert_almost_equal(hfs.chemical_potential(), hfs_fd.chemical_potential())
+
+    hfs_iter = get_solver()
+    hfs_iter.solve_iter(N_target, M0=M0, tol=1e-11, mixer=AndersonMixer(alpha=0.5, depth=5))
+
+    np.testing.assert_array_almost_equal(hfs.density_matrix(), hfs_iter.density_matrix())
+
+    hfs_mu = get_solver()
+    hfs_mu.solve_newton_mu(hfs.chemical_potential(), M0=M0)
+
+    np.testing.assert_array_almost_equal(hfs.density_matrix(), hfs_mu.density_matrix())
+
+# ----------------------------------------------------------------------
+if __name__ == '__main__':
+
+    test_hf_density_matrix_jacobian()
+    test_hf_solver_newton_and_anderson()
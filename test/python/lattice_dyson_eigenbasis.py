@@ -0,0 +1,112 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq, MeshReFreq, MeshProduct
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import lattice_dyson_g0_wk
+from triqs_tprf.lattice import lattice_dyson_g0_fk
+from triqs_tprf.lattice import lattice_dyson_g_wk
+
+
+def get_e_k(norb=3, nk=6):
+
+    t_loc = np.array([[0.3, 0.1, 0.05j], [0.1, -0.4, 0.2], [-0.05j, 0.2, 0.1]])
+    t = -1.0 * np.eye(3) + 0.1j * np.eye(3, k=1)
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : t_loc[:norb, :norb],
+            (+1, 0) : t[:norb, :norb], (-1, 0) : t[:norb, :norb].T.conj(),
+            (0, +1) : t[:norb, :norb], (0, -1) : t[:norb, :norb].T.conj(),
+            },
+        orbital_positions = [(0,0,0)]*norb,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    return e_k
+
+
+def dyson_ref(z_w, e_k, sigma_wk=None):
+    I = np.eye(e_k.target_shape[0])
+    A = z_w[:, None, None, None] * I[None, None, ...] - e_k.data[None, ...]
+    if sigma_wk is not None: A -= sigma_wk
+    return np.linalg.inv(A)
+
+
+def test_lattice_dyson_g0_eigenbasis():
+
+    mu, beta, delta = 0.3, 10.0, 0.1
+    e_k = get_e_k()
+
+    wmesh = MeshImFreq(beta, 'Fermion', 32)
+    z_w = np.array([ complex(w) for w in wmesh ]) + mu
+    g0_wk = lattice_dyson_g0_wk(mu, e_k, wmesh)
+    np.testing.assert_array_almost_equal(g0_wk.data, dyson_ref(z_w, e_k))
+
+    fmesh = MeshReFreq(-5., 5., 41)
+    z_f = np.array([ float(f) for f in fmesh ]) + 1.j*delta + mu
+    g0_fk = lattice_dyson_g0_fk(mu, e_k, fmesh, delta)
+    np.testing.assert_array_almost_equal(g0_fk.data, dyson_ref(z_f, e_k))
+
+
+def test_lattice_dyson_g_eigenbasis():
+
+    mu, beta = 0.3, 10.0
+    wmesh = MeshImFreq(beta, 'Fermion', 32)
+    z_w = np.array([ complex(w) for w in wmesh ]) + mu
+
+    # -- Local self energy proportional to the identity
+
+    e_k = get_e_k()
+    sigma_w = Gf(mesh=wmesh, target_shape=e_k.target_shape)
+    sigma_w.data[:] = (0.4 / (z_w - mu - 1.0))[:, None, None] * np.eye(3)[None, ...]
+
+    g_wk = lattice_dyson_g_wk(mu, e_k, sigma_w)
+    np.testing.assert_array_almost_equal(g_wk.data, dyson_ref(z_w, e_k, sigma_w.data[:, None, ...]))
+
+    # -- General local self energy
+
+    sigma_w.data[:, 0, 1] += 0.1
+    sigma_w.data[:, 1, 0] += 0.1
+
+    g_wk = lattice_dyson_g_wk(mu, e_k, sigma_w)
+    np.testing.assert_array_almost_equal(g_wk.data, dyson_ref(z_w, e_k, sigma_w.data[:, None, ...]))
+
+    # -- Single band with momentum dependent self energy
+
+    e_k = get_e_k(norb=1)
+    sigma_wk = Gf(mesh=MeshProduct(wmesh, e_k.mesh), target_shape=e_k.target_shape)
+    sigma_wk.data[:] = 0.4 / (z_w[:, None, None, None] - mu - 1.0) + 0.1 * e_k.data[None, ...]**2
+
+    g_wk = lattice_dyson_g_wk(mu, e_k, sigma_wk)
+    np.testing.assert_array_almost_equal(g_wk.data, dyson_ref(z_w, e_k, sigma_wk.data))
+
+
+if __name__ == '__main__':
+
+    test_lattice_dyson_g0_eigenbasis()
+    test_lattice_dyson_g_eigenbasis()
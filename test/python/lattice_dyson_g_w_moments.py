@@ -0,0 +1,103 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import lattice_dyson_g_wk
+from triqs_tprf.lattice import lattice_dyson_g_w
+from triqs_tprf.lattice import lattice_dyson_g_w_moments
+from triqs_tprf.lattice import rho_k_from_g_wk
+
+
+def test_lattice_dyson_g_w_moments():
+
+    nw = 256
+    nk = 8
+    beta = 5.0
+    mu = 0.2
+
+    t = -1.0 * np.eye(2)
+    t_loc = np.array([[0.3, 0.1], [0.1, -0.4]])
+
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (0, 0) : t_loc,
+            (+1, 0) : t, (-1, 0) : t,
+            (0, +1) : t, (0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H_r.fourier(kmesh)
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    sigma_w = Gf(mesh=wmesh, target_shape=e_k.target_shape)
+
+    s0 = np.array([[0.5, 0.05], [0.05, 0.2]])
+    for w in wmesh:
+        sigma_w[w] = s0 + 0.4 / (complex(w) - 1.0) * np.eye(2)
+
+    g_wk = lattice_dyson_g_wk(mu, e_k, sigma_w)
+    rho_k = rho_k_from_g_wk(g_wk)
+
+    np.random.seed(1337)
+    k_weights = np.random.random(len(kmesh))
+    k_weights[::3] = 0.
+    w_k = k_weights / np.sum(k_weights)
+
+    for weights in [None, k_weights]:
+
+        w = np.ones(len(kmesh)) / len(kmesh) if weights is None else w_k
+
+        g_w_ref = np.einsum('k,wkab->wab', w, g_wk.data)
+        rho_ref = np.einsum('k,kab->ab', w, rho_k.data)
+        m1_ref = np.einsum('k,kab->ab', w, e_k.data) + s0 - mu * np.eye(2)
+
+        if weights is None:
+            g_w, rho, m1 = lattice_dyson_g_w_moments(mu, e_k, sigma_w)
+            g_w_plain = lattice_dyson_g_w(mu, e_k, sigma_w)
+        else:
+            g_w, rho, m1 = lattice_dyson_g_w_moments(mu, e_k, sigma_w, weights)
+            g_w_plain = lattice_dyson_g_w(mu, e_k, sigma_w, weights)
+
+        np.testing.assert_array_almost_equal(g_w.data, g_w_ref)
+        np.testing.assert_array_almost_equal(g_w_plain.data, g_w_ref)
+        np.testing.assert_array_almost_equal(rho, rho_ref, decimal=4)
+        np.testing.assert_array_almost_equal(m1, m1_ref, decimal=4)
+
+        # -- With the exact static limit the first moment is exact
+
+        k_w = np.array([]) if weights is None else weights
+        g_w, rho, m1 = lattice_dyson_g_w_moments(mu, e_k, sigma_w, k_w, s0.astype(complex))
+
+        np.testing.assert_array_almost_equal(g_w.data, g_w_ref)
+        np.testing.assert_array_almost_equal(rho, rho_ref, decimal=4)
+        np.testing.assert_array_almost_equal(m1, m1_ref, decimal=12)
+
+
+if __name__ == '__main__':
+
+    test_lattice_dyson_g_w_moments()
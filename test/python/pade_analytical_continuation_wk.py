@@ -0,0 +1,87 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq, MeshReFreq, MeshDLRImFreq
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import lattice_dyson_g0_wk
+from triqs_tprf.lattice import lattice_dyson_g0_fk
+from triqs_tprf.lattice import lindhard_chi00
+from triqs_tprf.lattice_utils import pade_analytical_continuation_wk
+from triqs_tprf.lattice_utils import gf_tensor_to_matrix, gf_matrix_to_tensor
+
+
+def test_pade_analytical_continuation_wk():
+
+    beta = 10.0
+    mu = 0.1
+    delta = 0.1
+    n_points = 32
+
+    T = -np.array([[1., 0.2], [0.2, 0.5]])
+    H_r = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            ( 0,+1): T, ( 0,-1): T,
+            (+1, 0): T, (-1, 0): T,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+    kmesh = H_r.get_kmesh(n_k=(4, 4, 1))
+    e_k = H_r.fourier(kmesh)
+
+    fmesh = MeshReFreq(-5, 5, 101)
+    g0_fk_ref = lattice_dyson_g0_fk(mu=mu, e_k=e_k, mesh=fmesh, delta=delta)
+
+    # -- Matrix valued, Matsubara and DLR meshes
+    
+    for wmesh in [
+            MeshImFreq(beta, 'Fermion', 128),
+            MeshDLRImFreq(beta, 'Fermion', 100., 1e-12)]:
+
+        g0_wk = lattice_dyson_g0_wk(mu=mu, e_k=e_k, mesh=wmesh)
+        g0_fk = pade_analytical_continuation_wk(
+            g0_wk, fmesh, n_points=n_points, freq_offset=delta)
+
+        np.testing.assert_array_almost_equal(g0_fk.data, g0_fk_ref.data, decimal=5)
+
+    # -- Rank 4 tensor valued, compared to continuation of each k-point
+
+    bmesh = MeshImFreq(beta, 'Boson', 64)
+    chi0_wk = lindhard_chi00(e_k=e_k, mesh=bmesh, mu=mu)
+    chi0_fk = pade_analytical_continuation_wk(
+        chi0_wk, fmesh, n_points=n_points, freq_offset=delta)
+
+    for k in kmesh:
+        chi0_w = gf_tensor_to_matrix(chi0_wk[:, k])
+        chi0_f = Gf(mesh=fmesh, target_shape=chi0_w.target_shape)
+        chi0_f.set_from_pade(chi0_w, n_points=n_points, freq_offset=delta)
+        chi0_f = gf_matrix_to_tensor(chi0_f, chi0_wk.target_shape)
+
+        np.testing.assert_array_almost_equal(chi0_fk[:, k].data, chi0_f.data)
+    
+
+if __name__ == '__main__':
+
+    test_pade_analytical_continuation_wk()
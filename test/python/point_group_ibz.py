@@ -0,0 +1,216 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+
+import numpy as np
+
+from triqs.gf import Gf, MeshImFreq, MeshReFreq, MeshProduct
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import lattice_dyson_g0_wk
+from triqs_tprf.lattice import lattice_dyson_g_wk
+from triqs_tprf.lattice import lattice_dyson_g_w
+from triqs_tprf.lattice import lindhard_chi00
+from triqs_tprf.lattice import solve_rpa_PH
+from triqs_tprf.lattice import g0w_sigma
+
+from triqs_tprf.point_group import hypercubic_point_group
+from triqs_tprf.point_group import IrreducibleBrillouinZone
+
+
+def px_py_square_lattice():
+
+    ts, tp, txy = -1.0, -0.3, 0.1
+
+    t_x = np.diag([ts, tp])
+    t_y = np.diag([tp, ts])
+    t_d = np.array([[0, txy], [txy, 0]])
+
+    return TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (+1, 0) : t_x, (-1, 0) : t_x,
+            (0, +1) : t_y, (0, -1) : t_y,
+            (+1, +1) : t_d, (-1, -1) : t_d,
+            (+1, -1) : -t_d, (-1, +1) : -t_d,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+
+def test_hypercubic_wedge():
+
+    t = [[-1.]]
+    H = TBLattice(
+        units = np.eye(3),
+        hopping = {
+            (+1, 0, 0) : t, (-1, 0, 0) : t,
+            (0, +1, 0) : t, (0, -1, 0) : t,
+            (0, 0, +1) : t, (0, 0, -1) : t,
+            },
+        orbital_positions = [(0,0,0)],
+        )
+
+    for nk, n_ibz in [(6, 20), (8, 35)]:
+        kmesh = H.get_kmesh(n_k=(nk, nk, nk))
+        ibz = IrreducibleBrillouinZone(H, kmesh, hypercubic_point_group(3))
+
+        assert( ibz.n_ops == 48 )
+        assert( ibz.n_ibz == n_ibz )
+        np.testing.assert_almost_equal(np.sum(ibz.weights), 1.)
+
+        for i in range(ibz.n_ibz):
+            star = ibz.star(i)
+            assert( ibz.ibz_k[i] in star )
+            np.testing.assert_almost_equal(len(star) / len(kmesh), ibz.weights[i])
+            assert( set(star) == set(ibz.star_table[:, ibz.ibz_k[i]]) )
+
+
+def test_irreducible_brillouin_zone():
+
+    nk, nw, beta, mu = 8, 32, 5.0, 0.1
+
+    H = px_py_square_lattice()
+    kmesh = H.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H.fourier(kmesh)
+
+    # -- C4v from its generators, px and py transform as a vector
+
+    C4 = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+    Mx = np.diag([-1, 1, 1])
+    ibz = IrreducibleBrillouinZone(H, kmesh, [C4, Mx], [C4[:2, :2], Mx[:2, :2]])
+
+    assert( ibz.n_ops == 8 )
+    assert( ibz.n_ibz == 15 )
+    assert( ibz.check_representations(e_k) )
+
+    # -- Without the orbital representation the lattice is not symmetric
+
+    ibz_trivial = IrreducibleBrillouinZone(H, kmesh, [C4, Mx])
+    assert( not ibz_trivial.check_representations(e_k) )
+
+    np.testing.assert_array_almost_equal(ibz.unfold(ibz.restrict(e_k.data)), e_k.data)
+
+    k_indices = [3, 17, 42]
+    np.testing.assert_array_almost_equal(
+        ibz.unfold(ibz.restrict(e_k.data), k_indices=k_indices), e_k.data[k_indices])
+
+    # -- IBZ mode of the k-local kernels
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+
+    g0_wk = ibz.lattice_dyson_g0_wk(mu, e_k, wmesh)
+    g0_wk_ref = lattice_dyson_g0_wk(mu, e_k, wmesh)
+    np.testing.assert_array_almost_equal(g0_wk.data, g0_wk_ref.data)
+
+    sigma_w = Gf(mesh=wmesh, target_shape=e_k.target_shape)
+    for w in wmesh:
+        sigma_w[w] = 0.4 / (complex(w) - 1.0) * np.eye(2)
+
+    g_wk = ibz.lattice_dyson_g_wk(mu, e_k, sigma_w)
+    g_wk_ref = lattice_dyson_g_wk(mu, e_k, sigma_w)
+    np.testing.assert_array_almost_equal(g_wk.data, g_wk_ref.data)
+
+    g_ibz = ibz.lattice_dyson_g_wk(mu, e_k, g0_wk_ref, unfold=False)
+    assert( g_ibz.data.shape == (len(wmesh), ibz.n_ibz, 2, 2) )
+
+    g_w = ibz.lattice_dyson_g_w(mu, e_k, sigma_w)
+    g_w_ref = lattice_dyson_g_w(mu, e_k, sigma_w)
+    np.testing.assert_array_almost_equal(g_w.data, g_w_ref.data)
+
+    try:
+        ibz_trivial.lattice_dyson_g_w(mu, e_k, sigma_w)
+        raise Exception('Dispersion not invariant under the point group accepted')
+    except AssertionError:
+        pass
+
+    # -- Two-particle unfolding and RPA
+
+    bmesh = MeshImFreq(beta, 'Boson', 4)
+    chi00_wk = lindhard_chi00(e_k=e_k, mesh=bmesh, mu=mu)
+
+    np.testing.assert_array_almost_equal(
+        ibz.unfold(ibz.restrict(chi00_wk.data, target_rank=4), target_rank=4), chi00_wk.data)
+
+    U_abcd = np.zeros([2]*4, dtype=complex)
+    for a, b in np.ndindex(2, 2):
+        U_abcd[a, a, b, b] = 0.5
+
+    chi_wk = ibz.solve_rpa_PH(chi00_wk, U_abcd)
+    chi_wk_ref = solve_rpa_PH(chi00_wk, U_abcd)
+    np.testing.assert_array_almost_equal(chi_wk.data, chi_wk_ref.data)
+
+
+def test_irreducible_momentum_sums():
+
+    nk, beta, mu, delta = 6, 5.0, 0.1, 0.1
+
+    H = px_py_square_lattice()
+    kmesh = H.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H.fourier(kmesh)
+
+    C4 = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+    Mx = np.diag([-1, 1, 1])
+    ibz = IrreducibleBrillouinZone(H, kmesh, [C4, Mx], [C4[:2, :2], Mx[:2, :2]])
+
+    # -- Lindhard susceptibility on the irreducible momentum transfers
+
+    bmesh = MeshImFreq(beta, 'Boson', 4)
+    chi00_wk = ibz.lindhard_chi00(e_k, bmesh, mu)
+    chi00_wk_ref = lindhard_chi00(e_k=e_k, mesh=bmesh, mu=mu)
+    np.testing.assert_array_almost_equal(chi00_wk.data, chi00_wk_ref.data)
+
+    fmesh = MeshReFreq(-3.0, 3.0, 10)
+    chi00_fk = ibz.lindhard_chi00(e_k, fmesh, mu, beta=beta, delta=delta)
+    chi00_fk_ref = lindhard_chi00(e_k=e_k, mesh=fmesh, beta=beta, mu=mu, delta=delta)
+    np.testing.assert_array_almost_equal(chi00_fk.data, chi00_fk_ref.data)
+
+    # -- G0W self energy on the irreducible points
+
+    V_k = Gf(mesh=kmesh, target_shape=[2]*4)
+    V_k.data[:] = 0.
+    for k in kmesh:
+        kx, ky, kz = k.value
+        for a, b in np.ndindex(2, 2):
+            V_k.data[k.data_index, a, a, b, b] = 1.0 + 0.5*(a == b) + 0.2*(np.cos(kx) + np.cos(ky))
+
+    W_fk = Gf(mesh=MeshProduct(fmesh, kmesh), target_shape=[2]*4)
+    for f in fmesh:
+        w = f.value + 1.j*delta
+        W_fk.data[f.data_index, :] = V_k.data * (1 + 0.04 / (w**2 - 0.04))
+
+    sigma_k = ibz.g0w_sigma(mu, beta, e_k, V_k)
+    sigma_k_ref = g0w_sigma(mu, beta, e_k, V_k)
+    np.testing.assert_array_almost_equal(sigma_k.data, sigma_k_ref.data)
+
+    sigma_fk = ibz.g0w_sigma(mu, beta, e_k, V_k, W_fk=W_fk, delta=delta)
+    sigma_fk_ref = g0w_sigma(mu, beta, e_k, W_fk, V_k, delta)
+    np.testing.assert_array_almost_equal(sigma_fk.data, sigma_fk_ref.data)
+
+    sigma_ibz = ibz.g0w_sigma(mu, beta, e_k, V_k, unfold=False)
+    assert( sigma_ibz.data.shape == (ibz.n_ibz, 2, 2) )
+
+
+if __name__ == '__main__':
+
+    test_hypercubic_wedge()
+    test_irreducible_brillouin_zone()
+    test_irreducible_momentum_sums()
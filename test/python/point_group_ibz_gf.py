@@ -0,0 +1,125 @@
+################################################################################
+#
+# TPRF: Two-Particle Response Function (TPRF) Toolbox for TRIQS
+#
+# Copyright (C) 2026 by The Simons Foundation
+#
+# TPRF is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# TPRF is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# TPRF. If not, see <http://www.gnu.org/licenses/>.
+#
+################################################################################
+
+
+import numpy as np
+
+from h5 import HDFArchive
+
+from triqs.gf import Gf, MeshImFreq
+from triqs.lattice.tight_binding import TBLattice
+
+from triqs_tprf.lattice import lattice_dyson_g0_wk
+from triqs_tprf.lattice import lindhard_chi00
+from triqs_tprf.lattice import fourier_wk_to_wr as fourier_wk_to_wr_ref
+from triqs_tprf.lattice import chi_wr_from_chi_wk as chi_wr_from_chi_wk_ref
+
+from triqs_tprf.point_group import IrreducibleBrillouinZone
+from triqs_tprf.point_group import IBZGf
+from triqs_tprf.point_group import fourier_wk_to_wr
+from triqs_tprf.point_group import chi_wr_from_chi_wk
+
+
+def test_ibz_gf():
+
+    nk, nw, beta, mu = 8, 16, 5.0, 0.1
+
+    ts, tp = -1.0, -0.3
+    t_x, t_y = np.diag([ts, tp]), np.diag([tp, ts])
+
+    H = TBLattice(
+        units = [(1, 0, 0), (0, 1, 0)],
+        hopping = {
+            (+1, 0) : t_x, (-1, 0) : t_x,
+            (0, +1) : t_y, (0, -1) : t_y,
+            },
+        orbital_positions = [(0,0,0)]*2,
+        )
+
+    kmesh = H.get_kmesh(n_k=(nk, nk, 1))
+    e_k = H.fourier(kmesh)
+
+    C4 = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+    Mx = np.diag([-1, 1, 1])
+    ibz = IrreducibleBrillouinZone(H, kmesh, [C4, Mx], [C4[:2, :2], Mx[:2, :2]])
+
+    wmesh = MeshImFreq(beta, 'Fermion', nw)
+    g0_wk = lattice_dyson_g0_wk(mu, e_k, wmesh)
+
+    g0_ibz = ibz.lattice_dyson_g0_wk(mu, e_k, wmesh, unfold=False)
+    assert( isinstance(g0_ibz, IBZGf) )
+    assert( g0_ibz.data.shape == (len(wmesh), ibz.n_ibz, 2, 2) )
+
+    np.testing.assert_array_almost_equal(
+        IBZGf.from_gf(g0_wk, ibz).data, g0_ibz.data)
+
+    # -- Lazy element access and streamed unfold
+
+    for wi, ki in [(0, 0), (3, 17), (len(wmesh) - 1, 42)]:
+        np.testing.assert_array_almost_equal(g0_ibz[wi, ki], g0_wk.data[wi, ki])
+
+    for k in list(kmesh)[:5]:
+        np.testing.assert_array_almost_equal(g0_ibz[0, k], g0_wk.data[0, k.data_index])
+
+    np.testing.assert_array_almost_equal(g0_ibz.to_gf(k_block=7).data, g0_wk.data)
+    np.testing.assert_array_almost_equal(
+        g0_ibz.unfold_element((0, 1), k_block=5), g0_wk.data[..., 0, 1])
+
+    e_ibz = IBZGf.from_gf(e_k, ibz)
+    np.testing.assert_array_almost_equal(e_ibz.to_gf().data, e_k.data)
+
+    # -- HDF5 round trip
+
+    filename = 'point_group_ibz_gf.h5'
+    with HDFArchive(filename, 'w') as a:
+        a['g0_ibz'] = g0_ibz
+        a['e_ibz'] = e_ibz
+
+    with HDFArchive(filename, 'r') as a:
+        g0_ibz_ref = a['g0_ibz']
+        e_ibz_ref = a['e_ibz']
+
+    assert( g0_ibz_ref.ibz.n_ibz == ibz.n_ibz )
+    np.testing.assert_array_equal(g0_ibz_ref.ibz.k_to_op, ibz.k_to_op)
+    np.testing.assert_array_almost_equal(g0_ibz_ref.to_gf().data, g0_wk.data)
+    np.testing.assert_array_almost_equal(e_ibz_ref.to_gf().data, e_k.data)
+
+    # -- Block-wise Fourier transforms
+
+    g0_wr = fourier_wk_to_wr(g0_ibz, k_block=9)
+    g0_wr_ref = fourier_wk_to_wr_ref(g0_wk)
+    np.testing.assert_array_almost_equal(g0_wr.data, g0_wr_ref.data)
+
+    bmesh = MeshImFreq(beta, 'Boson', 4)
+    chi00_wk = lindhard_chi00(e_k=e_k, mesh=bmesh, mu=mu)
+    chi00_ibz = IBZGf.from_gf(chi00_wk, ibz)
+
+    chi00_wr = chi_wr_from_chi_wk(chi00_ibz)
+    chi00_wr_ref = chi_wr_from_chi_wk_ref(chi00_wk)
+    np.testing.assert_array_almost_equal(chi00_wr.data, chi00_wr_ref.data)
+
+    np.testing.assert_array_almost_equal(
+        chi_wr_from_chi_wk(chi00_wk).data, chi00_wr_ref.data)
+
+
+if __name__ == '__main__':
+
+    test_ibz_gf()
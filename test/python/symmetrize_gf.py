@@ -118,4 +118,11 @@ for symmetries in itertools.product(avail_symmetries, repeat=len(variables)):
     if not expected_symmetries == produced_symmetries:
         raise AssertionError("Incorrect symmetries were produced")
 
+# -- In place
+gf_inplace = gf.copy()
+gf_out = enforce_symmetry(gf_inplace, variables, ["odd", "even", "odd"], inplace=True)
+assert gf_out is gf_inplace
+np.testing.assert_array_equal(
+    gf_inplace.data, enforce_symmetry(gf, variables, ["odd", "even", "odd"]).data)
+
 print("It's all good honey")